@@ -6,3 +6,4 @@ class ApiConfig(AppConfig):
 
     def ready(self):
         import api.signals
+        import api.settlement  # registers the deferred task handlers
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.models import MinesGame, KenoGame, GameArchive, Profile, BetRecord
+from api.mines_utils import hash_seed, verify_game_fairness
+from api.keno_utils import verify_keno_fairness, calculate_matches
+
+
+ARCHIVED_MODELS = {
+    'mines': MinesGame,
+    'keno': KenoGame,
+}
+
+
+def month_start(value):
+    """Return the first day of the month (as a date) that ``value`` falls in."""
+    return timezone.localtime(value).date().replace(day=1)
+
+
+def archive_cutoff(months, now=None):
+    """
+    Return the aware datetime before which completed games get archived.
+
+    The cutoff is always a month boundary and at least one full month back, so
+    the current month (used by the monthly leaderboards) stays in the hot tables.
+    """
+    months = max(int(months), 1)
+    now = timezone.localtime(now or timezone.now())
+    year, month = now.year, now.month - months
+    while month < 1:
+        month += 12
+        year -= 1
+    return now.replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def serialize_game(game):
+    """Flatten a game row and its seeds into a JSON-friendly dict (everything except the user)."""
+    row = {
+        field.attname: getattr(game, field.attname)
+        for field in game._meta.concrete_fields
+        if field.attname not in ('user_id', 'server_seed_bytes')
+    }
+    row['server_seed'] = game.server_seed
+    row['server_seed_hash'] = game.server_seed_hash
+    return row
+
+
+def encode_payload(games):
+    """Compress a list of serialized games. Returns (payload bytes, sha256 hex digest)."""
+    raw = json.dumps(games, cls=DjangoJSONEncoder, separators=(',', ':'), sort_keys=True)
+    payload = zlib.compress(raw.encode(), 9)
+    return payload, hashlib.sha256(payload).hexdigest()
+
+
+def decode_payload(archive):
+    """Decompress an archive's payload back into a list of game dicts (oldest first)."""
+    return json.loads(zlib.decompress(bytes(archive.payload)).decode())
+
+
+def _fill_archive(archive, rows):
+    """Set an archive's payload and aggregates from ``rows`` (decoded game dicts, any order)."""
+    ordered = sorted(rows, key=lambda row: (row['created_at'], row['id']))
+    archive.payload, archive.payload_sha256 = encode_payload(ordered)
+    archive.games_count = len(ordered)
+    archive.games_won = sum(1 for row in ordered if row['status'] == 'won')
+    archive.total_wagered = sum(row['bet_amount'] for row in ordered)
+    archive.total_payouts = sum(row['payout_amount'] or 0 for row in ordered)
+    archive.max_payout = max((row['payout_amount'] or 0 for row in ordered), default=0)
+    archive.updated_at = timezone.now()
+
+
+def _store_month(user_id, game_type, month, games):
+    """Merge ``games`` into the (user, game_type, month) archive row, creating it if needed."""
+    lookup = dict(user_id=user_id, game_type=game_type, month=month)
+    # Round-trip through JSON so new rows look exactly like decoded ones
+    new_rows = json.loads(json.dumps([serialize_game(game) for game in games], cls=DjangoJSONEncoder))
+
+    archive = GameArchive.objects.select_for_update().filter(**lookup).first()
+    if archive is None:
+        archive = GameArchive(**lookup)
+        _fill_archive(archive, new_rows)
+        try:
+            with transaction.atomic():
+                archive.save(force_insert=True)
+            return archive
+        except IntegrityError:
+            # Another archiver created this month's row since we looked; merge into theirs
+            archive = GameArchive.objects.select_for_update().get(**lookup)
+
+    rows = {row['id']: row for row in decode_payload(archive)}
+    for row in new_rows:
+        rows[row['id']] = row
+    _fill_archive(archive, rows.values())
+    archive.save()
+    return archive
+
+
+def archive_completed_games(cutoff, batch_size=500, dry_run=False):
+    """
+    Move completed games created before ``cutoff`` into per-user monthly archives.
+
+    Works in batches of ``batch_size`` games, one transaction per batch, so the
+    hot tables are never locked for long. Active games are never archived.
+
+    Returns a dict of {game_type: number of games archived (or archivable on dry run)}.
+    """
+    moved = {}
+
+    for game_type, model in ARCHIVED_MODELS.items():
+        candidates = model.objects.filter(created_at__lt=cutoff).exclude(status='active')
+
+        if dry_run:
+            moved[game_type] = candidates.count()
+            continue
+
+        moved[game_type] = 0
+        user_ids = list(candidates.order_by('user_id').values_list('user_id', flat=True).distinct())
+
+        for user_id in user_ids:
+            while True:
+                with transaction.atomic():
+                    games = list(
+                        candidates.filter(user_id=user_id)
+                        .select_for_update()
+                        .order_by('created_at', 'id')[:batch_size]
+                    )
+                    if not games:
+                        break
+
+                    by_month = {}
+                    for game in games:
+                        by_month.setdefault(month_start(game.created_at), []).append(game)
+
+                    for month, month_games in by_month.items():
+                        _store_month(user_id, game_type, month, month_games)
+
+                    # The archive's aggregates stand in for the games' ledger rows
+                    game_ids = [game.id for game in games]
+                    model.objects.filter(id__in=game_ids).delete()
+                    BetRecord.objects.filter(game_type=game_type, game_id__in=game_ids).delete()
+                    # The games leave the history endpoints, so their cached copies are stale
+                    Profile.objects.filter(user_id=user_id).update(state_version=F('state_version') + 1)
+                    moved[game_type] += len(games)
+
+    return moved
+
+
+def verify_archive(archive):
+    """
+    Check an archive's integrity and re-derive every game outcome from its seeds.
+
+    Returns a list of (game_id, problem) tuples - empty means the archive verifies.
+    """
+    if hashlib.sha256(bytes(archive.payload)).hexdigest() != archive.payload_sha256:
+        return [(None, "Payload checksum mismatch")]
+
+    problems = []
+    for row in decode_payload(archive):
+        if hash_seed(row['server_seed']) != row['server_seed_hash']:
+            problems.append((row['id'], "Server seed does not match its hash"))
+            continue
+
+        if archive.game_type == 'mines':
+            fair = verify_game_fairness(
+                row['server_seed'],
+                row['client_seed'],
+                row['nonce'],
+                row['mines_count'],
+                row['mine_positions']
+            )
+            if not fair:
+                problems.append((row['id'], "Mine positions do not match seeds"))
+        else:
+            fair = verify_keno_fairness(
+                row['server_seed'],
+                row['client_seed'],
+                row['nonce'],
+                row['drawn_numbers']
+            )
+            if not fair:
+                problems.append((row['id'], "Drawn numbers do not match seeds"))
+            elif calculate_matches(row['numbers_selected'], row['drawn_numbers']) != row['matches']:
+                problems.append((row['id'], "Match count does not match drawn numbers"))
+
+    return problems
@@ -1,4 +1,152 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from api.models import Profile
+
+
+# User fields that are safe to cache for a few seconds. The password hash and
+# last_login are deliberately left out; the profile (balance!) is never cached.
+CACHED_USER_FIELDS = (
+    'id',
+    'username',
+    'first_name',
+    'last_name',
+    'email',
+    'is_active',
+    'is_staff',
+    'is_superuser',
+    'date_joined',
+)
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    """Drop a user's cached auth fields (called when the user row changes)."""
+    try:
+        cache.delete(user_cache_key(user_id))
+    except Exception:
+        # Entries expire after AUTH_USER_CACHE_SECONDS anyway
+        pass
+
+
+def revoked_token_key(raw_token):
+    return f"auth:revoked:{ValidatedTokenCache.digest(raw_token).hex()}"
+
+
+def revoke_access_token(raw_token, token):
+    """Stop accepting a validated access token on every worker (logout).
+
+    The token goes into the shared cache until it expires; without a shared
+    cache (LocMem) only this worker stops accepting it.
+    """
+    validated_token_cache.forget(raw_token)
+    timeout = int(token.get('exp', 0) - time.time()) + 1
+    if timeout <= 0:
+        return
+    try:
+        cache.set(revoked_token_key(raw_token), True, timeout)
+    except Exception:
+        # Best effort: the token expires within ACCESS_TOKEN_LIFETIME anyway
+        pass
+
+
+def is_revoked(raw_token):
+    try:
+        return cache.get(revoked_token_key(raw_token)) is not None
+    except Exception:
+        return False
+
+
+class ValidatedTokenCache:
+    """Bounded, thread-safe LRU of already-validated access tokens.
+
+    Keys are SHA-256 digests of the raw token, so raw tokens are never kept in
+    memory as keys. Entries are only returned until the token's own ``exp``, so
+    a cached token is never accepted longer than a fresh validation would
+    accept it. Each entry also remembers when the token was last found not
+    revoked (see ``revocation_check_due``).
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).digest()
+
+    def get(self, raw_token):
+        key = self.digest(raw_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            token, expires_at, _ = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return token
+
+    def set(self, raw_token, token):
+        if self.max_size <= 0:
+            return
+        expires_at = token.get('exp')
+        if expires_at is None:
+            return
+        key = self.digest(raw_token)
+        with self._lock:
+            # Not checked against the revocation list yet
+            self._entries[key] = [token, expires_at, 0]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def revocation_check_due(self, raw_token, max_age):
+        """
+        Whether the shared revocation list must be consulted for ``raw_token``.
+
+        False while the cached token was found not revoked in the last
+        ``max_age`` seconds; otherwise it is marked as checked now and True is
+        returned. Tokens that are not cached are always due.
+        """
+        key = self.digest(raw_token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return True
+            if now - entry[2] < max_age:
+                return False
+            entry[2] = now
+            return True
+
+    def forget(self, raw_token):
+        with self._lock:
+            self._entries.pop(self.digest(raw_token), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+validated_token_cache = ValidatedTokenCache(getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 1024))
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -7,9 +155,33 @@ class CookieJWTAuthentication(JWTAuthentication):
     We override ``authenticate`` instead of ``get_raw_token`` because the base
     class expects ``get_raw_token(header)`` – the original implementation here
     used the wrong signature, which would cause a ``TypeError`` at runtime.
+
+    Validated access tokens are remembered in ``validated_token_cache`` until
+    they expire, since the frontend sends the same token for its whole lifetime.
+    Tokens revoked at logout (``revoke_access_token``) are refused on every
+    worker: a remembered token is checked against the shared revocation list
+    at most every ``AUTH_REVOCATION_CHECK_SECONDS``, so most requests skip
+    that cache round trip, and any other token on every request.
+
+    ``get_user`` loads the user and its profile in one query, since nearly every
+    view reads ``request.user.profile``. With ``AUTH_USER_CACHE_SECONDS`` > 0 the
+    user fields are cached per user id instead, and only the profile is queried.
+    That query also checks ``is_active``, so deactivating a user takes effect at
+    once even when it skips ``post_save`` (``User.objects.filter(...).update()``);
+    other changes made that way show up once the cached fields expire.
+
+    The result is kept on the Django request, so middleware that needs the user
+    before the view (the request profiler) does not authenticate it twice.
     """
 
     def authenticate(self, request):  # type: ignore[override]
+        # DRF passes its Request, middleware the HttpRequest underneath it
+        http_request = getattr(request, '_request', request)
+        if not hasattr(http_request, '_cookie_jwt_authentication'):
+            http_request._cookie_jwt_authentication = self._authenticate(request)
+        return http_request._cookie_jwt_authentication
+
+    def _authenticate(self, request):
         raw_token = request.COOKIES.get("access_token")
         if raw_token is None:
             return None
@@ -18,8 +190,75 @@ class CookieJWTAuthentication(JWTAuthentication):
         except Exception:
             # Invalid / expired token – treat as anonymous
             return None
+        check_interval = getattr(settings, 'AUTH_REVOCATION_CHECK_SECONDS', 0)
+        if validated_token_cache.revocation_check_due(raw_token, check_interval) and is_revoked(raw_token):
+            validated_token_cache.forget(raw_token)
+            return None
         return self.get_user(validated_token), validated_token
 
+    def get_validated_token(self, raw_token):
+        token = validated_token_cache.get(raw_token)
+        if token is not None:
+            return token
+
+        token = super().get_validated_token(raw_token)
+
+        # Tokens that consult the blacklist on every validation must not be
+        # cached, otherwise a blacklisted token would keep working until exp
+        if not hasattr(token, 'check_blacklist'):
+            validated_token_cache.set(raw_token, token)
+        return token
+
     # Explicitly ignore Authorization header
     def get_header(self, request):  # type: ignore[override]
-        return None
\ No newline at end of file
+        return None
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        cache_seconds = getattr(settings, 'AUTH_USER_CACHE_SECONDS', 0)
+        if cache_seconds > 0:
+            user = self._get_cached_user(user_id, cache_seconds)
+        else:
+            user = User.objects.select_related('profile').filter(id=user_id).first()
+
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+    def _get_cached_user(self, user_id, cache_seconds):
+        key = user_cache_key(user_id)
+        try:
+            fields = cache.get(key)
+        except Exception:
+            # Shared cache down - fall back to the database
+            fields = None
+
+        if fields is None:
+            user = User.objects.select_related('profile').filter(id=user_id).first()
+            if user is not None:
+                try:
+                    cache.set(key, {name: getattr(user, name) for name in CACHED_USER_FIELDS}, cache_seconds)
+                except Exception:
+                    pass
+            return user
+
+        profile = Profile.objects.filter(user_id=user_id, user__is_active=True).first()
+        if profile is None:
+            # Deactivated (maybe by a bulk update) or deleted since it was cached
+            invalidate_cached_user(user_id)
+            return User.objects.select_related('profile').filter(id=user_id).first()
+
+        # Rebuild a "from the database" instance without touching auth_user;
+        # from_db expects values in model field order, the rest stay deferred.
+        names = [f.attname for f in User._meta.concrete_fields if f.attname in fields]
+        user = User.from_db('default', names, [fields[name] for name in names])
+        user.profile = profile
+        return user
@@ -0,0 +1,71 @@
+import functools
+
+from django.db.models import F
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.models import User, Profile
+from api.routers import current_read_alias
+
+
+def current_state_version(user):
+    """
+    The user's ``Profile.state_version``, without loading the profile if it is not loaded yet.
+
+    Inside ``@read_from_replica`` it is read from the replica, like the body it
+    versions: the profile authentication loaded comes from the primary, which
+    may be ahead of the replica.
+    """
+    if User.profile.related.is_cached(user) and current_read_alias() is None:
+        return user.profile.state_version
+    return Profile.objects.filter(user_id=user.id).values_list('state_version', flat=True).first()
+
+
+def bump_state_version(user_id):
+    """Change the user's ETags when something they can see changed without a profile save."""
+    Profile.objects.filter(user_id=user_id).update(state_version=F('state_version') + 1)
+
+
+def state_etag(view_method):
+    """
+    Conditional GET for read endpoints whose body only changes with the user's state version.
+
+    The ETag is built from the view, the user, ``Profile.state_version`` and
+    the rendered format. When ``If-None-Match`` matches it the handler is not
+    run and a bodiless 304 is returned, at the cost of at most one single
+    column query. Only use it on views whose response is fully determined by
+    data that bumps the version (settlements, claims, profile saves). On a
+    replica-read view put it below ``@read_from_replica``, so the version and
+    the body come from the same database.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+
+        version = current_state_version(request.user)
+        if version is None:
+            return view_method(self, request, *args, **kwargs)
+
+        renderer_format = getattr(request.accepted_renderer, 'format', '')
+        etag = quote_etag(f"{type(self).__name__}-{request.user.id}-{version}-{renderer_format}")
+        cache_control = 'private, no-cache'
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            # Weak comparison, as RFC 9110 requires for If-None-Match
+            candidates = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+            if '*' in candidates or etag in candidates:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response['ETag'] = etag
+                response['Cache-Control'] = cache_control
+                return response
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            response['Cache-Control'] = cache_control
+        return response
+
+    return wrapper
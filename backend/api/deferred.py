@@ -0,0 +1,154 @@
+"""
+Local, database-backed queue for work that must happen after a bet but not during it.
+
+``enqueue()`` writes a ``DeferredTask`` row inside the caller's transaction,
+so the work is recorded exactly when the bet commits, with no broker. After
+commit the user's queue is drained on a small per-process thread pool.
+``manage.py process_deferred_tasks`` picks up anything left behind by a
+crash or a retry delay.
+
+Ordering: a user's tasks run one at a time, oldest first, each while holding
+a lock on the user's oldest pending task row, so workers in different
+processes never run them concurrently or out of order. The profile row is not
+locked while a handler runs: bets lock it, and would otherwise wait for the
+whole task. A failing task is retried with backoff and holds back the user's
+later tasks until it succeeds or is marked ``failed`` after
+DEFERRED_TASK_MAX_ATTEMPTS.
+
+The bet ledger (``BetRecord``) is deliberately not deferred: it is one insert,
+and the recent-wins feeds and analytics that read it must show a settled bet
+at once.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import DeferredTask, Profile
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY_SECONDS = 300
+
+_handlers = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def deferred_task(name):
+    """Register ``handler(profile, **payload)`` under ``name``; it runs alone among the user's tasks."""
+    def register(handler):
+        _handlers[name] = handler
+        return handler
+    return register
+
+
+def enqueue(name, user_id, **payload):
+    """Queue task ``name`` for ``user_id`` in the current transaction; ``payload`` must be JSON-serializable."""
+    if name not in _handlers:
+        raise ValueError(f"Unknown deferred task {name!r}")
+    task = DeferredTask.objects.create(user_id=user_id, name=name, payload=payload)
+    transaction.on_commit(lambda: dispatch(user_id))
+    return task
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DEFERRED_TASK_WORKERS,
+                thread_name_prefix='deferred-task'
+            )
+        return _executor
+
+
+def dispatch(user_id):
+    """Drain ``user_id``'s queue now (DEFERRED_TASK_WORKERS = 0) or on the thread pool."""
+    if settings.DEFERRED_TASK_WORKERS <= 0:
+        drain_user(user_id)
+        return
+    _get_executor().submit(_drain_in_thread, user_id)
+
+
+def _drain_in_thread(user_id):
+    try:
+        drain_user(user_id)
+    except Exception:
+        logger.exception("Draining deferred tasks for user %s failed", user_id)
+    finally:
+        connection.close()
+
+
+def _retry_delay(attempts):
+    return min(2 ** attempts, MAX_RETRY_DELAY_SECONDS)
+
+
+def drain_user(user_id):
+    """
+    Run ``user_id``'s due tasks in order; returns how many completed.
+
+    Stops at the first task that is not due yet (waiting for a retry) and
+    schedules another drain for when it is.
+    """
+    completed = 0
+    while True:
+        with transaction.atomic():
+            # The lock on the oldest pending task is the per-user mutex across
+            # threads and processes. A drain that waited for it finds nothing
+            # once the holder has deleted it, and leaves the rest to the holder.
+            task = (
+                DeferredTask.objects.select_for_update()
+                .filter(user_id=user_id, status='pending').order_by('id').first()
+            )
+            if task is None:
+                return completed
+
+            now = timezone.now()
+            if task.run_after > now:
+                _schedule_retry(user_id, (task.run_after - now).total_seconds())
+                return completed
+
+            # Only this drain writes the statistics it reads, so no lock is needed
+            profile = Profile.objects.filter(user_id=user_id).first()
+            handler = _handlers.get(task.name)
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler registered for {task.name!r}")
+                if profile is None:
+                    raise LookupError(f"User {user_id} has no profile")
+                with transaction.atomic():
+                    handler(profile, **task.payload)
+            except Exception as e:
+                task.attempts += 1
+                task.last_error = repr(e)
+                if task.attempts >= settings.DEFERRED_TASK_MAX_ATTEMPTS:
+                    task.status = 'failed'
+                    logger.error("Deferred task %s (%s) failed for good: %r", task.id, task.name, e)
+                else:
+                    task.run_after = now + timedelta(seconds=_retry_delay(task.attempts))
+                    logger.warning("Deferred task %s (%s) failed, retrying: %r", task.id, task.name, e)
+                task.save(update_fields=['attempts', 'last_error', 'status', 'run_after'])
+                continue
+
+            task.delete()
+            completed += 1
+
+
+def _schedule_retry(user_id, delay):
+    timer = threading.Timer(delay, dispatch, args=[user_id])
+    timer.daemon = True
+    timer.start()
+
+
+def process_pending_tasks():
+    """Drain every user with due pending tasks in this process; returns the number of tasks completed."""
+    user_ids = (
+        DeferredTask.objects.filter(status='pending', run_after__lte=timezone.now())
+        .order_by('user_id').values_list('user_id', flat=True).distinct()
+    )
+    return sum(drain_user(user_id) for user_id in list(user_ids))
@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingBusy(APIException):
+    """Raised when the password hashing pool is saturated (login/registration storm)."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many logins in progress, please retry shortly."
+    default_code = "hashing_busy"
+    wait = 1  # DRF turns this into a Retry-After header
+
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = settings.PASSWORD_HASH_WORKERS
+                _slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASH_QUEUE)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+    return _executor, _slots
+
+
+def _run_in_worker(fn, args, kwargs):
+    _local.in_worker = True
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _local.in_worker = False
+
+
+def run_hashing(fn, *args, **kwargs):
+    """
+    Run a CPU-heavy hashing call on the bounded hashing pool.
+
+    At most PASSWORD_HASH_WORKERS hashes run per process and PASSWORD_HASH_QUEUE
+    more may wait; beyond that callers get ``HashingBusy`` (HTTP 503) after
+    PASSWORD_HASH_QUEUE_TIMEOUT seconds instead of piling up behind the pool.
+    The calling request thread still blocks until its hash is done; what the
+    pool bounds is how many hashes run at once, so a login storm cannot take
+    every CPU from the requests that do not hash. With PASSWORD_HASH_WORKERS = 0
+    hashing runs inline, as Django does by default.
+    """
+    if settings.PASSWORD_HASH_WORKERS <= 0 or getattr(_local, 'in_worker', False):
+        # Disabled, or a nested call (verify() calls encode()) already on the pool
+        return fn(*args, **kwargs)
+
+    executor, slots = _get_executor()
+    if not slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+        raise HashingBusy()
+    try:
+        return executor.submit(_run_in_worker, fn, args, kwargs).result()
+    finally:
+        slots.release()
+
+
+class OffloadedHasherMixin:
+    """Send a hasher's encode/verify through ``run_hashing``."""
+
+    def encode(self, password, salt, *args, **kwargs):
+        return run_hashing(super().encode, password, salt, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return run_hashing(super().verify, password, encoded)
+
+
+# Same algorithm names as Django's hashers, so existing password hashes keep
+# verifying. Django rehashes transparently on the next successful login when
+# the preferred hasher (first in PASSWORD_HASHERS) or its cost parameters change.
+
+class PBKDF2PasswordHasher(OffloadedHasherMixin, hashers.PBKDF2PasswordHasher):
+    iterations = getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None) or hashers.PBKDF2PasswordHasher.iterations
+
+
+class ScryptPasswordHasher(OffloadedHasherMixin, hashers.ScryptPasswordHasher):
+    work_factor = getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', None) or hashers.ScryptPasswordHasher.work_factor
+
+
+class Argon2PasswordHasher(OffloadedHasherMixin, hashers.Argon2PasswordHasher):
+    """Requires the optional ``argon2-cffi`` package."""
+
+
+class BCryptSHA256PasswordHasher(OffloadedHasherMixin, hashers.BCryptSHA256PasswordHasher):
+    """Requires the optional ``bcrypt`` package."""
@@ -0,0 +1,82 @@
+import logging
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import JsonResponse
+
+from api.token_utils import blacklist_filter
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PATH = '/healthz'
+READY_PATH = '/readyz'
+
+
+def check_database():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+
+def check_cache():
+    cache.set('readyz', 1, 5)
+    if cache.get('readyz') != 1:
+        raise RuntimeError("cache did not return the value just written")
+
+
+def warm_blacklist_filter():
+    # The first refresh after start-up would otherwise load the whole blacklist
+    if not blacklist_filter.is_warm:
+        blacklist_filter.contains('')
+
+
+# name -> (check, required for readiness)
+READINESS_CHECKS = {
+    'database': (check_database, True),
+    'token_blacklist': (warm_blacklist_filter, True),
+    # Cache outages are survivable: throttles, idempotency and auth caches fail open
+    'cache': (check_cache, False),
+}
+
+
+def readiness():
+    """Run every readiness check; returns ``(ready, {name: "ok" or "error"})``. Details go to the log only."""
+    ready = True
+    results = {}
+    for name, (check, required) in READINESS_CHECKS.items():
+        try:
+            check()
+            results[name] = "ok"
+        except Exception as e:
+            logger.warning("Readiness check %s failed: %s", name, e)
+            results[name] = "error"
+            ready = ready and not required
+    return ready, results
+
+
+class HealthCheckMiddleware:
+    """
+    Answers ``/healthz`` (liveness) and ``/readyz`` (readiness) before any other middleware.
+
+    Sitting first means probes skip host validation, CORS, sessions and
+    authentication, so they work from inside the container whatever
+    ALLOWED_HOSTS is. ``/healthz`` only shows the worker is serving requests;
+    ``/readyz`` returns 503 until the database answers and the per-worker
+    caches are warm, and lists each check.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == HEALTH_PATH:
+            return JsonResponse({"status": "ok"})
+
+        if request.path == READY_PATH:
+            ready, checks = readiness()
+            return JsonResponse(
+                {"status": "ready" if ready else "unavailable", "checks": checks},
+                status=200 if ready else 503
+            )
+
+        return self.get_response(request)
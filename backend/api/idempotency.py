@@ -0,0 +1,113 @@
+import functools
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# Marker stored while the first request with a key is still running. It gets
+# its own short timeout so a crashed worker cannot block the key for long.
+IN_FLIGHT = 'in-flight'
+IN_FLIGHT_SECONDS = 30
+
+
+def idempotency_cache_key(user_id, view_name, key):
+    return f"idem:{user_id}:{view_name}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method}:{request.path}:{body}".encode()).hexdigest()
+
+
+def idempotent(view_method):
+    """
+    Honour an ``Idempotency-Key`` header on a game-mutating POST handler.
+
+    The first request with a key runs normally and its response is stored for
+    IDEMPOTENCY_TTL_SECONDS, keyed per user and view. Retries with the same key
+    get the stored response replayed (``Idempotent-Replayed: true``) without
+    running the handler again, at the cost of one cache lookup. A retry that
+    arrives while the first request is still running gets 409, and reusing a
+    key with a different body gets 422. 5xx responses and exceptions are not
+    stored, so those can be retried. Requests without the header, and all
+    requests while the cache is unavailable, behave as before.
+
+    Keys live in the IDEMPOTENCY_CACHE_ALIAS cache, which every worker shares
+    (Redis, or a database table without it); a per-worker cache would let a
+    retry on another worker run the action again.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({
+                "error": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        cache = caches[settings.IDEMPOTENCY_CACHE_ALIAS]
+        cache_key = idempotency_cache_key(request.user.id, type(self).__name__, key)
+        fingerprint = request_fingerprint(request)
+
+        try:
+            claimed = cache.add(cache_key, IN_FLIGHT, IN_FLIGHT_SECONDS)
+            stored = None if claimed else cache.get(cache_key)
+        except Exception:
+            logger.warning("Idempotency cache unavailable, running request without it", exc_info=True)
+            return view_method(self, request, *args, **kwargs)
+
+        if not claimed:
+            if stored is None:
+                # Expired between add() and get(); treat as a fresh request
+                return view_method(self, request, *args, **kwargs)
+            if stored == IN_FLIGHT:
+                return Response({
+                    "error": "A request with this Idempotency-Key is still being processed"
+                }, status=status.HTTP_409_CONFLICT)
+            if stored['fingerprint'] != fingerprint:
+                return Response({
+                    "error": f"{IDEMPOTENCY_HEADER} was already used for a different request"
+                }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            response = Response(stored['data'], status=stored['status'])
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            _forget(cache, cache_key)
+            raise
+
+        if response.status_code >= 500:
+            _forget(cache, cache_key)
+            return response
+
+        try:
+            cache.set(cache_key, {
+                'fingerprint': fingerprint,
+                'status': response.status_code,
+                'data': response.data,
+            }, settings.IDEMPOTENCY_TTL_SECONDS)
+        except Exception:
+            logger.warning("Idempotency cache unavailable, response not stored", exc_info=True)
+        return response
+
+    return wrapper
+
+
+def _forget(cache, cache_key):
+    try:
+        cache.delete(cache_key)
+    except Exception:
+        pass
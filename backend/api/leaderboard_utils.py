@@ -0,0 +1,82 @@
+"""
+Leaderboards and leaderboard ranks.
+
+Every category is a single table ordered by an index on ``(value DESC, user)``:
+balances on ``Profile``, and this month's wagering and biggest win on
+``PlayerMonthlyTotals``. The user id breaks ties, so the order is strict and
+a player's rank is one plus the number of index entries ahead of theirs. That
+count is a range scan on the same index, which the top of the board (where
+the competition is) reaches first.
+
+The count is not free, though: it is O(rank). Deactivated users are left off
+the boards with a join to ``auth_user``, so every entry ahead also costs a
+primary key lookup of its user. A player ranked 100,000th reads 100,000 index
+entries and as many user rows. That is fine while active players number in the
+tens of thousands. A deeper board would need ``is_active`` copied onto the
+board tables, so the count can be answered from the index alone.
+"""
+from api.models import Profile, PlayerMonthlyTotals
+from api.money import format_cents
+
+LEADERBOARD_CATEGORIES = ('balance', 'total_wagered', 'biggest_win')
+
+
+def board(category, month):
+    """``(queryset, value field)`` for a category's rows in ``month`` (a date), unordered."""
+    if category == 'balance':
+        return Profile.objects.filter(user__is_active=True), 'balance'
+    if category in ('total_wagered', 'biggest_win'):
+        rows = PlayerMonthlyTotals.objects.filter(month=month, user__is_active=True, **{f'{category}__gt': 0})
+        return rows, category
+    raise ValueError(f"Unknown leaderboard category: {category}")
+
+
+def _entries(rows, field, first_rank):
+    entries = []
+    for offset, row in enumerate(rows):
+        value = format_cents(row[field])
+        entries.append({
+            'rank': first_rank + offset,
+            'username': row['user__username'],
+            'value': value,
+            'display_value': f"{value} 👑"
+        })
+    return entries
+
+
+def top_entries(category, month, limit):
+    """The first ``limit`` entries of a leaderboard."""
+    rows, field = board(category, month)
+    rows = rows.order_by(f'-{field}', 'user').values('user__username', field)[:limit]
+    return _entries(rows, field, first_rank=1)
+
+
+def rank_window(category, month, user_id, neighbours):
+    """
+    ``(rank, entries)`` for ``user_id``: their entry with up to ``neighbours``
+    entries on either side, best first. ``(None, [])`` if they are not on the
+    board (nothing wagered or won this month). Costs O(rank); see the module docstring.
+    """
+    rows, field = board(category, month)
+    mine = rows.filter(user_id=user_id).values('user__username', field).first()
+    if mine is None:
+        return None, []
+    value = mine[field]
+
+    # Entries ahead: a higher value, or the same value and a lower user id
+    ahead = rows.filter(**{f'{field}__gte': value}).exclude(**{field: value, 'user_id__gte': user_id})
+    behind = rows.filter(**{f'{field}__lte': value}).exclude(**{field: value, 'user_id__lte': user_id})
+    rank = ahead.count() + 1
+
+    above = []
+    if neighbours:
+        above = list(ahead.order_by(field, '-user').values('user__username', field)[:neighbours])
+        above.reverse()
+    below = behind.order_by(f'-{field}', 'user').values('user__username', field)[:neighbours] if neighbours else []
+
+    entries = (
+        _entries(above, field, first_rank=rank - len(above))
+        + _entries([mine], field, first_rank=rank)
+        + _entries(below, field, first_rank=rank + 1)
+    )
+    return rank, entries
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from api.archive_utils import archive_cutoff, archive_completed_games, verify_archive
+from api.models import GameArchive
+
+
+class Command(BaseCommand):
+    help = "Move completed Mines/Keno games older than N months into compressed per-user archives."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=3,
+            help="Archive games created before the start of the month N months ago (minimum 1, default 3).",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of games moved per transaction (default 500).",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report how many games would be archived.",
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help="Re-verify every archive's checksum and provably fair outcomes afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['months'])
+        self.stdout.write(f"Archiving completed games created before {cutoff.isoformat()}")
+
+        moved = archive_completed_games(
+            cutoff,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run']
+        )
+        for game_type, count in moved.items():
+            verb = "would be archived" if options['dry_run'] else "archived"
+            self.stdout.write(f"  {game_type}: {count} games {verb}")
+
+        if options['verify']:
+            failures = 0
+            for archive in GameArchive.objects.select_related('user').iterator():
+                for game_id, problem in verify_archive(archive):
+                    failures += 1
+                    self.stderr.write(f"  {archive}: game {game_id}: {problem}")
+
+            if failures:
+                self.stderr.write(self.style.ERROR(f"{failures} archived games failed verification"))
+            else:
+                self.stdout.write(self.style.SUCCESS("All archives verified"))
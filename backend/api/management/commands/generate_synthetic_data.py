@@ -0,0 +1,109 @@
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.models import User
+from api.synthetic_utils import generate_user, insert_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with deterministic synthetic users, profiles and settled "
+        "Mines/Keno games, for benchmarking leaderboard, analytics and history at scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1000,
+            help="Users to create (default 1000).",
+        )
+        parser.add_argument(
+            '--games-per-user',
+            type=float,
+            default=50,
+            help="Average games per user; the actual counts are heavy-tailed (default 50).",
+        )
+        parser.add_argument(
+            '--keno-share',
+            type=float,
+            default=0.5,
+            help="Average fraction of games that are Keno, 0-1 (default 0.5).",
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=12,
+            help="Spread signups and games over this many months before --until (default 12).",
+        )
+        parser.add_argument(
+            '--until',
+            type=date.fromisoformat,
+            default=None,
+            help="Last day of generated activity, YYYY-MM-DD (default today). Fix it to reproduce a data set.",
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help="Random seed; the same seed and options always generate the same rows (default 0).",
+        )
+        parser.add_argument(
+            '--prefix',
+            default='synthetic_',
+            help="Username prefix, followed by the user's index (default synthetic_).",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help="Rows per INSERT; users are committed in chunks of roughly this many games (default 5000).",
+        )
+
+    def handle(self, *args, **options):
+        users = options['users']
+        batch_size = options['batch_size']
+        prefix = options['prefix']
+        if users <= 0 or batch_size <= 0 or options['months'] <= 0:
+            raise CommandError("--users, --batch-size and --months must be positive")
+        if options['games_per_user'] < 0:
+            raise CommandError("--games-per-user cannot be negative")
+        if not 0 <= options['keno_share'] <= 1:
+            raise CommandError("--keno-share must be between 0 and 1")
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Users named {prefix}* already exist; pick another --prefix")
+
+        until = options['until'] or timezone.localdate()
+        end = timezone.make_aware(datetime.combine(until + timedelta(days=1), dt_time.min))
+        start = end - timedelta(days=30 * options['months'])
+
+        totals = {}
+        started = time.perf_counter()
+        chunk = []
+        chunk_games = 0
+        for index in range(users):
+            synthetic = generate_user(
+                options['seed'], index, prefix, start, end,
+                options['games_per_user'], options['keno_share']
+            )
+            chunk.append(synthetic)
+            chunk_games += len(synthetic.mines_games) + len(synthetic.keno_games)
+            if chunk_games >= batch_size or len(chunk) >= batch_size or index == users - 1:
+                for name, count in insert_users(chunk, batch_size).items():
+                    totals[name] = totals.get(name, 0) + count
+                chunk, chunk_games = [], 0
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{totals['users']:>10} users {totals['mines_games']:>12} mines games "
+                    f"{totals['keno_games']:>12} keno games  {elapsed:8.1f}s"
+                )
+
+        elapsed = time.perf_counter() - started
+        games = totals['mines_games'] + totals['keno_games']
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals['users']} users, {games} games, {totals['seed_pairs']} seed pairs and "
+            f"{totals['monthly_stats']} monthly stats rows in {elapsed:.1f}s ({games / elapsed:,.0f} games/s)"
+        ))
@@ -0,0 +1,65 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.utils import OperationalError
+
+from api.startup_utils import (
+    wait_for_database,
+    pending_migrations,
+    migration_lock,
+    static_fingerprint,
+    collected_static_fingerprint,
+    store_static_fingerprint,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Container start-up in one process: wait for the database, apply migrations only if any "
+        "are pending (under a lock, so replicas don't race) and collect static files only if they changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--db-timeout',
+            type=float,
+            default=60,
+            help="Seconds to wait for the database before giving up (default 60).",
+        )
+        parser.add_argument(
+            '--skip-static',
+            action='store_true',
+            help="Do not check or collect static files.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        try:
+            wait_for_database(options['db_timeout'], log=self.stdout.write)
+        except OperationalError as e:
+            raise CommandError(f"Database not reachable after {options['db_timeout']:g}s: {e}")
+        self.stdout.write("Database is up")
+
+        self.migrate()
+        if not options['skip_static']:
+            self.collectstatic()
+
+    def migrate(self):
+        if not pending_migrations():
+            self.stdout.write("No migrations to apply")
+        else:
+            with migration_lock():
+                # Another replica may have applied them while we waited for the lock;
+                # migrate then finds nothing to do
+                call_command('migrate', interactive=False, verbosity=self.verbosity)
+
+        # Database cache tables (the idempotency cache without Redis); skips existing ones
+        call_command('createcachetable', verbosity=self.verbosity)
+
+    def collectstatic(self):
+        fingerprint = static_fingerprint()
+        if fingerprint == collected_static_fingerprint():
+            self.stdout.write("Static files are up to date")
+            return
+
+        call_command('collectstatic', interactive=False, verbosity=self.verbosity)
+        store_static_fingerprint(fingerprint)
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.deferred import process_pending_tasks
+
+
+class Command(BaseCommand):
+    help = "Apply pending post-bet statistics tasks (left over after a crash or waiting for a retry)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help="Keep polling instead of exiting after one pass.",
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help="Seconds between passes with --loop (default 5).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            completed = process_pending_tasks()
+            if completed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Completed {completed} deferred tasks"))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.token_utils import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding refresh tokens and their blacklist entries in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Number of tokens deleted per batch (default 1000).",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} expired tokens"))
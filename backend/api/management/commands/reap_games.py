@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.reaper import POLICIES, reap_abandoned_mines_games
+
+
+class Command(BaseCommand):
+    help = "Settle Mines games abandoned mid-round as 'disconnected' (auto-cashout or forfeit)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--idle-seconds',
+            type=int,
+            default=None,
+            help=f"Reap games with no action for this long (default MINES_ABANDON_TIMEOUT_SECONDS, "
+                 f"currently {settings.MINES_ABANDON_TIMEOUT_SECONDS}).",
+        )
+        parser.add_argument(
+            '--policy',
+            choices=POLICIES,
+            default=None,
+            help=f"cashout pays the current multiplier, forfeit loses the bet "
+                 f"(default MINES_ABANDON_POLICY, currently {settings.MINES_ABANDON_POLICY}).",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help=f"Games claimed per transaction (default {settings.MINES_REAP_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help="Stop after this many games.",
+        )
+
+    def handle(self, *args, **options):
+        reaped = reap_abandoned_mines_games(
+            idle_seconds=options['idle_seconds'],
+            policy=options['policy'],
+            batch_size=options['batch_size'],
+            limit=options['limit'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Reaped {reaped} abandoned Mines games"))
@@ -0,0 +1,113 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.money import format_cents, to_cents
+
+
+class Command(BaseCommand):
+    help = (
+        "Monte Carlo check of the Mines house edge: play simulated rounds per "
+        "(mines count, strategy) and compare RTP, variance and max exposure "
+        "with the analytical values. Requires NumPy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=1_000_000,
+            help="Rounds simulated per (mines count, strategy) pair (default 1000000).",
+        )
+        parser.add_argument(
+            '--mines',
+            type=int,
+            nargs='+',
+            default=list(range(1, 25)),
+            help="Mines counts to simulate (default 1-24).",
+        )
+        parser.add_argument(
+            '--strategy',
+            nargs='+',
+            default=['fixed:1', 'fixed:3', 'fixed:5', 'all', 'random'],
+            help="Cash-out strategies: fixed:N (after N tiles), all (every safe tile) or random.",
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: number of CPUs).",
+        )
+        parser.add_argument(
+            '--bet',
+            default='1.00',
+            help="Bet size in dollars; payouts are rounded down to the cent as in the game (default 1.00).",
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help="Seed for reproducible runs.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from api.simulation_utils import run_simulations
+        except ImportError as e:
+            raise CommandError("simulate_mines requires NumPy (pip install numpy)") from e
+
+        if options['rounds'] <= 0:
+            raise CommandError("--rounds must be positive")
+        try:
+            bet = to_cents(options['bet'])
+        except ValueError as e:
+            raise CommandError(f"--bet: {e}") from e
+        if bet <= 0:
+            raise CommandError("--bet must be positive")
+        for mines_count in options['mines']:
+            if not 1 <= mines_count <= 24:
+                raise CommandError("--mines values must be between 1 and 24")
+
+        started = time.perf_counter()
+        try:
+            results = run_simulations(
+                options['mines'],
+                options['strategy'],
+                options['rounds'],
+                workers=options['workers'],
+                seed=options['seed'],
+                bet=bet
+            )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{'mines':>5} {'strategy':>9} {'rounds':>10} {'RTP':>8} {'expected':>8} {'z':>6} "
+            f"{'variance':>10} {'expected':>10} {'win rate':>8} {'max exposure':>14} {'theoretical':>14}"
+        )
+
+        suspicious = 0
+        for r in results:
+            flag = ""
+            if abs(r.z_score) > 4:
+                suspicious += 1
+                flag = "  <-- check"
+            self.stdout.write(
+                f"{r.mines_count:>5} {r.strategy:>9} {r.rounds:>10} {r.rtp:>8.4f} {r.expected_rtp:>8.4f} "
+                f"{r.z_score:>6.2f} {r.variance:>10.4f} {r.expected_variance:>10.4f} {r.win_rate:>8.4f} "
+                f"{format_cents(r.max_payout):>14} {format_cents(r.max_possible_payout):>14}{flag}"
+            )
+
+        total_rounds = sum(r.rounds for r in results)
+        self.stdout.write(
+            f"\n{total_rounds} rounds in {elapsed:.1f}s ({total_rounds / elapsed:,.0f} rounds/s, "
+            f"{options['workers']} workers)"
+        )
+        if suspicious:
+            self.stderr.write(self.style.ERROR(
+                f"{suspicious} results deviate more than 4 standard errors from the analytical RTP"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("Empirical RTP matches the analytical expectation"))
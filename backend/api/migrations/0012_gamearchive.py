@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_profile_last_ad_claim'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_type', models.CharField(choices=[('mines', 'Mines'), ('keno', 'Keno')], max_length=10)),
+                ('month', models.DateField()),
+                ('games_count', models.IntegerField(default=0)),
+                ('games_won', models.IntegerField(default=0)),
+                ('total_wagered', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('total_payouts', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('max_payout', models.DecimalField(decimal_places=2, default=0.0, max_digits=12)),
+                ('payload', models.BinaryField()),
+                ('payload_sha256', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='game_archives', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['game_type', 'month'], name='api_gamearc_game_ty_d4bce3_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'game_type', 'month'), name='unique_game_archive_per_month')],
+            },
+        ),
+    ]
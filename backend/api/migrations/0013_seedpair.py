@@ -0,0 +1,170 @@
+import hashlib
+import secrets
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Each user's committed seeds move from Profile to a SeedPair row, and games
+# keep their own server seed as 32 raw bytes instead of 64 hex characters. The
+# game's server seed hash is no longer stored: it is the SHA-256 of the hex
+# seed, so the model derives it.
+
+BATCH_SIZE = 2000
+GAMES = ('MinesGame', 'KenoGame')
+
+
+def _hash(seed_hex):
+    return hashlib.sha256(seed_hex.encode()).digest()
+
+
+def move_seeds(apps, schema_editor):
+    SeedPair = apps.get_model('api', 'SeedPair')
+    Profile = apps.get_model('api', 'Profile')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    for model_name in GAMES:
+        Game = apps.get_model('api', model_name)
+        while True:
+            games = list(Game.objects.filter(server_seed_bytes__isnull=True).order_by('id')[:BATCH_SIZE])
+            if not games:
+                break
+            for game in games:
+                game.server_seed_bytes = bytes.fromhex(game.server_seed)
+            Game.objects.bulk_update(games, ['server_seed_bytes'])
+
+    # Every user gets the committed pair for their next game
+    seeds = {
+        user_id: (next_server_seed, client_seed)
+        for user_id, next_server_seed, client_seed in Profile.objects.values_list(
+            'user_id', 'next_server_seed', 'current_client_seed'
+        ).iterator()
+    }
+    pairs = []
+    for user_id in User.objects.values_list('id', flat=True).iterator():
+        next_server_seed, client_seed = seeds.get(user_id, (None, None))
+        server_seed = next_server_seed or secrets.token_hex(32)
+        pairs.append(SeedPair(
+            user_id=user_id,
+            server_seed=bytes.fromhex(server_seed),
+            server_seed_hash=_hash(server_seed),
+            client_seed=client_seed or secrets.token_hex(32),
+        ))
+    SeedPair.objects.bulk_create(pairs, batch_size=BATCH_SIZE)
+
+
+def restore_seeds(apps, schema_editor):
+    SeedPair = apps.get_model('api', 'SeedPair')
+    Profile = apps.get_model('api', 'Profile')
+
+    for model_name in GAMES:
+        Game = apps.get_model('api', model_name)
+        while True:
+            games = list(Game.objects.filter(server_seed__isnull=True).order_by('id')[:BATCH_SIZE])
+            if not games:
+                break
+            for game in games:
+                game.server_seed = bytes(game.server_seed_bytes).hex()
+                game.server_seed_hash = _hash(game.server_seed).hex()
+            Game.objects.bulk_update(games, ['server_seed', 'server_seed_hash'])
+
+    for pair in SeedPair.objects.iterator():
+        Profile.objects.filter(user_id=pair.user_id).update(
+            next_server_seed=bytes(pair.server_seed).hex(),
+            next_server_seed_hash=bytes(pair.server_seed_hash).hex(),
+            current_client_seed=pair.client_seed,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_gamearchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Hex seeds become nullable before they are dropped, so rolling back can
+        # re-add them empty and fill them from the binary seeds
+        migrations.AlterField(
+            model_name='minesgame',
+            name='server_seed',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='minesgame',
+            name='server_seed_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='kenogame',
+            name='server_seed',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='kenogame',
+            name='server_seed_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='minesgame',
+            name='server_seed_bytes',
+            field=models.BinaryField(max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='kenogame',
+            name='server_seed_bytes',
+            field=models.BinaryField(max_length=32, null=True),
+        ),
+        migrations.CreateModel(
+            name='SeedPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('server_seed', models.BinaryField(max_length=32)),
+                ('server_seed_hash', models.BinaryField(max_length=32)),
+                ('client_seed', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='seed_pair', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(move_seeds, restore_seeds),
+        migrations.AlterField(
+            model_name='minesgame',
+            name='server_seed_bytes',
+            field=models.BinaryField(max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='kenogame',
+            name='server_seed_bytes',
+            field=models.BinaryField(max_length=32),
+        ),
+        migrations.RemoveField(
+            model_name='minesgame',
+            name='server_seed',
+        ),
+        migrations.RemoveField(
+            model_name='minesgame',
+            name='server_seed_hash',
+        ),
+        migrations.RemoveField(
+            model_name='kenogame',
+            name='server_seed',
+        ),
+        migrations.RemoveField(
+            model_name='kenogame',
+            name='server_seed_hash',
+        ),
+        migrations.RemoveField(
+            model_name='profile',
+            name='current_client_seed',
+        ),
+        migrations.RemoveField(
+            model_name='profile',
+            name='next_server_seed',
+        ),
+        migrations.RemoveField(
+            model_name='profile',
+            name='next_server_seed_hash',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_seedpair'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='state_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
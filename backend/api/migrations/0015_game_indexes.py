@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def disconnect_duplicate_active_games(apps, schema_editor):
+    # Races could leave a user with several active games; keep the newest one
+    # active so the one-active-game constraints can be created. The older ones
+    # are settled as 'disconnected' with the bet refunded, like an untouched
+    # game closed by the reaper's cashout policy: payout = bet, net = 0.
+    Profile = apps.get_model('api', 'Profile')
+    now = timezone.now()
+    for model_name in ('MinesGame', 'KenoGame'):
+        Game = apps.get_model('api', model_name)
+        newest_active = {}
+        for game_id, user_id in Game.objects.filter(status='active').order_by('created_at', 'id').values_list('id', 'user_id'):
+            newest_active[user_id] = game_id
+        duplicates = Game.objects.filter(status='active').exclude(id__in=newest_active.values())
+        for game in duplicates.only('id', 'user_id', 'bet_amount'):
+            Game.objects.filter(id=game.id).update(
+                status='disconnected',
+                payout_amount=game.bet_amount,
+                net_profit=0,
+                completed_at=now,
+            )
+            Profile.objects.filter(user_id=game.user_id).update(
+                balance=F('balance') + game.bet_amount,
+                state_version=F('state_version') + 1,
+            )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_profile_state_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='kenogame',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='minesgame',
+            options={},
+        ),
+        migrations.AddIndex(
+            model_name='kenogame',
+            index=models.Index(fields=['user', '-completed_at'], name='api_kenogam_user_id_191a29_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='minesgame',
+            index=models.Index(fields=['user', '-completed_at'], name='api_minesga_user_id_c0210d_idx'),
+        ),
+        migrations.RunPython(disconnect_duplicate_active_games, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='kenogame',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'active')), fields=('user',), name='unique_active_keno_game_per_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='minesgame',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'active')), fields=('user',), name='unique_active_mines_game_per_user'),
+        ),
+    ]
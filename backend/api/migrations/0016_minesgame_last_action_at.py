@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:03
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_last_action_at(apps, schema_editor):
+    # Without reveal timestamps, a game's last action is its start (or its end)
+    MinesGame = apps.get_model('api', 'MinesGame')
+    MinesGame.objects.filter(completed_at__isnull=True).update(last_action_at=F('created_at'))
+    MinesGame.objects.filter(completed_at__isnull=False).update(last_action_at=F('completed_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_game_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='minesgame',
+            name='last_action_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_last_action_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='minesgame',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['last_action_at'], name='mines_active_last_action_idx'),
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:07
+
+from decimal import Decimal
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_monthly_stats(apps, schema_editor):
+    # Same rules as the deferred task handlers in api/settlement.py: a game counts
+    # as played (and wagered) when it starts; wins, losses and payouts when it ends.
+    from django.utils import timezone
+
+    GameArchive = apps.get_model('api', 'GameArchive')
+    PlayerMonthlyStats = apps.get_model('api', 'PlayerMonthlyStats')
+    zero = Decimal('0')
+    rollups = {}
+
+    def rollup(user_id, game_type, month):
+        key = (user_id, game_type, month)
+        if key not in rollups:
+            rollups[key] = dict(games_played=0, games_won=0, games_lost=0,
+                                total_wagered=zero, total_payouts=zero, biggest_win=zero)
+        return rollups[key]
+
+    for game_type, model_name in (('mines', 'MinesGame'), ('keno', 'KenoGame')):
+        Game = apps.get_model('api', model_name)
+        rows = Game.objects.values_list('user_id', 'created_at', 'status', 'bet_amount', 'payout_amount', 'net_profit')
+        for user_id, created_at, status, bet, payout, net in rows.iterator():
+            stats = rollup(user_id, game_type, timezone.localtime(created_at).date().replace(day=1))
+            stats['games_played'] += 1
+            stats['total_wagered'] += bet
+            if status == 'active':
+                # Not settled yet: its result is recorded when it ends
+                continue
+            # Games disconnected by older code may have no payout or net profit
+            payout = payout or zero
+            if net is None:
+                net = payout - bet
+            stats['total_payouts'] += payout
+            if status == 'won' or (status == 'disconnected' and net > 0):
+                stats['games_won'] += 1
+                stats['biggest_win'] = max(stats['biggest_win'], payout)
+            elif status == 'lost' or (status == 'disconnected' and net < 0):
+                stats['games_lost'] += 1
+
+    for archive in GameArchive.objects.iterator():
+        stats = rollup(archive.user_id, archive.game_type, archive.month)
+        stats['games_played'] += archive.games_count
+        stats['games_won'] += archive.games_won
+        stats['games_lost'] += archive.games_count - archive.games_won
+        stats['total_wagered'] += archive.total_wagered
+        stats['total_payouts'] += archive.total_payouts
+        stats['biggest_win'] = max(stats['biggest_win'], archive.max_payout)
+
+    PlayerMonthlyStats.objects.bulk_create(
+        [PlayerMonthlyStats(user_id=user_id, game_type=game_type, month=month, **fields)
+         for (user_id, game_type, month), fields in rollups.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_minesgame_last_action_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeferredTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.IntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['user', 'id'], name='deferred_task_pending_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlayerMonthlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_type', models.CharField(choices=[('mines', 'Mines'), ('keno', 'Keno')], max_length=10)),
+                ('month', models.DateField()),
+                ('games_played', models.IntegerField(default=0)),
+                ('games_won', models.IntegerField(default=0)),
+                ('games_lost', models.IntegerField(default=0)),
+                ('total_wagered', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('total_payouts', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('biggest_win', models.DecimalField(decimal_places=2, default=0.0, max_digits=12)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'game_type'], name='api_playerm_month_730514_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'game_type', 'month'), name='unique_player_monthly_stats')],
+            },
+        ),
+        migrations.RunPython(backfill_monthly_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,129 @@
+import json
+import hashlib
+import zlib
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Round
+
+import api.money
+
+# Amounts become integer cents, multipliers integer basis points. Each column is
+# widened first so the scaled values fit while it is still a decimal, scaled in
+# place, then turned into an integer column.
+CENTS = 100
+BPS = 10_000
+
+MONEY = 'money'
+MULTIPLIER = 'multiplier'
+
+# (model, field, kind, null, default)
+FIELDS = [
+    ('profile', 'balance', MONEY, False, 0),
+    ('profile', 'mines_total_wagered', MONEY, False, 0),
+    ('profile', 'mines_total_profit', MONEY, False, 0),
+    ('profile', 'mines_biggest_win', MONEY, False, 0),
+    ('profile', 'keno_total_wagered', MONEY, False, 0),
+    ('profile', 'keno_total_profit', MONEY, False, 0),
+    ('profile', 'keno_biggest_win', MONEY, False, 0),
+    ('minesgame', 'bet_amount', MONEY, False, None),
+    ('minesgame', 'current_multiplier', MULTIPLIER, False, BPS),
+    ('minesgame', 'payout_amount', MONEY, True, None),
+    ('minesgame', 'net_profit', MONEY, True, None),
+    ('kenogame', 'bet_amount', MONEY, False, None),
+    ('kenogame', 'current_multiplier', MULTIPLIER, False, 0),
+    ('kenogame', 'payout_amount', MONEY, True, None),
+    ('kenogame', 'net_profit', MONEY, True, None),
+    ('gamearchive', 'total_wagered', MONEY, False, 0),
+    ('gamearchive', 'total_payouts', MONEY, False, 0),
+    ('gamearchive', 'max_payout', MONEY, False, 0),
+    ('playermonthlystats', 'total_wagered', MONEY, False, 0),
+    ('playermonthlystats', 'total_payouts', MONEY, False, 0),
+    ('playermonthlystats', 'biggest_win', MONEY, False, 0),
+]
+
+# Fields of archived game rows and deferred task payloads that hold amounts
+ROW_MONEY_KEYS = ('bet_amount', 'payout_amount', 'net_profit')
+ROW_MULTIPLIER_KEYS = ('current_multiplier',)
+
+
+def _factor(kind):
+    return CENTS if kind == MONEY else BPS
+
+
+def _wide_field(null, default):
+    kwargs = {'null': True, 'blank': True} if null else {}
+    if default is not None:
+        kwargs['default'] = 0
+    return models.DecimalField(max_digits=20, decimal_places=2, **kwargs)
+
+
+def _final_field(kind, null, default):
+    field_class = api.money.MoneyField if kind == MONEY else api.money.MultiplierField
+    kwargs = {'null': True, 'blank': True} if null else {}
+    if default is not None:
+        kwargs['default'] = default
+    return field_class(**kwargs)
+
+
+def _scaler(model, name, kind, up):
+    factor = _factor(kind)
+
+    def scale(apps, schema_editor):
+        Model = apps.get_model('api', model)
+        # Rounded because SQLite keeps decimals as floats (1.12 * 10000 = 11200.000000000002)
+        value = Round(F(name) * factor) if up else Round(F(name) * (Decimal(1) / factor), 2)
+        Model.objects.update(**{name: value})
+    return scale
+
+
+def _convert_row(row, up):
+    for keys, factor in ((ROW_MONEY_KEYS, CENTS), (ROW_MULTIPLIER_KEYS, BPS)):
+        for key in keys:
+            if row.get(key) is None:
+                continue
+            if up:
+                row[key] = int(Decimal(str(row[key])) * factor)
+            else:
+                row[key] = str((Decimal(row[key]) / factor).quantize(Decimal('0.01')))
+    return row
+
+
+def _convert_payloads(up):
+    def convert(apps, schema_editor):
+        GameArchive = apps.get_model('api', 'GameArchive')
+        for archive in GameArchive.objects.iterator():
+            rows = json.loads(zlib.decompress(bytes(archive.payload)).decode())
+            rows = [_convert_row(row, up) for row in rows]
+            raw = json.dumps(rows, separators=(',', ':'), sort_keys=True)
+            archive.payload = zlib.compress(raw.encode(), 9)
+            archive.payload_sha256 = hashlib.sha256(archive.payload).hexdigest()
+            archive.save(update_fields=['payload', 'payload_sha256'])
+
+        DeferredTask = apps.get_model('api', 'DeferredTask')
+        for task in DeferredTask.objects.iterator():
+            task.payload = _convert_row(task.payload, up)
+            task.save(update_fields=['payload'])
+    return convert
+
+
+def _operations():
+    operations = []
+    for model, name, kind, null, default in FIELDS:
+        operations += [
+            migrations.AlterField(model_name=model, name=name, field=_wide_field(null, default)),
+            migrations.RunPython(_scaler(model, name, kind, up=True), _scaler(model, name, kind, up=False)),
+            migrations.AlterField(model_name=model, name=name, field=_final_field(kind, null, default)),
+        ]
+    operations.append(migrations.RunPython(_convert_payloads(up=True), _convert_payloads(up=False)))
+    return operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_deferred_tasks_and_monthly_stats'),
+    ]
+
+    operations = _operations()
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:22
+
+import api.money
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_monthly_totals(apps, schema_editor):
+    from django.db.models import Max, Sum
+
+    PlayerMonthlyStats = apps.get_model('api', 'PlayerMonthlyStats')
+    PlayerMonthlyTotals = apps.get_model('api', 'PlayerMonthlyTotals')
+    rows = (
+        PlayerMonthlyStats.objects.values('user_id', 'month')
+        .annotate(total_wagered=Sum('total_wagered'), biggest_win=Max('biggest_win'))
+        .order_by()
+    )
+    PlayerMonthlyTotals.objects.bulk_create(
+        [PlayerMonthlyTotals(**row) for row in rows.iterator()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_integer_money'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerMonthlyTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('total_wagered', api.money.MoneyField(default=0)),
+                ('biggest_win', api.money.MoneyField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['-balance', 'user'], name='api_profile_balance_865ca3_idx'),
+        ),
+        migrations.AddField(
+            model_name='playermonthlytotals',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='playermonthlytotals',
+            index=models.Index(fields=['month', '-total_wagered', 'user'], name='api_playerm_month_fa74e3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playermonthlytotals',
+            index=models.Index(fields=['month', '-biggest_win', 'user'], name='api_playerm_month_753b64_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='playermonthlytotals',
+            constraint=models.UniqueConstraint(fields=('user', 'month'), name='unique_player_monthly_totals'),
+        ),
+        migrations.RunPython(backfill_monthly_totals, migrations.RunPython.noop),
+    ]
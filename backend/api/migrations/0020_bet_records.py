@@ -0,0 +1,88 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:26
+
+import api.money
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_bet_records(apps, schema_editor):
+    # Settled games still in the game tables; archived ones are covered by their archives
+    BetRecord = apps.get_model('api', 'BetRecord')
+    for game_type, model_name in (('mines', 'MinesGame'), ('keno', 'KenoGame')):
+        Game = apps.get_model('api', model_name)
+        batch = []
+        for game in Game.objects.exclude(status='active').order_by('id').iterator(chunk_size=2000):
+            payout = game.payout_amount or 0
+            batch.append(BetRecord(
+                game_type=game_type,
+                game_id=game.id,
+                user_id=game.user_id,
+                bet_amount=game.bet_amount,
+                payout_amount=payout,
+                net_profit=game.net_profit if game.net_profit is not None else payout - game.bet_amount,
+                multiplier=game.current_multiplier,
+                status=game.status,
+                created_at=game.created_at,
+                completed_at=game.completed_at or game.created_at,
+            ))
+            if len(batch) >= 2000:
+                BetRecord.objects.bulk_create(batch)
+                batch = []
+        BetRecord.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_leaderboard_ranks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BetRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_type', models.CharField(choices=[('mines', 'Mines'), ('keno', 'Keno')], max_length=10)),
+                ('game_id', models.BigIntegerField()),
+                ('bet_amount', api.money.MoneyField()),
+                ('payout_amount', api.money.MoneyField()),
+                ('net_profit', api.money.MoneyField()),
+                ('multiplier', api.money.MultiplierField()),
+                ('status', models.CharField(choices=[('won', 'Won'), ('lost', 'Lost'), ('disconnected', 'Disconnected')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='kenogame',
+            name='api_kenogam_status_c6c46a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='minesgame',
+            name='api_minesga_status_6fdb61_idx',
+        ),
+        migrations.AddField(
+            model_name='betrecord',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bet_records', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='betrecord',
+            index=models.Index(fields=['game_type', 'status', '-completed_at'], name='api_betreco_game_ty_90b017_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='betrecord',
+            index=models.Index(fields=['status', '-created_at'], name='api_betreco_status_8e971b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='betrecord',
+            index=models.Index(fields=['user', '-created_at'], name='api_betreco_user_id_683b3a_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='betrecord',
+            constraint=models.UniqueConstraint(fields=('game_type', 'game_id'), name='unique_bet_record_per_game'),
+        ),
+        migrations.RunPython(backfill_bet_records, migrations.RunPython.noop),
+    ]
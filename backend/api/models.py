@@ -1,27 +1,30 @@
+import hashlib
+
 from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
 
+from api.money import MoneyField, MultiplierField, ONE_X
+
 # Create your models here.
+# Amounts are MoneyFields (integer cents) and multipliers MultiplierFields (basis points), see api/money.py
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
-    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    balance = MoneyField(default=0)
     welcome_bonus_claimed = models.BooleanField(default=False)
     last_daily_claim = models.DateTimeField(null=True, blank=True)  # Last time user claimed daily reward
     last_ad_claim = models.DateTimeField(null=True, blank=True)  # Last time user claimed ad reward (5 min cooldown)
     mines_nonce = models.IntegerField(default=0)  # Nonce counter for provably fair mines games (always increments)
-    current_client_seed = models.CharField(max_length=64, blank=True, null=True)  # Current client seed for provably fair
     seed_games_played = models.IntegerField(default=0)  # Number of games played on current seed
-    next_server_seed = models.CharField(max_length=64, blank=True, null=True)  # Pre-generated server seed for next game
-    next_server_seed_hash = models.CharField(max_length=64, blank=True, null=True)  # Hash of next server seed for transparency
+    # The current client seed and next server seed live in the user's SeedPair
     
     # Mines game statistics
     mines_games_played = models.IntegerField(default=0)  # Total games played
     mines_games_won = models.IntegerField(default=0)  # Total games won
     mines_games_lost = models.IntegerField(default=0)  # Total games lost
-    mines_total_wagered = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)  # Total amount wagered
-    mines_total_profit = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)  # Total profit/loss (can be negative)
-    mines_biggest_win = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)  # Biggest single win payout
+    mines_total_wagered = MoneyField(default=0)  # Total amount wagered
+    mines_total_profit = MoneyField(default=0)  # Total profit/loss (can be negative)
+    mines_biggest_win = MoneyField(default=0)  # Biggest single win payout
     mines_current_streak = models.IntegerField(default=0)  # Current win streak (positive) or loss streak (negative)
     mines_best_streak = models.IntegerField(default=0)  # Best win streak ever
     
@@ -29,17 +32,88 @@ class Profile(models.Model):
     keno_games_played = models.IntegerField(default=0)  # Total games played
     keno_games_won = models.IntegerField(default=0)  # Total games won
     keno_games_lost = models.IntegerField(default=0)  # Total games lost
-    keno_total_wagered = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)  # Total amount wagered
-    keno_total_profit = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)  # Total profit/loss (can be negative)
-    keno_biggest_win = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)  # Biggest single win payout
+    keno_total_wagered = MoneyField(default=0)  # Total amount wagered
+    keno_total_profit = MoneyField(default=0)  # Total profit/loss (can be negative)
+    keno_biggest_win = MoneyField(default=0)  # Biggest single win payout
     keno_current_streak = models.IntegerField(default=0)  # Current win streak (positive) or loss streak (negative)
     keno_best_streak = models.IntegerField(default=0)  # Best win streak ever
 
+    # Bumped on every save (settlements, claims, balance edits); drives the ETags of per-user read endpoints
+    state_version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-balance', 'user']),  # Balance leaderboard and rank lookups
+        ]
+
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            # Incremented in the UPDATE itself, so concurrent saves never end up
+            # with the same version. The attribute holds the expression until
+            # the profile is reloaded.
+            self.state_version = models.F('state_version') + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'state_version' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'state_version']
+        super().save(*args, **kwargs)
+
+
+class SeedPair(models.Model):
+    """A user's committed provably fair seeds for their next game.
+
+    The server seed hash is shown before the next game and the client seed is
+    the player's current seed. Starting a game copies the seeds onto the game
+    row and commits a fresh server seed in place, so every user has exactly
+    one row. Server seeds are revealed once their game settles, so a server
+    seed is never shared between games.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='seed_pair')
+    server_seed = models.BinaryField(max_length=32)  # Raw 32 bytes (hex-encoded in the API)
+    server_seed_hash = models.BinaryField(max_length=32)  # SHA-256 of the hex server seed
+    client_seed = models.CharField(max_length=64)  # Player-chosen seeds can be any text
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Seed pair {self.id} - {self.user_id}"
+
+    @property
+    def server_seed_hex(self):
+        return bytes(self.server_seed).hex()
+
+    @property
+    def server_seed_hash_hex(self):
+        return bytes(self.server_seed_hash).hex()
+
+
+class GameSeedsMixin:
+    """Expose a game's binary server seed under the API's hex field names."""
+
+    @property
+    def server_seed(self):
+        return bytes(self.server_seed_bytes).hex()
 
-class MinesGame(models.Model):
+    @property
+    def server_seed_hash(self):
+        # Derived rather than stored: it is the SHA-256 of the hex seed
+        return hashlib.sha256(self.server_seed.encode()).hexdigest()
+
+
+class GameQuerySet(models.QuerySet):
+    def active_for(self, user):
+        """
+        The user's active game, or None.
+
+        Deliberately unordered: the one-active-game constraint allows a single
+        row, and ``first()`` would add an ``ORDER BY id`` that the planner may
+        follow instead of the partial index.
+        """
+        return next(iter(self.filter(user=user, status='active')[:1]), None)
+
+
+class MinesGame(GameSeedsMixin, models.Model):
     STATUS_CHOICES = [
         ('active', 'Active'),
         ('won', 'Won'),
@@ -48,34 +122,51 @@ class MinesGame(models.Model):
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mines_games')
-    bet_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    bet_amount = MoneyField()
     mines_count = models.IntegerField()
     
-    # Provably fair fields
-    server_seed = models.CharField(max_length=64)  # Actual seed (revealed after game)
-    server_seed_hash = models.CharField(max_length=64)  # SHA-256 hash shown to player
+    # Provably fair fields (server seed is revealed after the game)
+    server_seed_bytes = models.BinaryField(max_length=32)  # Taken from the user's committed SeedPair
     client_seed = models.CharField(max_length=64)
     nonce = models.IntegerField(default=0)
     
     # Game state
     mine_positions = models.JSONField()  # List of mine positions [0-24]
     revealed_tiles = models.JSONField(default=list)  # List of revealed tile positions
-    current_multiplier = models.DecimalField(max_digits=10, decimal_places=2, default=1.00)
+    current_multiplier = MultiplierField(default=ONE_X)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     
     # Results
-    payout_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
-    net_profit = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    payout_amount = MoneyField(null=True, blank=True)
+    net_profit = MoneyField(null=True, blank=True)
     
     # Timestamps
     created_at = models.DateTimeField(default=timezone.now)
     completed_at = models.DateTimeField(null=True, blank=True)
+    last_action_at = models.DateTimeField(default=timezone.now)  # Start or last reveal; the reaper uses it
+    
+    objects = GameQuerySet.as_manager()
     
     class Meta:
-        ordering = ['-created_at']
+        # No default ordering: every query that needs an order asks for it, and
+        # the rest (active-game lookups, aggregates) skip a pointless sort.
+        constraints = [
+            # At most one active game per user; also the index for the active-game lookup
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(status='active'),
+                name='unique_active_mines_game_per_user',
+            ),
+        ]
         indexes = [
-            models.Index(fields=['user', '-created_at']),
-            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['user', '-created_at']),  # Archiving
+            models.Index(fields=['user', '-completed_at']),  # History
+            # Abandoned-game reaper; only active games are indexed
+            models.Index(
+                fields=['last_action_at'],
+                condition=models.Q(status='active'),
+                name='mines_active_last_action_idx',
+            ),
         ]
     
     def __str__(self):
@@ -88,7 +179,7 @@ class MinesGame(models.Model):
         return 25 - self.mines_count - len(self.revealed_tiles)
 
 
-class KenoGame(models.Model):
+class KenoGame(GameSeedsMixin, models.Model):
     STATUS_CHOICES = [
         ('active', 'Active'),
         ('won', 'Won'),
@@ -97,34 +188,42 @@ class KenoGame(models.Model):
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='keno_games')
-    bet_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    bet_amount = MoneyField()
     numbers_selected = models.JSONField()  # List of player-selected numbers [1-40], can select 1-10 numbers
     
-    # Provably fair fields
-    server_seed = models.CharField(max_length=64)  # Actual seed (revealed after game)
-    server_seed_hash = models.CharField(max_length=64)  # SHA-256 hash shown to player
+    # Provably fair fields (server seed is revealed after the game)
+    server_seed_bytes = models.BinaryField(max_length=32)  # Taken from the user's committed SeedPair
     client_seed = models.CharField(max_length=64)
     nonce = models.IntegerField(default=0)
     
     # Game state
     drawn_numbers = models.JSONField(default=list)  # List of 20 drawn numbers [1-40]
     matches = models.IntegerField(default=0)  # Number of matches between selected and drawn
-    current_multiplier = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    current_multiplier = MultiplierField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     
     # Results
-    payout_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
-    net_profit = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    payout_amount = MoneyField(null=True, blank=True)
+    net_profit = MoneyField(null=True, blank=True)
     
     # Timestamps
     created_at = models.DateTimeField(default=timezone.now)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    objects = GameQuerySet.as_manager()
+    
     class Meta:
-        ordering = ['-created_at']
+        # No default ordering, see MinesGame.Meta
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(status='active'),
+                name='unique_active_keno_game_per_user',
+            ),
+        ]
         indexes = [
-            models.Index(fields=['user', '-created_at']),
-            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['user', '-created_at']),  # Archiving
+            models.Index(fields=['user', '-completed_at']),  # History
         ]
     
     def __str__(self):
@@ -132,4 +231,173 @@ class KenoGame(models.Model):
     
     def spots_selected(self):
         """Return the number of spots/numbers the player selected."""
-        return len(self.numbers_selected)
\ No newline at end of file
+        return len(self.numbers_selected)
+
+class GameArchive(models.Model):
+    """Compressed bundle of one user's completed games for one calendar month.
+
+    Old games are moved here out of the hot ``MinesGame``/``KenoGame`` tables
+    (see ``api/archive_utils.py``). The payload keeps every provably fair field
+    so archived games can still be verified.
+    """
+    GAME_CHOICES = [
+        ('mines', 'Mines'),
+        ('keno', 'Keno'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='game_archives')
+    game_type = models.CharField(max_length=10, choices=GAME_CHOICES)
+    month = models.DateField()  # First day of the month the games were created in
+
+    # Aggregates so reports don't need to decompress the payload
+    games_count = models.IntegerField(default=0)
+    games_won = models.IntegerField(default=0)
+    total_wagered = MoneyField(default=0)
+    total_payouts = MoneyField(default=0)
+    max_payout = MoneyField(default=0)
+
+    payload = models.BinaryField()  # zlib-compressed JSON list of game rows
+    payload_sha256 = models.CharField(max_length=64)  # SHA-256 of the compressed payload
+
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'game_type', 'month'], name='unique_game_archive_per_month'),
+        ]
+        indexes = [
+            models.Index(fields=['game_type', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_game_type_display()} archive {self.month:%Y-%m} - {self.user.username} ({self.games_count} games)"
+
+
+class BetRecord(models.Model):
+    """One settled bet of any game: the columns every game has in common.
+
+    Written in the transaction that settles the game (see ``api/settlement.py``).
+    The game's own row (``MinesGame``, ``KenoGame``) keeps the game-specific
+    details and seeds; cross-game reports such as recent wins and admin
+    analytics read this table alone. The archiver moves a game's record out
+    together with the game.
+    """
+    STATUS_CHOICES = [
+        ('won', 'Won'),
+        ('lost', 'Lost'),
+        ('disconnected', 'Disconnected'),
+    ]
+
+    game_type = models.CharField(max_length=10, choices=GameArchive.GAME_CHOICES)
+    game_id = models.BigIntegerField()  # Primary key of the game's own row
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bet_records')
+
+    bet_amount = MoneyField()
+    payout_amount = MoneyField()
+    net_profit = MoneyField()
+    multiplier = MultiplierField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+
+    created_at = models.DateTimeField()  # When the bet was placed
+    completed_at = models.DateTimeField()  # When it was settled
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['game_type', 'game_id'], name='unique_bet_record_per_game'),
+        ]
+        indexes = [
+            models.Index(fields=['game_type', 'status', '-completed_at']),  # Recent wins
+            models.Index(fields=['status', '-created_at']),  # Analytics date ranges
+            models.Index(fields=['user', '-created_at']),  # Analytics players
+        ]
+
+    def __str__(self):
+        return f"{self.get_game_type_display()} bet {self.game_id} - {self.user.username} - {self.status}"
+
+
+class PlayerMonthlyStats(models.Model):
+    """Per-user, per-game monthly totals for leaderboards and analytics.
+
+    Kept up to date by deferred tasks after every game (see ``api/settlement.py``),
+    so reports read one row per player instead of aggregating game tables.
+    ``month`` is the month the games were created in, as for ``GameArchive``.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_stats')
+    game_type = models.CharField(max_length=10, choices=GameArchive.GAME_CHOICES)
+    month = models.DateField()  # First day of the month
+
+    games_played = models.IntegerField(default=0)
+    games_won = models.IntegerField(default=0)
+    games_lost = models.IntegerField(default=0)
+    total_wagered = MoneyField(default=0)
+    total_payouts = MoneyField(default=0)
+    biggest_win = MoneyField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'game_type', 'month'], name='unique_player_monthly_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'game_type']),  # Leaderboard month totals
+        ]
+
+    def __str__(self):
+        return f"{self.get_game_type_display()} {self.month:%Y-%m} - {self.user.username}"
+
+
+class PlayerMonthlyTotals(models.Model):
+    """Per-user monthly totals over both games, for the monthly leaderboards.
+
+    Written next to ``PlayerMonthlyStats`` by the same deferred tasks. With one
+    row per player, a leaderboard is an index scan and a player's rank is a
+    count of the index entries ahead of theirs (see ``api/leaderboard_utils.py``).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_totals')
+    month = models.DateField()  # First day of the month
+
+    total_wagered = MoneyField(default=0)
+    biggest_win = MoneyField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'month'], name='unique_player_monthly_totals'),
+        ]
+        indexes = [
+            models.Index(fields=['month', '-total_wagered', 'user']),  # Leaderboard total_wagered
+            models.Index(fields=['month', '-biggest_win', 'user']),  # Leaderboard biggest_win
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} - {self.user.username}"
+
+
+class DeferredTask(models.Model):
+    """Non-critical work queued in the same transaction as the bet that caused it.
+
+    Rows are written inside the request's transaction, so a committed bet
+    always has its follow-up work recorded, and are deleted once processed
+    (see ``api/deferred.py``). Tasks for one user run strictly in ``id`` order.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('failed', 'Failed'),  # Gave up after DEFERRED_TASK_MAX_ATTEMPTS; later tasks go ahead
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    name = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], condition=models.Q(status='pending'), name='deferred_task_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} for user {self.user_id} ({self.status})"
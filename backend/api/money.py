@@ -0,0 +1,81 @@
+"""
+Money as integer cents and multipliers as integer basis points.
+
+Balances, bets, payouts and statistics are stored in ``MoneyField`` columns
+(whole cents in a BIGINT) and game multipliers in ``MultiplierField`` columns
+(1x = 10000 basis points), so settling a game is integer arithmetic with one
+explicit rounding step, ``payout_cents``. Conversion to and from decimal
+strings only happens at the edges: request parsing and response formatting.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.db import models
+
+CENTS_PER_UNIT = 100
+BPS_PER_UNIT = 10_000  # Basis points per 1x multiplier
+ONE_X = BPS_PER_UNIT
+
+_CENT = Decimal('0.01')
+_BPS = Decimal('0.0001')
+
+
+class MoneyField(models.BigIntegerField):
+    """An amount of money in whole cents; the Python value is an ``int``."""
+
+
+class MultiplierField(models.BigIntegerField):
+    """
+    A payout multiplier in basis points (1.5x is 15000); the Python value is an ``int``.
+
+    64-bit because the top Mines multipliers (over 5,000,000x) do not fit 32 bits in basis points.
+    """
+
+
+def to_cents(value):
+    """
+    Exact cents for a ``Decimal``, ``int``, ``float`` or numeric string.
+
+    Raises ValueError for anything that is not a number with at most two
+    decimal places, so callers never round a player's input silently.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Not an amount: {value!r}")
+    try:
+        amount = Decimal(str(value)) if not isinstance(value, Decimal) else value
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"Not an amount: {value!r}") from None
+    if not amount.is_finite():
+        raise ValueError(f"Not an amount: {value!r}")
+    cents = amount * CENTS_PER_UNIT
+    if cents != cents.to_integral_value():
+        raise ValueError(f"More than two decimal places: {value!r}")
+    return int(cents)
+
+
+def cents_to_decimal(cents):
+    """``Decimal`` with two places for an amount in cents (for responses that return numbers)."""
+    return (Decimal(cents) / CENTS_PER_UNIT).quantize(_CENT)
+
+
+def format_cents(cents):
+    """Two-decimal string for an amount in cents, e.g. ``-120`` -> ``"-1.20"``."""
+    sign = '-' if cents < 0 else ''
+    units, rest = divmod(abs(cents), CENTS_PER_UNIT)
+    return f"{sign}{units}.{rest:02d}"
+
+
+def to_bps(multiplier):
+    """Basis points for a multiplier given as a float, Decimal or string, rounded half up."""
+    return int((Decimal(str(multiplier)) * BPS_PER_UNIT).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def format_bps(bps):
+    """Multiplier string with at least two decimals: ``11314`` -> ``"1.1314"``, ``28000`` -> ``"2.80"``."""
+    text = f"{Decimal(bps) / BPS_PER_UNIT:.4f}".rstrip('0')
+    whole, _, fraction = text.partition('.')
+    return f"{whole}.{fraction.ljust(2, '0')}"
+
+
+def payout_cents(bet_cents, multiplier_bps):
+    """What a bet pays at a multiplier, rounded down to the cent (the house keeps fractions of a cent)."""
+    return bet_cents * multiplier_bps // BPS_PER_UNIT
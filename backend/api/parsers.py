@@ -0,0 +1,43 @@
+import codecs
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# orjson turns integers that do not fit in 64 bits into floats; the stdlib
+# keeps them exact. Such a number has at least 20 digits.
+_LONG_DIGITS = re.compile(rb'\d{20}')
+
+
+class ORJSONParser(JSONParser):
+    """
+    Drop-in replacement for DRF's ``JSONParser`` that decodes with orjson.
+
+    orjson only reads UTF-8, rejects a few inputs the stdlib accepts (lone
+    surrogates, overflowing floats) and reads integers beyond 64 bits as
+    floats; those bodies, and everything that is not valid JSON, are parsed
+    by ``JSONParser`` instead so results and error messages stay the same.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if _LONG_DIGITS.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+
@@ -0,0 +1,132 @@
+"""
+Response bodies shared by the single-purpose views and ``session/bootstrap/``.
+
+Each helper takes already loaded objects and never queries, so a view
+decides what to fetch and the same data looks identical on every endpoint.
+"""
+from api.money import cents_to_decimal, format_bps, format_cents
+from api.rewards import seconds_until_claimable
+from api.serializers import ProfileSerializer
+
+
+def current_user_payload(user, profile):
+    return {
+        "username": user.username,
+        "profile": {
+            "balance": cents_to_decimal(profile.balance) if profile else 0,
+            "welcome_bonus_claimed": profile.welcome_bonus_claimed if profile else False,
+        },
+    }
+
+
+def balance_payload(profile):
+    return ProfileSerializer(profile).data
+
+
+def seed_info_payload(profile, seed_pair):
+    # No pair yet (only accounts that lost theirs): the next bet commits one
+    return {
+        "client_seed": seed_pair.client_seed if seed_pair else None,
+        "seed_games_played": profile.seed_games_played,
+        "next_server_seed_hash": seed_pair.server_seed_hash_hex if seed_pair else None
+    }
+
+
+def active_mines_payload(game):
+    if not game:
+        return {"has_active_game": False}
+
+    return {
+        "has_active_game": True,
+        "game_id": game.id,
+        "bet_amount": format_cents(game.bet_amount),
+        "mines_count": game.mines_count,
+        "current_multiplier": format_bps(game.current_multiplier),
+        "revealed_tiles": game.revealed_tiles,
+        "tiles_revealed": len(game.revealed_tiles),
+        "safe_tiles_remaining": game.safe_tiles_remaining(),
+        "server_seed_hash": game.server_seed_hash,
+        "client_seed": game.client_seed,
+        "nonce": game.nonce,
+        "created_at": game.created_at.isoformat()
+    }
+
+
+def active_keno_payload(game):
+    if not game:
+        return {"has_active_game": False}
+
+    return {
+        "has_active_game": True,
+        "game_id": game.id,
+        "bet_amount": format_cents(game.bet_amount),
+        "numbers_selected": game.numbers_selected,
+        "drawn_numbers": game.drawn_numbers,
+        "matches": game.matches,
+        "multiplier": format_bps(game.current_multiplier),
+        "server_seed_hash": game.server_seed_hash,
+        "client_seed": game.client_seed,
+        "nonce": game.nonce,
+        "created_at": game.created_at.isoformat()
+    }
+
+
+def _game_stats_payload(games_played, games_won, games_lost, total_wagered, total_profit,
+                        biggest_win, current_streak, best_streak):
+    # Calculate win rate
+    win_rate = 0
+    if games_played > 0:
+        win_rate = (games_won / games_played) * 100
+
+    # Calculate average bet (in cents)
+    avg_bet = 0
+    if games_played > 0:
+        avg_bet = round(total_wagered / games_played)
+
+    return {
+        "games_played": games_played,
+        "games_won": games_won,
+        "games_lost": games_lost,
+        "win_rate": f"{win_rate:.1f}",
+        "total_wagered": format_cents(total_wagered),
+        "total_profit": format_cents(total_profit),
+        "biggest_win": format_cents(biggest_win),
+        "current_streak": current_streak,
+        "best_streak": best_streak,
+        "average_bet": format_cents(avg_bet)
+    }
+
+
+def mines_stats_payload(profile):
+    return _game_stats_payload(
+        profile.mines_games_played,
+        profile.mines_games_won,
+        profile.mines_games_lost,
+        profile.mines_total_wagered,
+        profile.mines_total_profit,
+        profile.mines_biggest_win,
+        profile.mines_current_streak,
+        profile.mines_best_streak,
+    )
+
+
+def keno_stats_payload(profile):
+    return _game_stats_payload(
+        profile.keno_games_played,
+        profile.keno_games_won,
+        profile.keno_games_lost,
+        profile.keno_total_wagered,
+        profile.keno_total_profit,
+        profile.keno_biggest_win,
+        profile.keno_current_streak,
+        profile.keno_best_streak,
+    )
+
+
+def reward_status_payload(reward, claimed_at):
+    time_remaining = seconds_until_claimable(reward, claimed_at)
+    return {
+        "can_claim": time_remaining == 0,
+        "time_remaining": time_remaining,
+        "last_claim": claimed_at,
+    }
@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+from api.authentication import CookieJWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Request'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+# Frames are labelled with paths relative to the backend directory when possible
+_BASE_DIR = str(settings.BASE_DIR) + os.sep
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_BASE_DIR):
+        filename = filename[len(_BASE_DIR):]
+    # ";" separates frames in the collapsed format
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(';', ',')
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread from a background thread every ``interval`` seconds.
+
+    ``samples`` counts each distinct stack (root first, ``;``-separated), which
+    is the collapsed-stack format read by flamegraph.pl and speedscope.
+    The sampler needs the GIL to take a sample, so while the request runs
+    Python code samples come at most every ``sys.getswitchinterval()`` (5ms by
+    default) whatever ``interval`` says; time spent waiting on the database
+    or other I/O is sampled at ``interval``. The switch interval is left alone
+    because it is process-wide and would slow every other thread too.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that records each statement and its duration (params are left out)."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': self.alias,
+                'sql': sql,
+                'many': many,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+def _is_staff(request):
+    # Admin pages log in with a session; the API uses the JWT cookie, whose
+    # result the view's own authentication then reuses
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    try:
+        result = CookieJWTAuthentication().authenticate(request)
+    except Exception:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+class RequestProfilerMiddleware:
+    """
+    Profile a single request when a staff user sends ``X-Profile-Request: 1``.
+
+    The request's thread is stack-sampled every PROFILER_INTERVAL_MS and every
+    SQL statement is timed. Two files are written to PROFILER_DIR, named by the
+    id returned in the ``X-Profile-Id`` response header: ``<id>.collapsed``
+    (collapsed stacks, open in speedscope or feed to flamegraph.pl) and
+    ``<id>.json`` (request details and the SQL log). Only one request per
+    process is profiled at a time.
+
+    Without PROFILER_DIR the middleware removes itself at startup, so normal
+    requests pay nothing; with it, requests without the header pay one header
+    lookup.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_DIR:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.output_dir = settings.PROFILER_DIR
+        self.interval = settings.PROFILER_INTERVAL_MS / 1000
+        self._busy = threading.Lock()
+
+    def __call__(self, request):
+        if PROFILE_HEADER not in request.headers or not _is_staff(request):
+            return self.get_response(request)
+
+        if not self._busy.acquire(blocking=False):
+            logger.info("Profiler busy, serving %s %s unprofiled", request.method, request.path)
+            return self.get_response(request)
+        try:
+            return self._profile(request)
+        finally:
+            self._busy.release()
+
+    def _profile(self, request):
+        recorders = [QueryRecorder(alias) for alias in connections]
+        sampler = StackSampler(threading.get_ident(), self.interval)
+
+        started_at = timezone.now()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for recorder in recorders:
+                stack.enter_context(connections[recorder.alias].execute_wrapper(recorder))
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                samples = sampler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        queries = [query for recorder in recorders for query in recorder.queries]
+        profile_id = "{}-{}-{}-{}".format(
+            started_at.strftime('%Y%m%dT%H%M%S'),
+            request.method.lower(),
+            re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-')[:60] or 'root',
+            uuid.uuid4().hex[:8],
+        )
+        summary = {
+            'id': profile_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'started_at': started_at.isoformat(),
+            'duration_ms': round(elapsed_ms, 3),
+            'interval_ms': settings.PROFILER_INTERVAL_MS,
+            'samples': sum(samples.values()),
+            'sql_count': len(queries),
+            'sql_ms': round(sum(query['duration_ms'] for query in queries), 3),
+            'sql': queries,
+        }
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            base = os.path.join(self.output_dir, profile_id)
+            with open(base + '.collapsed', 'w') as f:
+                f.writelines(f"{stack} {count}\n" for stack, count in samples.most_common())
+            with open(base + '.json', 'w') as f:
+                json.dump(summary, f, indent=2)
+        except OSError:
+            logger.exception("Could not write request profile %s", profile_id)
+            return response
+
+        response[PROFILE_ID_HEADER] = profile_id
+        return response
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.conditional import bump_state_version
+from api.models import MinesGame
+from api.settlement import GameNotActive, cashout_amounts, close_game, credit_balance, queue_mines_result
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ('cashout', 'forfeit')
+
+
+def _settle_abandoned(game, policy, cutoff, now):
+    """
+    Settle one abandoned game as 'disconnected'; returns the payout, or None if the player was faster.
+
+    ``cashout`` pays the current multiplier (the bet back if nothing was
+    revealed, which counts as neither win nor loss); ``forfeit`` loses the bet.
+    """
+    with transaction.atomic():
+        if policy == 'cashout':
+            payout_amount, net_profit = cashout_amounts(game)
+        else:
+            payout_amount = 0
+            net_profit = -game.bet_amount
+
+        try:
+            # Only if still untouched since the cutoff: a reveal or cashout that
+            # got in first wins, and this game is simply skipped
+            close_game(game, 'disconnected', payout_amount, net_profit, now=now,
+                       extra_filter={'last_action_at__lt': cutoff})
+        except GameNotActive:
+            return None
+
+        if policy == 'cashout':
+            credit_balance(game.user_id, payout_amount)
+            queue_mines_result(game, 'won' if game.revealed_tiles else 'refunded')
+        else:
+            queue_mines_result(game, 'lost')
+            bump_state_version(game.user_id)
+        return payout_amount
+
+
+def reap_abandoned_mines_games(idle_seconds=None, policy=None, batch_size=None, limit=None):
+    """
+    Settle active Mines games with no action for ``idle_seconds`` as 'disconnected'.
+
+    Games are claimed in batches of ``batch_size``, oldest first, with
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` on Postgres, so several workers can
+    sweep at once without waiting on each other. Every game is still settled
+    with a conditional UPDATE, so no game is ever paid twice. Defaults come
+    from the MINES_ABANDON_* settings. Returns the number of games reaped.
+    """
+    idle_seconds = settings.MINES_ABANDON_TIMEOUT_SECONDS if idle_seconds is None else idle_seconds
+    policy = policy or settings.MINES_ABANDON_POLICY
+    batch_size = batch_size or settings.MINES_REAP_BATCH_SIZE
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown abandoned game policy {policy!r}, expected one of {', '.join(POLICIES)}")
+
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=idle_seconds)
+    reaped = 0
+
+    while limit is None or reaped < limit:
+        size = batch_size if limit is None else min(batch_size, limit - reaped)
+        with transaction.atomic():
+            games = list(
+                MinesGame.objects.select_for_update(skip_locked=True)
+                .filter(status='active', last_action_at__lt=cutoff)
+                .order_by('last_action_at')[:size]
+            )
+            if not games:
+                break
+
+            settled = 0
+            for game in games:
+                if _settle_abandoned(game, policy, cutoff, now) is not None:
+                    settled += 1
+            reaped += settled
+
+        if settled == 0:
+            # Everything in the batch was taken by players or other workers
+            break
+
+    return reaped
+
+
+_last_reap_check = 0.0
+
+
+def schedule_game_reaping():
+    """
+    Reap abandoned Mines games in a background thread, at most every MINES_REAP_INTERVAL_SECONDS.
+
+    Called when a Mines game starts. The shared cache lock makes sure only one
+    worker sweeps per interval; set the interval to 0 to disable (e.g. when
+    running ``manage.py reap_games`` from cron instead).
+    """
+    global _last_reap_check
+
+    interval = settings.MINES_REAP_INTERVAL_SECONDS
+    now = time.time()
+    if interval <= 0 or now - _last_reap_check < interval:
+        return
+    _last_reap_check = now
+
+    try:
+        if not cache.add('mines-reap-lock', True, interval):
+            return
+    except Exception:
+        logger.warning("Cache unavailable, skipping abandoned game reaping")
+        return
+
+    def run():
+        try:
+            reaped = reap_abandoned_mines_games()
+            if reaped:
+                logger.info("Reaped %s abandoned Mines games", reaped)
+        except Exception:
+            logger.exception("Abandoned game reaping failed")
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name='mines-reaper', daemon=True).start()
@@ -0,0 +1,71 @@
+import decimal
+import math
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+class _NeedsStdlib(TypeError):
+    """Raised from the orjson ``default`` hook for values orjson would format differently."""
+
+
+def _uses_exponent(value):
+    # Python's float repr switches to exponent notation outside this range,
+    # where it writes 1e-05 / 1e+16 and orjson writes 1e-5 / 1e16.
+    return value != 0 and not (1e-4 <= abs(value) < 1e16)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's ``JSONRenderer`` that encodes with orjson.
+
+    The output is byte-for-byte what ``JSONRenderer`` produces with our
+    settings (compact, UTF-8, ``\\u2028``/``\\u2029`` escaped). Anything orjson
+    does not handle natively - Decimal, datetime, lazy strings, querysets -
+    goes through DRF's own ``JSONEncoder.default``. Payloads orjson cannot
+    encode identically fall back to ``JSONRenderer``: non-string keys,
+    integers beyond 64 bits, Decimals that become NaN or exponent-notation
+    floats, and float values with a negative exponent (e.g. rounding noise
+    like 5.55e-17). Indented output (browsable API, ``; indent=``) also falls back.
+
+    Not covered: raw float values of 1e16 and above would render as ``1e16``
+    rather than ``1e+16``, and float NaN/Infinity as ``null`` rather than
+    raising. Views format amounts as strings or return Decimals, so neither occurs.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+
+        def default(obj):
+            if isinstance(obj, decimal.Decimal):
+                value = float(obj)
+                if not math.isfinite(value) or _uses_exponent(value):
+                    raise _NeedsStdlib()
+                return value
+            return encoder.default(obj)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if b'e-' in ret:
+            # Possibly a tiny float written as 1e-5 (or just a string containing "e-")
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same JavaScript-safe escaping as JSONRenderer
+        if b'\xe2\x80' in ret:
+            ret = ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+        return ret
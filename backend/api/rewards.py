@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from api.models import User, Profile
+from api.money import to_cents
+
+
+@dataclass(frozen=True)
+class CooldownReward:
+    """A reward a player can claim once per ``cooldown``, tracked in a Profile timestamp column."""
+    name: str
+    label: str
+    amount: int  # Cents
+    cooldown: timedelta
+    field: str
+
+
+def get_reward(name):
+    config = settings.COOLDOWN_REWARDS[name]
+    return CooldownReward(
+        name=name,
+        label=config['label'],
+        amount=to_cents(config['amount']),
+        cooldown=timedelta(seconds=config['cooldown_seconds']),
+        field=config['field'],
+    )
+
+
+def last_claim(reward, user):
+    """When ``user`` last claimed ``reward`` (None if never), from the profile authentication loaded."""
+    return getattr(user.profile, reward.field)
+
+
+def seconds_until_claimable(reward, claimed_at, now=None):
+    if claimed_at is None:
+        return 0
+    remaining = reward.cooldown - ((now or timezone.now()) - claimed_at)
+    return max(0, int(remaining.total_seconds()))
+
+
+def claim_reward(reward, user):
+    """
+    Credit ``reward`` to ``user`` if its cooldown has passed.
+
+    The check and the credit are a single conditional UPDATE, so concurrent
+    claims (double clicks, retries) cannot both succeed, and no profile read
+    or full-row write is needed. Returns ``(claimed, new_balance, claimed_at)``;
+    when the reward is still cooling down ``claimed`` is False, ``new_balance``
+    is None and ``claimed_at`` is the time of the previous claim.
+    """
+    now = timezone.now()
+    field = Profile._meta.get_field(reward.field)
+    balance_field = Profile._meta.get_field('balance')
+
+    if connection.features.can_return_columns_from_insert:
+        # Postgres / SQLite 3.35+: UPDATE ... RETURNING gives the new balance in the same statement
+        quote = connection.ops.quote_name
+        sql = (
+            f"UPDATE {quote(Profile._meta.db_table)} "
+            f"SET {quote(balance_field.column)} = {quote(balance_field.column)} + %s, {quote(field.column)} = %s, "
+            f"{quote('state_version')} = {quote('state_version')} + 1 "
+            f"WHERE {quote('user_id')} = %s AND ({quote(field.column)} IS NULL OR {quote(field.column)} < %s) "
+            f"RETURNING {quote(balance_field.column)}"
+        )
+        params = [
+            balance_field.get_db_prep_save(reward.amount, connection),
+            field.get_db_prep_save(now, connection),
+            user.id,
+            field.get_db_prep_save(now - reward.cooldown, connection),
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        new_balance = row[0] if row else None
+    else:
+        with transaction.atomic():
+            updated = Profile.objects.filter(user_id=user.id).filter(
+                Q(**{f'{reward.field}__isnull': True}) | Q(**{f'{reward.field}__lt': now - reward.cooldown})
+            ).update(
+                balance=F('balance') + reward.amount,
+                state_version=F('state_version') + 1,
+                **{reward.field: now}
+            )
+            new_balance = (
+                Profile.objects.filter(user_id=user.id).values_list('balance', flat=True).first()
+                if updated else None
+            )
+
+    if new_balance is None:
+        # Rejected: report the stored claim time, which may be newer than the loaded profile's
+        claimed_at = Profile.objects.filter(user_id=user.id).values_list(reward.field, flat=True).first()
+        return False, None, claimed_at
+
+    # Keep the request's already loaded profile in step with the row
+    if User.profile.related.is_cached(user):
+        profile = user.profile
+        profile.balance = new_balance
+        setattr(profile, reward.field, now)
+
+    return True, new_balance, now
@@ -0,0 +1,109 @@
+import contextvars
+import functools
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Alias reads are sent to for the current request, set by @read_from_replica
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def current_read_alias():
+    """The alias reads go to in this request: the replica inside ``@read_from_replica``, otherwise None (default)."""
+    return _read_alias.get()
+
+
+def _pin_key(user_id):
+    return f"primary-pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """Keep ``user_id``'s replica-eligible reads on the primary for READ_YOUR_WRITES_SECONDS."""
+    if not settings.REPLICA_DATABASE_ALIAS or settings.READ_YOUR_WRITES_SECONDS <= 0:
+        return
+    try:
+        cache.set(_pin_key(user_id), 1, settings.READ_YOUR_WRITES_SECONDS)
+    except Exception:
+        logger.warning("Could not pin user %s to the primary", user_id, exc_info=True)
+
+
+def is_pinned_to_primary(user_id):
+    try:
+        return cache.get(_pin_key(user_id)) is not None
+    except Exception:
+        # Without the cache we cannot tell, so stay on the always-consistent primary
+        return True
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica only inside views decorated with ``@read_from_replica``.
+
+    Everything else - all writes, migrations, and reads anywhere else - uses
+    ``default``, so behaviour without a replica configured is unchanged.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def read_from_replica(view_method):
+    """
+    Run a read-only handler against the replica (REPLICA_DATABASE_ALIAS), if one is configured.
+
+    Users who changed something in the last READ_YOUR_WRITES_SECONDS (see
+    ``PrimaryPinMiddleware``) keep reading from the primary, so a settlement
+    or claim shows up in their own history immediately. Authentication runs
+    before the handler and therefore always reads the primary.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        alias = settings.REPLICA_DATABASE_ALIAS
+        if not alias or (request.user.is_authenticated and is_pinned_to_primary(request.user.id)):
+            return view_method(self, request, *args, **kwargs)
+
+        token = _read_alias.set(alias)
+        try:
+            return view_method(self, request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    return wrapper
+
+
+class PrimaryPinMiddleware:
+    """
+    Pins the user to the primary after any successful non-GET request.
+
+    DRF copies the authenticated user onto the Django request, so it is
+    available here once the view has run. Removes itself when no replica is
+    configured.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASE_ALIAS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.id)
+        return response
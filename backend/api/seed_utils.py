@@ -0,0 +1,71 @@
+from django.db import IntegrityError, transaction
+
+from api.models import SeedPair
+from api.mines_utils import generate_server_seed, generate_client_seed, hash_seed
+
+
+def _commit_server_seed(pair):
+    server_seed = generate_server_seed()
+    pair.server_seed = bytes.fromhex(server_seed)
+    pair.server_seed_hash = bytes.fromhex(hash_seed(server_seed))
+
+
+def create_committed_pair(user, client_seed=None):
+    """Commit a fresh server seed (and optionally keep the player's client seed) for the next game."""
+    pair = SeedPair(user=user, client_seed=client_seed or generate_client_seed())
+    _commit_server_seed(pair)
+    pair.save(force_insert=True)
+    return pair
+
+
+def find_committed_pair(user):
+    """The user's committed seed pair, or None. Never writes, so read-only views can use it."""
+    return SeedPair.objects.filter(user=user).first()
+
+
+def get_committed_pair(user, lock=False):
+    """
+    Return the user's committed seed pair, creating one if it is missing.
+
+    New users get their pair when the profile is created, so the fallback only
+    runs for accounts that somehow lost it. Pass ``lock=True`` inside a
+    transaction that is about to consume or rotate the pair.
+    """
+    pairs = SeedPair.objects.filter(user=user)
+    if lock:
+        pairs = pairs.select_for_update()
+    pair = pairs.first()
+    if pair is None:
+        try:
+            with transaction.atomic():
+                pair = create_committed_pair(user)
+        except IntegrityError:
+            # A concurrent request created it first
+            pair = pairs.get()
+    return pair
+
+
+def take_committed_seeds(user, client_seed=None):
+    """
+    Return ``(server_seed, client_seed)`` for a new game and commit the next server seed.
+
+    The server seed is hex. A ``client_seed`` passed with the bet applies to
+    this game only; the pair keeps the player's current client seed. Call
+    inside transaction.atomic().
+    """
+    pair = get_committed_pair(user, lock=True)
+    server_seed = pair.server_seed_hex
+    game_client_seed = client_seed or pair.client_seed
+
+    _commit_server_seed(pair)
+    pair.save(update_fields=['server_seed', 'server_seed_hash'])
+    return server_seed, game_client_seed
+
+
+def rotate_seed_pair(user):
+    """Give the player a new client seed and a new committed server seed (seed reroll)."""
+    pair = get_committed_pair(user, lock=True)
+    _commit_server_seed(pair)
+    pair.client_seed = generate_client_seed()
+    pair.save(update_fields=['server_seed', 'server_seed_hash', 'client_seed'])
+    return pair
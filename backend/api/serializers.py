@@ -1,10 +1,41 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from api.models import Profile
+from api.money import cents_to_decimal, to_cents
+from api.token_utils import FilteredRefreshToken
 
 # Serializers for API endpoints
 
+class MoneyAmountField(serializers.DecimalField):
+    """A MoneyField (cents) shown and accepted as a two-decimal amount, like the DecimalFields before it."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_digits', 12)
+        kwargs.setdefault('decimal_places', 2)
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return super().to_representation(cents_to_decimal(value))
+
+    def to_internal_value(self, data):
+        return to_cents(super().to_internal_value(data))
+
+
 class ProfileSerializer(serializers.ModelSerializer):
+    balance = MoneyAmountField()
+
     class Meta:
         model = Profile
         fields = ["id", "balance"]
         read_only_fields = ["id"]
+
+    def update(self, instance, validated_data):
+        # Only write the submitted columns; the statistics are updated concurrently after bets
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
+class CookieTokenRefreshSerializer(TokenRefreshSerializer):
+    # Checks the in-process blacklist filter instead of querying on every refresh
+    token_class = FilteredRefreshToken
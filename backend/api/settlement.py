@@ -0,0 +1,265 @@
+"""
+Settling games: the game-row writes, and the statistics that follow them.
+
+Mines game rows are only ever changed with ``UPDATE ... WHERE status = 'active'``,
+so a request and the abandoned-game reaper (``api/reaper.py``) cannot both
+settle the same game: whoever comes second gets ``GameNotActive`` and its
+transaction rolls back. All amounts are integer cents and multipliers basis
+points (``api/money.py``). Every settled game also gets a ``BetRecord`` row,
+written in the same transaction.
+
+Profile statistics, streaks and the monthly rollups are not written on the
+bet path. The ``queue_*`` helpers record a deferred task in the bet's
+transaction (see ``api/deferred.py``) and the handlers below apply it after
+commit, in order per user.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from api.archive_utils import month_start
+from api.deferred import deferred_task, enqueue
+from api.models import BetRecord, MinesGame, PlayerMonthlyStats, PlayerMonthlyTotals, Profile
+from api.money import payout_cents
+
+MINES_STAT_FIELDS = [
+    'mines_games_played', 'mines_games_won', 'mines_games_lost', 'mines_total_wagered',
+    'mines_total_profit', 'mines_biggest_win', 'mines_current_streak', 'mines_best_streak',
+]
+KENO_STAT_FIELDS = [
+    'keno_games_played', 'keno_games_won', 'keno_games_lost', 'keno_total_wagered',
+    'keno_total_profit', 'keno_biggest_win', 'keno_current_streak', 'keno_best_streak',
+]
+
+
+class GameNotActive(Exception):
+    """The game was settled (or reaped) by someone else in the meantime."""
+
+
+def _update_active(game, extra_filter=None, **fields):
+    updated = MinesGame.objects.filter(pk=game.pk, status='active', **(extra_filter or {})).update(**fields)
+    if not updated:
+        raise GameNotActive(f"Mines game {game.pk} is not active")
+    for name, value in fields.items():
+        setattr(game, name, value)
+
+
+def lock_profile(user_id):
+    """The user's profile, re-read with ``SELECT ... FOR UPDATE``; call inside transaction.atomic()."""
+    return Profile.objects.select_for_update().get(user_id=user_id)
+
+
+def credit_balance(user_id, amount):
+    """Add ``amount`` cents to the user's balance in a single UPDATE, without reading it first."""
+    Profile.objects.filter(user_id=user_id).update(
+        balance=F('balance') + amount,
+        state_version=F('state_version') + 1,
+    )
+
+
+def save_reveal(game, now=None):
+    """Store a safe reveal (tiles, multiplier) on a still active game."""
+    _update_active(
+        game,
+        revealed_tiles=game.revealed_tiles,
+        current_multiplier=game.current_multiplier,
+        last_action_at=now or timezone.now(),
+    )
+
+
+def cashout_amounts(game):
+    """``(payout, net_profit)`` in cents for cashing out ``game`` at its current multiplier."""
+    payout = payout_cents(game.bet_amount, game.current_multiplier)
+    return payout, payout - game.bet_amount
+
+
+def bet_record(game_type, game):
+    """Unsaved ``BetRecord`` for a settled Mines or Keno game."""
+    return BetRecord(
+        game_type=game_type,
+        game_id=game.pk,
+        user_id=game.user_id,
+        bet_amount=game.bet_amount,
+        payout_amount=game.payout_amount,
+        net_profit=game.net_profit,
+        multiplier=game.current_multiplier,
+        status=game.status,
+        created_at=game.created_at,
+        completed_at=game.completed_at,
+    )
+
+
+def record_keno_game(game):
+    """Ledger row for a Keno game, which is settled as soon as it is created."""
+    bet_record('keno', game).save(force_insert=True)
+
+
+def close_game(game, status, payout_amount, net_profit, now=None, extra_filter=None):
+    """Finish an active game with ``status`` ('won', 'lost' or 'disconnected') and record the bet; raises GameNotActive."""
+    now = now or timezone.now()
+    _update_active(
+        game,
+        extra_filter=extra_filter,
+        status=status,
+        completed_at=now,
+        payout_amount=payout_amount,
+        net_profit=net_profit,
+        revealed_tiles=game.revealed_tiles,
+        current_multiplier=game.current_multiplier,
+        last_action_at=now,
+    )
+    bet_record('mines', game).save(force_insert=True)
+
+
+def record_mines_win(profile, payout_amount, net_profit):
+    """Win statistics for a cashed out game; the caller credits the balance and saves."""
+    profile.mines_games_won += 1
+    profile.mines_total_profit += net_profit
+
+    # Update biggest win
+    if payout_amount > profile.mines_biggest_win:
+        profile.mines_biggest_win = payout_amount
+
+    # Update streak (win makes it positive or increases it)
+    if profile.mines_current_streak < 0:
+        profile.mines_current_streak = 1  # Start win streak
+    else:
+        profile.mines_current_streak += 1  # Continue win streak
+
+    # Update best streak
+    if profile.mines_current_streak > profile.mines_best_streak:
+        profile.mines_best_streak = profile.mines_current_streak
+
+
+def record_mines_loss(profile, bet_amount):
+    """Loss statistics for a lost or forfeited game; the caller saves."""
+    profile.mines_games_lost += 1
+    profile.mines_total_profit -= bet_amount
+
+    # Update streak (loss makes it negative or decreases it)
+    if profile.mines_current_streak > 0:
+        profile.mines_current_streak = -1  # Start loss streak
+    else:
+        profile.mines_current_streak -= 1  # Continue loss streak
+
+
+def record_keno_result(profile, bet_amount, payout_amount, net_profit, won):
+    """All statistics for one (instant) Keno game; the caller saves."""
+    profile.keno_games_played += 1
+    profile.keno_total_wagered += bet_amount
+
+    if won:
+        profile.keno_games_won += 1
+
+        # Update streak (win makes it positive or increases it)
+        if profile.keno_current_streak < 0:
+            profile.keno_current_streak = 1
+        else:
+            profile.keno_current_streak += 1
+
+        # Update best streak
+        if profile.keno_current_streak > profile.keno_best_streak:
+            profile.keno_best_streak = profile.keno_current_streak
+
+        # Update biggest win
+        if payout_amount > profile.keno_biggest_win:
+            profile.keno_biggest_win = payout_amount
+    else:
+        profile.keno_games_lost += 1
+
+        # Update streak (loss makes it negative or decreases it)
+        if profile.keno_current_streak > 0:
+            profile.keno_current_streak = -1
+        else:
+            profile.keno_current_streak -= 1
+
+    # Update profit stats
+    profile.keno_total_profit += net_profit
+
+
+def add_to_monthly_stats(user_id, game_type, month, played=0, won=0, lost=0, wagered=0, payout=0):
+    """Add one game event to the user's ``PlayerMonthlyStats`` and ``PlayerMonthlyTotals`` rows (callers are the user's deferred tasks, which run one at a time)."""
+    stats, _ = PlayerMonthlyStats.objects.get_or_create(user_id=user_id, game_type=game_type, month=month)
+    stats.games_played += played
+    stats.games_won += won
+    stats.games_lost += lost
+    stats.total_wagered += wagered
+    stats.total_payouts += payout
+    if won and payout > stats.biggest_win:
+        stats.biggest_win = payout
+    stats.save()
+
+    # Both games combined, for the monthly leaderboards; losses change neither total
+    if wagered or (won and payout):
+        totals, _ = PlayerMonthlyTotals.objects.get_or_create(user_id=user_id, month=month)
+        totals.total_wagered += wagered
+        if won and payout > totals.biggest_win:
+            totals.biggest_win = payout
+        totals.save()
+
+
+# Deferred tasks. Amounts travel as integer cents, which JSON keeps exact.
+
+def queue_mines_start(game):
+    enqueue(
+        'mines_started', game.user_id,
+        bet_amount=game.bet_amount,
+        month=month_start(game.created_at).isoformat(),
+    )
+
+
+def queue_mines_result(game, outcome):
+    """``outcome`` is 'won', 'lost' or 'refunded' (abandoned before any reveal)."""
+    enqueue(
+        'mines_settled', game.user_id,
+        outcome=outcome,
+        bet_amount=game.bet_amount,
+        payout_amount=game.payout_amount,
+        net_profit=game.net_profit,
+        month=month_start(game.created_at).isoformat(),
+    )
+
+
+def queue_keno_result(game):
+    enqueue(
+        'keno_played', game.user_id,
+        bet_amount=game.bet_amount,
+        payout_amount=game.payout_amount,
+        net_profit=game.net_profit,
+        won=game.status == 'won',
+        month=month_start(game.created_at).isoformat(),
+    )
+
+
+@deferred_task('mines_started')
+def _apply_mines_started(profile, bet_amount, month):
+    add_to_monthly_stats(profile.user_id, 'mines', month, played=1, wagered=bet_amount)
+    # The profile last: from this write to commit it holds the row lock bets wait for
+    profile.mines_games_played += 1
+    profile.mines_total_wagered += bet_amount
+    profile.save(update_fields=MINES_STAT_FIELDS)
+
+
+@deferred_task('mines_settled')
+def _apply_mines_settled(profile, outcome, bet_amount, payout_amount, net_profit, month):
+    if outcome == 'won':
+        record_mines_win(profile, payout_amount, net_profit)
+        add_to_monthly_stats(profile.user_id, 'mines', month, won=1, payout=payout_amount)
+    elif outcome == 'lost':
+        record_mines_loss(profile, bet_amount)
+        add_to_monthly_stats(profile.user_id, 'mines', month, lost=1)
+    else:
+        # Refunded: the bet came back, nothing was won or lost
+        add_to_monthly_stats(profile.user_id, 'mines', month, payout=payout_amount)
+        return
+    profile.save(update_fields=MINES_STAT_FIELDS)
+
+
+@deferred_task('keno_played')
+def _apply_keno_played(profile, bet_amount, payout_amount, net_profit, won, month):
+    add_to_monthly_stats(
+        profile.user_id, 'keno', month,
+        played=1, won=int(won), lost=int(not won),
+        wagered=bet_amount, payout=payout_amount,
+    )
+    record_keno_result(profile, bet_amount, payout_amount, net_profit, won)
+    profile.save(update_fields=KENO_STAT_FIELDS)
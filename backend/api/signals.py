@@ -1,9 +1,19 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
+from .authentication import invalidate_cached_user
 from .models import Profile
+from .seed_utils import create_committed_pair
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+        # Seeds for the first game, so reading seed info never has to write
+        create_committed_pair(instance)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_auth_cache(sender, instance, **kwargs):
+    # Deactivation, staff changes etc. must not be served from the auth cache
+    invalidate_cached_user(instance.pk)
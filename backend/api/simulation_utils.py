@@ -0,0 +1,202 @@
+"""
+Monte Carlo simulation of Mines rounds, used to validate the house edge.
+
+Requires NumPy, which is not a runtime dependency of the API; only the
+``simulate_mines`` management command imports this module.
+
+Rounds are settled the way the game settles them: the multiplier is stored in
+basis points and the payout is ``payout_cents`` of the bet, rounded down to
+the cent, so the simulated RTP includes what the rounding keeps for the house.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from api.mines_utils import calculate_multiplier
+from api.money import payout_cents, to_bps
+
+TOTAL_TILES = 25
+
+
+def multiplier_table(mines_count):
+    """Multiplier in basis points for 0..(25 - mines_count) revealed tiles, as a game stores it."""
+    return np.array(
+        [to_bps(calculate_multiplier(r, mines_count)) for r in range(TOTAL_TILES - mines_count + 1)],
+        dtype=np.int64
+    )
+
+
+def payout_table(mines_count, bet):
+    """What a ``bet`` (in cents) pays for 0..(25 - mines_count) revealed tiles, in cents."""
+    return np.array([payout_cents(bet, int(bps)) for bps in multiplier_table(mines_count)], dtype=np.int64)
+
+
+def survival_probabilities(mines_count):
+    """Chance of revealing r safe tiles in a row, for r = 0..(25 - mines_count)."""
+    return np.array(
+        [math.comb(TOTAL_TILES - mines_count, r) / math.comb(TOTAL_TILES, r)
+         for r in range(TOTAL_TILES - mines_count + 1)],
+        dtype=np.float64
+    )
+
+
+def parse_strategy(strategy, mines_count):
+    """
+    Turn a strategy name into the cash-out targets it may pick (number of tiles revealed).
+
+    ``fixed:N`` always cashes out after N tiles, ``all`` reveals every safe
+    tile and ``random`` picks a target uniformly from 1..(25 - mines_count).
+    Returns None when the strategy is impossible for this mines count.
+    """
+    max_reveals = TOTAL_TILES - mines_count
+    if strategy == 'all':
+        return np.array([max_reveals])
+    if strategy == 'random':
+        return np.arange(1, max_reveals + 1)
+    if strategy.startswith('fixed:'):
+        target = int(strategy.split(':', 1)[1])
+        if 1 <= target <= max_reveals:
+            return np.array([target])
+        return None
+    raise ValueError(f"Unknown strategy '{strategy}' (use fixed:N, all or random)")
+
+
+def analytical_moments(mines_count, targets, bet):
+    """Exact expected payout (RTP) and variance per unit bet for targets picked uniformly."""
+    table = payout_table(mines_count, bet)[targets] / bet
+    survival = survival_probabilities(mines_count)[targets]
+    mean = float(np.mean(survival * table))
+    second_moment = float(np.mean(survival * table ** 2))
+    return mean, second_moment - mean ** 2
+
+
+def simulate_chunk(mines_count, targets, rounds, seed, bet, chunk_size=100_000):
+    """
+    Play ``rounds`` rounds of ``bet`` cents and return (rounds, payout sum, payout sum of squares,
+    max payout, wins), payouts in cents.
+
+    Boards are sampled with NumPy's PCG64 generator (fast, not cryptographic):
+    every row gets random keys for the 25 tiles and the ``mines_count`` lowest
+    keys are the mines. The player reveals tiles in a fixed order, which is
+    equivalent to any order on a uniformly random board, so a round is won
+    when the first mine sits at or beyond the cash-out target.
+    """
+    rng = np.random.default_rng(seed)
+    table = payout_table(mines_count, bet)
+
+    total = 0
+    total_squares = 0.0
+    max_payout = 0
+    wins = 0
+    remaining = rounds
+
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        remaining -= n
+
+        keys = rng.random((n, TOTAL_TILES), dtype=np.float32)
+        mines = np.argpartition(keys, mines_count - 1, axis=1)[:, :mines_count]
+        first_mine = mines.min(axis=1)
+
+        if len(targets) == 1:
+            target = np.full(n, targets[0])
+        else:
+            target = rng.choice(targets, size=n)
+
+        won = first_mine >= target
+        payouts = np.where(won, table[target], 0)
+
+        total += int(payouts.sum())
+        # Squares as floats: the largest payouts overflow 64-bit integers when squared
+        total_squares += float(np.square(payouts.astype(np.float64)).sum())
+        max_payout = max(max_payout, int(payouts.max()))
+        wins += int(won.sum())
+
+    return rounds, total, total_squares, max_payout, wins
+
+
+@dataclass
+class SimulationResult:
+    """RTP and variance are per unit bet; payouts are in cents for a bet of ``bet`` cents."""
+    mines_count: int
+    strategy: str
+    rounds: int
+    bet: int
+    rtp: float
+    variance: float
+    max_payout: int
+    win_rate: float
+    expected_rtp: float
+    expected_variance: float
+    max_possible_payout: int
+
+    @property
+    def z_score(self):
+        """How many standard errors the empirical RTP is away from the analytical one."""
+        if self.expected_variance <= 0:
+            return 0.0
+        return (self.rtp - self.expected_rtp) / math.sqrt(self.expected_variance / self.rounds)
+
+
+def run_simulations(mines_counts, strategies, rounds, workers=1, seed=None, bet=100):
+    """
+    Simulate ``rounds`` rounds of ``bet`` cents for every (mines_count, strategy) pair.
+
+    Each pair is split into ``workers`` slices that run in separate processes
+    with independent random streams; results are merged per pair. Pairs whose
+    strategy cannot be played with that many mines are skipped.
+    """
+    jobs = []
+    for mines_count in mines_counts:
+        for strategy in strategies:
+            targets = parse_strategy(strategy, mines_count)
+            if targets is not None:
+                jobs.append((mines_count, strategy, targets))
+
+    slices = max(1, workers)
+    seeds = iter(np.random.SeedSequence(seed).spawn(len(jobs) * slices))
+    tasks = []
+    for mines_count, strategy, targets in jobs:
+        base, extra = divmod(rounds, slices)
+        for i in range(slices):
+            slice_rounds = base + (1 if i < extra else 0)
+            if slice_rounds:
+                tasks.append(((mines_count, strategy), (mines_count, targets, slice_rounds, next(seeds), bet)))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(key, pool.submit(simulate_chunk, *args)) for key, args in tasks]
+            partials = [(key, future.result()) for key, future in futures]
+    else:
+        partials = [(key, simulate_chunk(*args)) for key, args in tasks]
+
+    totals = {}
+    for key, (n, total, total_squares, max_payout, wins) in partials:
+        agg = totals.setdefault(key, [0, 0, 0.0, 0, 0])
+        agg[0] += n
+        agg[1] += total
+        agg[2] += total_squares
+        agg[3] = max(agg[3], max_payout)
+        agg[4] += wins
+
+    results = []
+    for mines_count, strategy, targets in jobs:
+        n, total, total_squares, max_payout, wins = totals[(mines_count, strategy)]
+        rtp = total / (n * bet)
+        expected_rtp, expected_variance = analytical_moments(mines_count, targets, bet)
+        results.append(SimulationResult(
+            mines_count=mines_count,
+            strategy=strategy,
+            rounds=n,
+            bet=bet,
+            rtp=rtp,
+            variance=total_squares / (n * bet ** 2) - rtp ** 2,
+            max_payout=max_payout,
+            win_rate=wins / n,
+            expected_rtp=expected_rtp,
+            expected_variance=expected_variance,
+            max_possible_payout=int(payout_table(mines_count, bet)[targets].max()),
+        ))
+    return results
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.utils import OperationalError
+
+# Arbitrary constant shared by every replica: pg_advisory_lock key for migrations
+MIGRATION_LOCK_ID = 0x43524f574e  # "CROWN"
+
+STATIC_STAMP_FILE = '.static-fingerprint'
+
+
+def wait_for_database(timeout, interval=1.0, log=None):
+    """Block until the default database accepts connections; raises OperationalError after ``timeout`` seconds."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection.ensure_connection()
+            return
+        except OperationalError:
+            if time.monotonic() >= deadline:
+                raise
+            if log:
+                log("Database not ready yet, retrying...")
+            connection.close()
+            time.sleep(interval)
+
+
+def pending_migrations():
+    """Migrations not yet applied to the default database, in the order ``migrate`` would run them."""
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return [migration for migration, backwards in plan]
+
+
+@contextmanager
+def migration_lock():
+    """
+    Serialize migrations across containers starting at the same time.
+
+    Uses a session-level advisory lock on PostgreSQL. Other databases (the
+    SQLite dev setup) only ever have one container, so nothing is locked.
+    """
+    if connection.vendor != 'postgresql':
+        yield
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", [MIGRATION_LOCK_ID])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [MIGRATION_LOCK_ID])
+
+
+def static_fingerprint():
+    """
+    Hash of every file collectstatic would copy: its path, size and mtime.
+
+    Only ``stat`` is needed per file, so this is far cheaper than running
+    collectstatic, which compares each file against STATIC_ROOT.
+    """
+    digest = hashlib.sha256()
+    entries = []
+    for finder in finders.get_finders():
+        for path, storage in finder.list([]):
+            prefixed = os.path.join(getattr(storage, 'prefix', None) or '', path)
+            stat = os.stat(storage.path(path))
+            entries.append(f"{prefixed}\0{stat.st_size}\0{stat.st_mtime_ns}")
+    for entry in sorted(entries):
+        digest.update(entry.encode())
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _stamp_path():
+    return os.path.join(settings.STATIC_ROOT, STATIC_STAMP_FILE)
+
+
+def collected_static_fingerprint():
+    """The fingerprint stored by the last ``collectstatic`` run through ``prepare_container``, if any."""
+    try:
+        with open(_stamp_path()) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def store_static_fingerprint(fingerprint):
+    with open(_stamp_path(), 'w') as f:
+        f.write(fingerprint)
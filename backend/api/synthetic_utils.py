@@ -0,0 +1,268 @@
+"""
+Deterministic synthetic users and games for benchmarking at production scale.
+
+Only the ``generate_synthetic_data`` management command uses this module.
+Every user's rows come from a ``random.Random`` seeded with the run seed and
+the user's index, so a seed always produces the same data whatever the batch
+size. Games are real provably fair rounds: each has its own server seed and
+its mines or draw come from the same functions the views use, so win rates,
+payouts and the verify endpoint behave as they do in production.
+"""
+import hashlib
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import transaction
+
+from api.archive_utils import month_start
+from api.keno_utils import draw_keno_numbers, calculate_matches, calculate_keno_multiplier
+from api.mines_utils import generate_mine_positions, calculate_multiplier
+from api.models import User, Profile, SeedPair, MinesGame, KenoGame, BetRecord, PlayerMonthlyStats, PlayerMonthlyTotals
+from api.money import CENTS_PER_UNIT, payout_cents, to_bps
+from api.settlement import bet_record
+
+# Unusable password hash (Django treats a leading '!' as "no password")
+UNUSABLE_PASSWORD = '!synthetic'
+
+# Cents
+MIN_BET = 10
+MAX_BET = 500_000
+
+# Relative popularity of each choice; 3 and 5 mines and 8-10 keno spots dominate real play
+MINES_COUNT_WEIGHTS = {1: 4, 2: 4, 3: 20, 4: 8, 5: 16, 6: 5, 7: 4, 8: 3, 10: 5, 12: 2, 15: 2, 20: 1, 24: 1}
+KENO_SPOTS_WEIGHTS = {1: 2, 2: 3, 3: 5, 4: 6, 5: 8, 6: 8, 7: 8, 8: 10, 9: 10, 10: 20}
+
+# Spread of games per user around the requested mean: most players try a few
+# games, a long tail plays thousands
+GAMES_PER_USER_SIGMA = 1.5
+
+
+@dataclass
+class SyntheticUser:
+    """Unsaved rows for one user; ``insert_users`` saves them in dependency order."""
+    user: User
+    profile: Profile
+    seed_pair: SeedPair = None  # The committed pair for the next game
+    mines_games: list = field(default_factory=list)
+    keno_games: list = field(default_factory=list)
+    monthly_stats: dict = field(default_factory=dict)  # (game_type, month) -> PlayerMonthlyStats
+    monthly_totals: dict = field(default_factory=dict)  # month -> PlayerMonthlyTotals
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _cents(value):
+    return round(value * CENTS_PER_UNIT)
+
+
+def _committed_pair(rng, user, client_seed, created_at):
+    server_seed = rng.randbytes(32).hex()
+    return SeedPair(
+        user=user,
+        server_seed=bytes.fromhex(server_seed),
+        server_seed_hash=hashlib.sha256(server_seed.encode()).digest(),
+        client_seed=client_seed,
+        created_at=created_at,
+    )
+
+
+def _record(synthetic, game_type, game):
+    """Add a settled game to the profile statistics and the monthly rollups."""
+    profile = synthetic.profile
+    won = game.status == 'won'
+    prefix = f"{game_type}_"
+
+    def add(name, value):
+        setattr(profile, prefix + name, getattr(profile, prefix + name) + value)
+
+    add('games_played', 1)
+    add('games_won' if won else 'games_lost', 1)
+    add('total_wagered', game.bet_amount)
+    add('total_profit', game.net_profit)
+
+    streak = getattr(profile, prefix + 'current_streak')
+    if won:
+        streak = streak + 1 if streak > 0 else 1
+        setattr(profile, prefix + 'best_streak', max(getattr(profile, prefix + 'best_streak'), streak))
+        setattr(profile, prefix + 'biggest_win', max(getattr(profile, prefix + 'biggest_win'), game.payout_amount))
+    else:
+        streak = streak - 1 if streak < 0 else -1
+    setattr(profile, prefix + 'current_streak', streak)
+
+    month = month_start(game.created_at)
+    stats = synthetic.monthly_stats.get((game_type, month))
+    if stats is None:
+        stats = synthetic.monthly_stats[(game_type, month)] = PlayerMonthlyStats(
+            user=synthetic.user, game_type=game_type, month=month
+        )
+    stats.games_played += 1
+    stats.games_won += won
+    stats.games_lost += not won
+    stats.total_wagered += game.bet_amount
+    stats.total_payouts += game.payout_amount
+    if won:
+        stats.biggest_win = max(stats.biggest_win, game.payout_amount)
+
+    totals = synthetic.monthly_totals.get(month)
+    if totals is None:
+        totals = synthetic.monthly_totals[month] = PlayerMonthlyTotals(user=synthetic.user, month=month)
+    totals.total_wagered += game.bet_amount
+    if won:
+        totals.biggest_win = max(totals.biggest_win, game.payout_amount)
+
+
+def _play_mines(rng, user, server_seed, client_seed, nonce, bet, created_at):
+    mines_count = _weighted(rng, MINES_COUNT_WEIGHTS)
+    mine_positions = generate_mine_positions(server_seed, client_seed, nonce, mines_count)
+
+    # Players cash out early far more often than they push their luck
+    max_reveals = 25 - mines_count
+    target = min(1 + int(rng.expovariate(0.45)), max_reveals)
+    revealed = []
+    hit_mine = False
+    for tile in rng.sample(range(25), 25):
+        if tile in mine_positions:
+            hit_mine = True
+            break
+        revealed.append(tile)
+        if len(revealed) == target:
+            break
+
+    multiplier = to_bps(calculate_multiplier(len(revealed), mines_count))
+    payout = 0 if hit_mine else payout_cents(bet, multiplier)
+    completed_at = created_at + timedelta(seconds=rng.uniform(1.0, 4.0) * (len(revealed) + 1))
+    return MinesGame(
+        user=user,
+        bet_amount=bet,
+        mines_count=mines_count,
+        server_seed_bytes=bytes.fromhex(server_seed),
+        client_seed=client_seed,
+        nonce=nonce,
+        mine_positions=mine_positions,
+        revealed_tiles=revealed,
+        current_multiplier=multiplier,
+        status='lost' if hit_mine else 'won',
+        payout_amount=payout,
+        net_profit=payout - bet,
+        created_at=created_at,
+        completed_at=completed_at,
+        last_action_at=completed_at,
+    )
+
+
+def _play_keno(rng, user, server_seed, client_seed, nonce, bet, created_at):
+    numbers_selected = sorted(rng.sample(range(1, 41), _weighted(rng, KENO_SPOTS_WEIGHTS)))
+    drawn_numbers = draw_keno_numbers(server_seed, client_seed, nonce)
+    matches = calculate_matches(numbers_selected, drawn_numbers)
+    multiplier = to_bps(calculate_keno_multiplier(len(numbers_selected), matches))
+    payout = payout_cents(bet, multiplier)
+    return KenoGame(
+        user=user,
+        bet_amount=bet,
+        numbers_selected=numbers_selected,
+        server_seed_bytes=bytes.fromhex(server_seed),
+        client_seed=client_seed,
+        nonce=nonce,
+        drawn_numbers=drawn_numbers,
+        matches=matches,
+        current_multiplier=multiplier,
+        status='won' if multiplier > 0 else 'lost',
+        payout_amount=payout,
+        net_profit=payout - bet,
+        created_at=created_at,
+        completed_at=created_at,
+    )
+
+
+def generate_user(seed, index, prefix, start, end, games_per_user, keno_share):
+    """
+    Build one user with a profile, a seed pair, settled games and monthly rollups, all unsaved.
+
+    The user signs up between ``start`` and ``end`` (more of them recently, as
+    for a growing site) and plays a heavy-tailed number of games averaging
+    ``games_per_user``, at their own typical stake, between signing up and
+    ``end``. ``keno_share`` is the average fraction of games that are Keno.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    window = (end - start).total_seconds()
+    joined = start + timedelta(seconds=window * math.sqrt(rng.random()))
+
+    user = User(username=f"{prefix}{index:07d}", password=UNUSABLE_PASSWORD, date_joined=joined)
+    profile = Profile(
+        user=user,
+        balance=_cents(rng.lognormvariate(math.log(500), 1.5)),
+        welcome_bonus_claimed=True,
+    )
+    synthetic = SyntheticUser(user=user, profile=profile)
+
+    mu = math.log(games_per_user) - GAMES_PER_USER_SIGMA ** 2 / 2 if games_per_user > 0 else None
+    games_count = int(rng.lognormvariate(mu, GAMES_PER_USER_SIGMA)) if mu is not None else 0
+    if keno_share <= 0 or keno_share >= 1:
+        keno_probability = min(max(keno_share, 0.0), 1.0)
+    else:
+        # Players have a favourite game; the mean over all players is keno_share
+        keno_probability = rng.betavariate(2 * keno_share, 2 * (1 - keno_share))
+
+    stake = rng.lognormvariate(math.log(2), 1.2)
+    client_seed = rng.randbytes(32).hex()
+    played_for = (end - joined).total_seconds()
+    timestamps = sorted(joined + timedelta(seconds=rng.uniform(0, played_for)) for _ in range(games_count))
+
+    for nonce, created_at in enumerate(timestamps):
+        if rng.random() < 0.01:
+            # Occasional seed reroll
+            client_seed = rng.randbytes(32).hex()
+        server_seed = rng.randbytes(32).hex()
+
+        bet = min(max(_cents(stake * rng.lognormvariate(0, 0.5)), MIN_BET), MAX_BET)
+        if rng.random() < keno_probability:
+            game = _play_keno(rng, user, server_seed, client_seed, nonce, bet, created_at)
+            synthetic.keno_games.append(game)
+            _record(synthetic, 'keno', game)
+        else:
+            game = _play_mines(rng, user, server_seed, client_seed, nonce, bet, created_at)
+            synthetic.mines_games.append(game)
+            _record(synthetic, 'mines', game)
+
+    profile.mines_nonce = games_count
+    profile.seed_games_played = games_count
+    synthetic.seed_pair = _committed_pair(rng, user, client_seed, timestamps[-1] if timestamps else joined)
+    return synthetic
+
+
+def insert_users(synthetic_users, batch_size):
+    """Save a chunk of generated users with ``bulk_create`` in one transaction; returns rows per model."""
+    def rows(attr):
+        return [row for synthetic in synthetic_users for row in getattr(synthetic, attr)]
+
+    with transaction.atomic():
+        # Parents first: bulk_create fills in the primary keys, which the
+        # children pick up from their (now saved) related objects
+        User.objects.bulk_create([s.user for s in synthetic_users], batch_size=batch_size)
+        Profile.objects.bulk_create([s.profile for s in synthetic_users], batch_size=batch_size)
+        seed_pairs = SeedPair.objects.bulk_create([s.seed_pair for s in synthetic_users], batch_size=batch_size)
+        mines_games = MinesGame.objects.bulk_create(rows('mines_games'), batch_size=batch_size)
+        keno_games = KenoGame.objects.bulk_create(rows('keno_games'), batch_size=batch_size)
+        BetRecord.objects.bulk_create(
+            [bet_record('mines', game) for game in mines_games] + [bet_record('keno', game) for game in keno_games],
+            batch_size=batch_size
+        )
+        monthly_stats = PlayerMonthlyStats.objects.bulk_create(
+            [stats for s in synthetic_users for stats in s.monthly_stats.values()], batch_size=batch_size
+        )
+        monthly_totals = PlayerMonthlyTotals.objects.bulk_create(
+            [totals for s in synthetic_users for totals in s.monthly_totals.values()], batch_size=batch_size
+        )
+
+    return {
+        'users': len(synthetic_users),
+        'seed_pairs': len(seed_pairs),
+        'mines_games': len(mines_games),
+        'keno_games': len(keno_games),
+        'monthly_stats': len(monthly_stats),
+        'monthly_totals': len(monthly_totals),
+    }
@@ -1,3 +1,1751 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from io import BytesIO, StringIO
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password as real_make_password
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection, connections, IntegrityError, transaction
+from django.db.backends.utils import CursorWrapper
+from django.db.models import QuerySet, Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from api.archive_utils import (
+    _store_month, archive_completed_games, archive_cutoff, decode_payload, month_start
+)
+from api.models import (
+    User, Profile, SeedPair, MinesGame, KenoGame, BetRecord, DeferredTask, GameArchive, PlayerMonthlyStats, PlayerMonthlyTotals
+)
+from api.conditional import bump_state_version
+from api.deferred import MAX_RETRY_DELAY_SECONDS, _retry_delay, deferred_task, drain_user, enqueue
+from api.health import READINESS_CHECKS
+from api.idempotency import IN_FLIGHT, idempotency_cache_key
+from api.authentication import ValidatedTokenCache, user_cache_key, validated_token_cache
+from api.seed_utils import get_committed_pair
+from api.throttling import TokenBucketThrottle, local_buckets
+from api.token_utils import BlacklistFilter
+from api.validators import BetValidator
+from api.keno_utils import calculate_keno_multiplier, calculate_matches, draw_keno_numbers
+from api.leaderboard_utils import rank_window, top_entries
+from api.mines_utils import calculate_multiplier, generate_mine_positions, hash_seed
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from api.money import ONE_X, format_bps, format_cents, payout_cents, to_bps, to_cents
+from api.reaper import reap_abandoned_mines_games
+from api.rewards import claim_reward, get_reward
+from api.settlement import bet_record, cashout_amounts
+from api.urls import urlpatterns
+
+
+@contextmanager
+def _no_seqscan():
+    # Postgres picks a sequential scan for tiny test tables even when a usable
+    # index exists; switching seq scans off makes it pick one only as a last resort.
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        yield
+
+
+class GameQueryPlanTests(TestCase):
+    """
+    EXPLAIN every hot game-table query and fail if it scans a whole table or sorts rows.
+
+    Each queryset mirrors the one its view runs; keep them in step.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('planner', password='x')
+        cls.month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    def assertUsesIndex(self, queryset, table, ordered=False):
+        with _no_seqscan():
+            plan = queryset.explain()
+
+        if connection.vendor == 'postgresql':
+            self.assertNotIn(f"Seq Scan on {table}", plan, plan)
+            if ordered:
+                self.assertNotIn("Sort", plan, plan)
+        elif connection.vendor == 'sqlite':
+            # "SCAN table" without an index is a full table scan
+            for line in plan.splitlines():
+                if f"SCAN {table}" in line:
+                    self.assertIn("USING", line, plan)
+            if ordered:
+                self.assertNotIn("TEMP B-TREE", plan, plan)
+        else:
+            self.skipTest(f"No plan checks for {connection.vendor}")
+
+    def test_active_game_lookups(self):
+        for model in (MinesGame, KenoGame):
+            table = model._meta.db_table
+            with self.subTest(model=model.__name__):
+                # active_for() (active-game views, bootstrap) and the exists() checks on start/reroll
+                self.assertUsesIndex(
+                    model.objects.filter(user=self.user, status='active')[:1], table
+                )
+                self.assertUsesIndex(model.objects.filter(user=self.user, status='active').values('pk')[:1], table)
+
+    def test_history(self):
+        self.assertUsesIndex(
+            MinesGame.objects.filter(user=self.user)
+            .exclude(status='active').order_by('-completed_at')[:50],
+            MinesGame._meta.db_table, ordered=True
+        )
+        self.assertUsesIndex(
+            KenoGame.objects.filter(user=self.user).order_by('-completed_at')[:50],
+            KenoGame._meta.db_table, ordered=True
+        )
+
+    def test_recent_wins(self):
+        for game_type in ('mines', 'keno'):
+            with self.subTest(game_type=game_type):
+                self.assertUsesIndex(
+                    BetRecord.objects.filter(game_type=game_type, status='won')
+                    .select_related('user').order_by('-completed_at')[:50],
+                    BetRecord._meta.db_table, ordered=True
+                )
+
+    def test_analytics_period(self):
+        bets = BetRecord.objects.filter(
+            status__in=['won', 'lost'], created_at__gte=self.month_start, created_at__lte=timezone.now()
+        )
+        self.assertUsesIndex(
+            bets.values('game_type').annotate(total_wagered=Sum('bet_amount')).order_by(), BetRecord._meta.db_table
+        )
+        # The per-player EXISTS of the active player counts
+        self.assertUsesIndex(bets.filter(user=self.user).values('pk')[:1], BetRecord._meta.db_table)
+
+    def test_archiving_removes_bet_records(self):
+        self.assertUsesIndex(
+            BetRecord.objects.filter(game_type='mines', game_id__in=[1, 2, 3]), BetRecord._meta.db_table
+        )
+
+    def test_leaderboards(self):
+        boards = {
+            'balance': Profile.objects.filter(user__is_active=True),
+            'total_wagered': PlayerMonthlyTotals.objects.filter(
+                month=self.month_start.date(), user__is_active=True, total_wagered__gt=0
+            ),
+            'biggest_win': PlayerMonthlyTotals.objects.filter(
+                month=self.month_start.date(), user__is_active=True, biggest_win__gt=0
+            ),
+        }
+        for field, rows in boards.items():
+            table = rows.model._meta.db_table
+            with self.subTest(category=field):
+                # top_entries()
+                self.assertUsesIndex(
+                    rows.order_by(f'-{field}', 'user').values('user__username', field)[:50], table, ordered=True
+                )
+                # rank_window(): the count of entries ahead and the neighbours either side
+                ahead = rows.filter(**{f'{field}__gte': 100}).exclude(**{field: 100, 'user_id__gte': self.user.id})
+                behind = rows.filter(**{f'{field}__lte': 100}).exclude(**{field: 100, 'user_id__lte': self.user.id})
+                self.assertUsesIndex(ahead.values('pk'), table)
+                self.assertUsesIndex(ahead.order_by(field, '-user').values('user__username', field)[:2], table, ordered=True)
+                self.assertUsesIndex(behind.order_by(f'-{field}', 'user').values('user__username', field)[:2], table, ordered=True)
+
+
+class ActiveGameConstraintTests(TestCase):
+    def test_one_active_game_per_user(self):
+        user = User.objects.create_user('racer', password='x')
+        fields = dict(
+            user=user, bet_amount=1, mines_count=3, server_seed_bytes=bytes(32), client_seed='racer',
+            mine_positions=[0, 1, 2]
+        )
+
+        MinesGame.objects.create(status='active', **fields)
+        MinesGame.objects.create(status='lost', completed_at=timezone.now() - timedelta(minutes=1), **fields)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MinesGame.objects.create(status='active', **fields)
+
+        self.assertEqual(MinesGame.objects.active_for(user).status, 'active')
+
+
+@override_settings(TOKEN_PRUNE_INTERVAL_SECONDS=0, MINES_REAP_INTERVAL_SECONDS=0, DEFERRED_TASK_WORKERS=0)
+class SeedPairTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('seeded', password='x')
+        self.user.profile.balance = 10_000
+        self.user.profile.save()
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+
+    def test_game_takes_the_committed_seeds(self):
+        pair = SeedPair.objects.get(user=self.user)
+        shown_hash, client_seed = pair.server_seed_hash_hex, pair.client_seed
+
+        response = self.client.post(
+            reverse('keno-start'), {'bet_amount': 1, 'numbers_selected': [7]}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        game = KenoGame.objects.get(user=self.user)
+        self.assertEqual((game.server_seed_hash, game.client_seed), (shown_hash, client_seed))
+
+        # The pair is rotated in place rather than a new row being added per game
+        pair = SeedPair.objects.get(user=self.user)
+        self.assertNotEqual(pair.server_seed_hash_hex, shown_hash)
+        self.assertEqual(pair.client_seed, client_seed)
+
+    def test_reads_never_create_a_pair(self):
+        SeedPair.objects.filter(user=self.user).delete()
+
+        self.assertIsNone(self.client.get(reverse('mines-seed-info')).json()['next_server_seed_hash'])
+        response = self.client.get(reverse('session-bootstrap'), {'fields': 'seed_info'})
+        self.assertIsNone(response.json()['seed_info']['next_server_seed_hash'])
+        self.assertFalse(SeedPair.objects.exists())
+
+        # The next bet commits one
+        response = self.client.post(
+            reverse('keno-start'), {'bet_amount': 1, 'numbers_selected': [7]}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(SeedPair.objects.filter(user=self.user).count(), 1)
+
+    def test_concurrently_created_pair_is_reused(self):
+        existing = SeedPair.objects.get(user=self.user)
+        # The pair appeared after this request looked for it
+        with mock.patch('django.db.models.query.QuerySet.first', return_value=None):
+            pair = get_committed_pair(self.user, lock=True)
+        self.assertEqual(pair.pk, existing.pk)
+
+
+class ArchiveTests(TestCase):
+    """archive_completed_games() and what the analytics view makes of archived months."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('archivist', password='x', is_staff=True)
+        # Mid-month, in a month the archiver moves
+        cls.played_at = archive_cutoff(1) - timedelta(days=20)
+        cls.month = month_start(cls.played_at)
+
+    def setUp(self):
+        cache.clear()
+
+    def _games(self, count, status='won'):
+        games = []
+        for _ in range(count):
+            games.append(MinesGame.objects.create(
+                user=self.user, bet_amount=100, server_seed_bytes=bytes(32), client_seed='archive',
+                nonce=MinesGame.objects.count(), mines_count=3,
+                mine_positions=[0, 1, 2], revealed_tiles=[3], status=status, payout_amount=250, net_profit=150,
+                created_at=self.played_at, completed_at=self.played_at
+            ))
+            bet_record('mines', games[-1]).save()
+        return games
+
+    def test_archiving_merges_into_the_month(self):
+        self._games(2)
+        self.assertEqual(archive_completed_games(archive_cutoff(1)), {'mines': 2, 'keno': 0})
+        self._games(1)
+        self.assertEqual(archive_completed_games(archive_cutoff(1)), {'mines': 1, 'keno': 0})
+
+        archive = GameArchive.objects.get()
+        self.assertEqual((archive.month, archive.games_count, archive.total_wagered), (self.month, 3, 300))
+        self.assertEqual(len(decode_payload(archive)), 3)
+        self.assertFalse(MinesGame.objects.exists())
+
+    def test_concurrent_archivers_merge(self):
+        first, second = self._games(2)
+        with transaction.atomic():
+            _store_month(self.user.id, 'mines', self.month, [first])
+        # The second archiver looked before the first one's row existed
+        with transaction.atomic(), mock.patch('django.db.models.query.QuerySet.first', return_value=None):
+            _store_month(self.user.id, 'mines', self.month, [second])
+
+        archive = GameArchive.objects.get()
+        self.assertEqual(sorted(row['id'] for row in decode_payload(archive)), [first.id, second.id])
+        self.assertEqual(archive.games_count, 2)
+
+    def _analytics(self, start_date):
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+        response = self.client.get(reverse('admin-analytics'), {'start_date': start_date.isoformat()})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_analytics_reports_partial_archived_months(self):
+        self._games(2)
+        archive_completed_games(archive_cutoff(1))
+        month_begins = self.played_at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        whole = self._analytics(month_begins)
+        self.assertEqual(whole['summary']['total_games'], 2)
+        self.assertEqual(whole['archived'], {
+            'granularity': 'month', 'first_month': self.month.isoformat(),
+            'last_month': self.month.isoformat(), 'partial_months': False,
+        })
+
+        # A period starting after the games still counts their whole month
+        partial = self._analytics(self.played_at + timedelta(days=1))
+        self.assertEqual(partial['summary']['total_games'], 2)
+        self.assertTrue(partial['archived']['partial_months'])
+
+    def test_analytics_counts_disconnected_games_live_and_archived(self):
+        self._games(1)
+        self._games(1, status='disconnected')
+        month_begins = self.played_at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        live = self._analytics(month_begins)
+        self.assertEqual(live['summary']['total_games'], 2)
+        self.assertEqual(live['summary']['total_wins'], 1)
+        self.assertEqual(live['summary']['total_wagered'], '2.00')
+        self.assertEqual(live['summary']['total_payouts'], '5.00')
+
+        archive_completed_games(archive_cutoff(1))
+        archived = self._analytics(month_begins)
+        self.assertEqual(archived['summary'], live['summary'])
+
+
+@override_settings(AUTH_USER_CACHE_SECONDS=60)
+class CookieAuthenticationTests(TestCase):
+    """CookieJWTAuthentication with the per-user field cache switched on."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cached', password='x')
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+
+    def balance(self):
+        with QueryRecorder().record() as recorder:
+            response = self.client.get(reverse('user-balance'))
+        return response, recorder
+
+    def test_cached_user_only_loads_the_profile(self):
+        self.assertEqual(self.balance()[0].status_code, 200)
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.id)))
+
+        response, recorder = self.balance()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(recorder.queries, 1, recorder.sql)
+        self.assertIn('FROM "api_profile"', recorder.sql[0])
+
+    def test_saving_the_user_invalidates_it(self):
+        self.balance()
+        self.user.is_staff = True
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.id)))
+
+    def test_bulk_deactivation_takes_effect_at_once(self):
+        self.balance()
+        # update() sends no post_save, so the cached fields still say active
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertTrue(cache.get(user_cache_key(self.user.id))['is_active'])
+
+        self.assertEqual(self.balance()[0].status_code, 401)
+        self.assertIsNone(cache.get(user_cache_key(self.user.id)))
+
+
+class ValidatedTokenCacheTests(TestCase):
+    def test_least_recently_used_token_is_evicted(self):
+        tokens = ValidatedTokenCache(max_size=2)
+        exp = time.time() + 60
+        tokens.set('a', {'exp': exp})
+        tokens.set('b', {'exp': exp})
+        tokens.get('a')
+        tokens.set('c', {'exp': exp})
+
+        self.assertIsNone(tokens.get('b'))
+        self.assertEqual(tokens.get('a'), {'exp': exp})
+        self.assertEqual(tokens.get('c'), {'exp': exp})
+
+    def test_expired_token_is_dropped(self):
+        tokens = ValidatedTokenCache(max_size=2)
+        tokens.set('old', {'exp': time.time() - 1})
+        self.assertIsNone(tokens.get('old'))
+        self.assertEqual(len(tokens._entries), 0)
+
+    def test_revocation_check_is_remembered_for_a_while(self):
+        tokens = ValidatedTokenCache(max_size=2)
+        self.assertTrue(tokens.revocation_check_due('uncached', 60))
+        tokens.set('a', {'exp': time.time() + 60})
+        self.assertTrue(tokens.revocation_check_due('a', 60))
+        self.assertFalse(tokens.revocation_check_due('a', 60))
+        self.assertTrue(tokens.revocation_check_due('a', 0))
+
+    @override_settings(AUTH_REVOCATION_CHECK_SECONDS=60)
+    def test_cached_token_skips_the_shared_cache(self):
+        user = User.objects.create_user('frequent')
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+        with mock.patch('api.authentication.cache', wraps=cache) as shared:
+            for _ in range(3):
+                self.assertEqual(self.client.get(reverse('user-balance')).status_code, 200)
+        # Only the first request, which validated the token, read the revocation list
+        self.assertEqual(shared.method_calls, [mock.call.get(mock.ANY)])
+
+    @override_settings(AUTH_REVOCATION_CHECK_SECONDS=0)
+    def test_revocation_checked_on_every_request_without_an_interval(self):
+        user = User.objects.create_user('checked')
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+        with mock.patch('api.authentication.cache', wraps=cache) as shared:
+            for _ in range(3):
+                self.assertEqual(self.client.get(reverse('user-balance')).status_code, 200)
+        self.assertEqual(shared.get.call_count, 3)
+
+    @override_settings(TOKEN_PRUNE_INTERVAL_SECONDS=0)
+    def test_logout_revokes_the_token_on_every_worker(self):
+        cache.clear()
+        user = User.objects.create_user('leaving', password='x')
+        access = str(RefreshToken.for_user(user).access_token)
+        self.client.cookies['access_token'] = access
+        self.assertEqual(self.client.get(reverse('user-balance')).status_code, 200)
+
+        self.assertEqual(self.client.post(reverse('logout')).status_code, 200)
+        # Another worker still holds the token in its own validated-token cache
+        self.client.cookies['access_token'] = access
+        validated_token_cache.set(access, AccessToken(access))
+        self.assertEqual(self.client.get(reverse('user-balance')).status_code, 401)
+
+
+class BlacklistFilterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('blacklisted', password='x')
+
+    def _blacklist(self, row_id, jti):
+        token = OutstandingToken.objects.create(
+            user=self.user, jti=jti, token=jti, expires_at=timezone.now() + timedelta(days=1)
+        )
+        BlacklistedToken.objects.create(id=row_id, token=token)
+
+    def test_rows_committed_out_of_id_order(self):
+        blacklist = BlacklistFilter(sync_seconds=0)
+        self._blacklist(1001, 'later')
+        self.assertTrue(blacklist.contains('later'))
+
+        # The row with the lower id commits after the filter read past it
+        self._blacklist(1000, 'earlier')
+        self.assertTrue(blacklist.contains('earlier'))
+        self.assertFalse(blacklist.contains('never'))
+
+
+class _TestBucket(TokenBucketThrottle):
+    rate = '3/min'
+
+    def get_cache_key(self, request, view):
+        return 'throttle-test'
+
+
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_buckets.clear()
+        self.now = time.time()
+
+    def allow(self, at):
+        with mock.patch('api.throttling.time.time', return_value=self.now + at):
+            throttle = _TestBucket()
+            return throttle.allow_request(None, None), throttle.wait()
+
+    def test_burst_then_refill(self):
+        self.assertEqual([self.allow(0)[0] for _ in range(3)], [True] * 3)
+        self.assertEqual(self.allow(0), (False, 20.0))
+        # 3/min refills a token every 20 seconds
+        self.assertEqual(self.allow(10)[0], False)
+        self.assertEqual(self.allow(20)[0], True)
+        self.assertEqual(self.allow(20)[0], False)
+        # A long pause refills the bucket to its capacity, not beyond
+        self.assertEqual([self.allow(600)[0] for _ in range(4)], [True, True, True, False])
+
+    def test_cache_outage_keeps_limiting_per_worker(self):
+        broken = mock.Mock(**{'get.side_effect': ConnectionError, 'set.side_effect': ConnectionError})
+        with mock.patch.object(TokenBucketThrottle, 'cache', broken), self.assertLogs('api.throttling', 'WARNING'):
+            self.assertEqual([self.allow(0)[0] for _ in range(4)], [True, True, True, False])
+
+    @override_settings(THROTTLE_CACHE_ALIAS='throttle', CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle'},
+    })
+    def test_separate_cache_alias(self):
+        self.allow(0)
+        self.assertIsNotNone(caches['throttle'].get('throttle-test'))
+        self.assertIsNone(cache.get('throttle-test'))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class RegistrationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_password_is_hashed_outside_the_transaction(self):
+        outer_blocks = len(connection.atomic_blocks)
+        hashed_in = []
+
+        def make_password(password):
+            hashed_in.append(len(connection.atomic_blocks))
+            return real_make_password(password)
+
+        with mock.patch('api.views.make_password', make_password):
+            response = self.client.post(
+                reverse('register'), {'username': 'newcomer', 'password': 'pw-12345'}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(hashed_in, [outer_blocks])
+
+        user = User.objects.get(username='newcomer')
+        self.assertTrue(user.check_password('pw-12345'))
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+
+    def test_duplicate_username(self):
+        User.objects.create_user('taken', password='x')
+        response = self.client.post(
+            reverse('register'), {'username': 'taken', 'password': 'pw'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class MoneyTests(TestCase):
+    def test_to_cents_is_exact(self):
+        for value, cents in [
+            ('10', 1000), ('0.01', 1), ('-1.5', -150), (5, 500), (0.1, 10),
+            (Decimal('1.10'), 110), (Decimal('1.2300'), 123), ('1e2', 10000),
+        ]:
+            with self.subTest(value=value):
+                self.assertEqual(to_cents(value), cents)
+
+    def test_to_cents_rejects_rounding_and_non_numbers(self):
+        for value in ['1.005', '0.001', 1.005, 'abc', '', None, True, 'NaN', 'Infinity', float('inf'), [1]]:
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                to_cents(value)
+
+    def test_format_cents(self):
+        for cents, text in [(0, '0.00'), (5, '0.05'), (120, '1.20'), (-5, '-0.05'), (-120, '-1.20'),
+                            (123456, '1234.56'), (BetValidator.MAX_BET, '9999999999.99')]:
+            with self.subTest(cents=cents):
+                self.assertEqual(format_cents(cents), text)
+
+    def test_format_bps_keeps_two_to_four_decimals(self):
+        for bps, text in [(0, '0.00'), (1, '0.0001'), (ONE_X, '1.00'), (28000, '2.80'), (11250, '1.125'),
+                          (11314, '1.1314'), (500_000, '50.00'), (51_000_000_000, '5100000.00')]:
+            with self.subTest(bps=bps):
+                self.assertEqual(format_bps(bps), text)
+
+    def test_to_bps_rounds_half_up(self):
+        for multiplier, bps in [(1, ONE_X), (2.8, 28000), ('1.13144', 11314), ('1.13145', 11315),
+                                (Decimal('0.00005'), 1), (Decimal('0.000049'), 0)]:
+            with self.subTest(multiplier=multiplier):
+                self.assertEqual(to_bps(multiplier), bps)
+
+    def test_payout_cents_rounds_down(self):
+        for bet, bps, payout in [
+            (1000, 11314, 1131),    # 1131.4 cents
+            (1, 19999, 1),          # 1.9999 cents
+            (1, 9999, 0),           # Less than a cent is kept by the house
+            (333, 30000, 999),      # Exact
+            (0, 28000, 0),
+            (1000, 0, 0),
+            (BetValidator.MAX_BET, 51_000_000_000, BetValidator.MAX_BET * 5_100_000),  # No float overflow
+        ]:
+            with self.subTest(bet=bet, bps=bps):
+                self.assertEqual(payout_cents(bet, bps), payout)
+
+
+class BetValidatorTests(TestCase):
+    def assertInvalid(self, bet_input, message, balance=None):
+        is_valid, error, bet_cents = BetValidator.validate_bet_amount(bet_input, balance)
+        self.assertFalse(is_valid)
+        self.assertIn(message, error)
+        self.assertIsNone(bet_cents)
+
+    def test_valid_bets_in_cents(self):
+        for bet_input, cents in [('0.01', 1), ('10', 1000), ('1.5', 150), (5, 500), (Decimal('2.50'), 250),
+                                 ('9999999999.99', BetValidator.MAX_BET)]:
+            with self.subTest(bet_input=bet_input):
+                self.assertEqual(BetValidator.validate_bet_amount(bet_input), (True, None, cents))
+
+    def test_bounds(self):
+        self.assertInvalid(None, "required")
+        for bet_input in ['-1', '-0.01', -5]:
+            with self.subTest(bet_input=bet_input):
+                self.assertInvalid(bet_input, "cannot be negative")
+        for bet_input in ['0', '0.00', '0.009']:
+            with self.subTest(bet_input=bet_input):
+                self.assertInvalid(bet_input, "at least $0.01")
+        for bet_input in ['10000000000', '9999999999.991', '1e20']:
+            with self.subTest(bet_input=bet_input):
+                self.assertInvalid(bet_input, "cannot exceed $9999999999.99")
+
+    def test_precision(self):
+        for bet_input in ['1.005', '10.123', 0.015, Decimal('2.0001')]:
+            with self.subTest(bet_input=bet_input):
+                self.assertInvalid(bet_input, "maximum 2 decimal places")
+
+    def test_not_a_number(self):
+        for bet_input in ['abc', '', 'NaN', 'Infinity', '-Infinity', [], {}]:
+            with self.subTest(bet_input=bet_input):
+                self.assertInvalid(bet_input, "valid number")
+
+    def test_balance(self):
+        self.assertEqual(BetValidator.validate_bet_amount('10.00', 1000), (True, None, 1000))
+        self.assertInvalid('10.01', "Insufficient balance (you have $10.00)", balance=1000)
+
+
+class MinesSimulationTests(TestCase):
+    def setUp(self):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest("simulate_mines needs NumPy")
+
+    def test_payouts_round_like_a_cashout(self):
+        from api.simulation_utils import payout_table, run_simulations
+
+        # One safe tile with one mine is 1.03125x: 5.15 cents, paid as 5
+        game = MinesGame(bet_amount=5, current_multiplier=to_bps(calculate_multiplier(1, 1)))
+        self.assertEqual(payout_table(1, 5)[1], cashout_amounts(game)[0])
+
+        result, = run_simulations([1], ['fixed:1'], 20_000, seed=1, bet=5)
+        self.assertEqual(result.max_payout, 5)
+        self.assertAlmostEqual(result.expected_rtp, 24 / 25)
+
+
+class VerifyGamesTests(TestCase):
+    SERVER_SEED = 'ab' * 32
+
+    def setUp(self):
+        cache.clear()
+
+    def verify(self, games):
+        return self.client.post(reverse('verify'), {'games': games}, content_type='application/json')
+
+    def test_outcomes_match_the_games(self):
+        response = self.verify([
+            {'game': 'mines', 'server_seed': self.SERVER_SEED, 'client_seed': 'c', 'nonce': 3, 'mines_count': 5},
+            {'game': 'keno', 'server_seed': self.SERVER_SEED, 'client_seed': 'c', 'nonce': 4, 'numbers_selected': [7]},
+        ])
+        self.assertEqual(response.status_code, 200)
+        mines, keno = response.json()['results']
+
+        self.assertEqual(mines['server_seed_hash'], hash_seed(self.SERVER_SEED))
+        self.assertEqual(mines['mine_positions'], generate_mine_positions(self.SERVER_SEED, 'c', 3, 5))
+
+        drawn = draw_keno_numbers(self.SERVER_SEED, 'c', 4)
+        matches = calculate_matches([7], drawn)
+        self.assertEqual((keno['drawn_numbers'], keno['matches']), (drawn, matches))
+        # Formatted like the Keno views, e.g. "0.40" or "2.80", never "0.4"
+        self.assertEqual(keno['multiplier'], format_bps(to_bps(calculate_keno_multiplier(1, matches))))
+
+    def test_mixed_batch_reports_errors_in_place(self):
+        response = self.verify([
+            {'game': 'mines', 'server_seed': self.SERVER_SEED, 'client_seed': 'c', 'nonce': 0, 'mines_count': 25},
+            {'game': 'keno', 'server_seed': self.SERVER_SEED, 'client_seed': 'c', 'nonce': 0},
+            'not an object',
+            {'game': 'dice', 'server_seed': self.SERVER_SEED, 'client_seed': 'c', 'nonce': 0},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), 4)
+        self.assertIn('mines_count', results[0]['error'])
+        self.assertEqual(len(results[1]['drawn_numbers']), 10)
+        self.assertIn('error', results[2])
+        self.assertIn('error', results[3])
+
+    def test_malformed_keno_selections(self):
+        item = {'game': 'keno', 'server_seed': self.SERVER_SEED, 'client_seed': 'c', 'nonce': 0}
+        selections = [[[1], [2]], [{'n': 1}], [1, '2'], [1, 2.0], [1, True], [1, None], [1, 1], [0], [41], []]
+        response = self.verify([{**item, 'numbers_selected': selection} for selection in selections])
+        self.assertEqual(response.status_code, 200)
+        for selection, result in zip(selections, response.json()['results']):
+            with self.subTest(selection=selection):
+                self.assertIn('numbers_selected', result['error'])
+
+    @override_settings(VERIFY_MAX_ITEMS=2)
+    def test_malformed_requests(self):
+        item = {'game': 'keno', 'server_seed': self.SERVER_SEED, 'client_seed': 'c', 'nonce': 0}
+        self.assertEqual(self.verify([]).status_code, 400)
+        self.assertEqual(self.verify([item] * 3).status_code, 400)
+        self.assertEqual(self.client.post(reverse('verify'), [item], content_type='application/json').status_code, 400)
+
+
+@override_settings(MINES_REAP_INTERVAL_SECONDS=0, DEFERRED_TASK_WORKERS=0)
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('idem_player', password='x')
+        Profile.objects.filter(user=self.user).update(balance=10_000)
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+
+    def start(self, key, bet='1.00'):
+        return self.client.post(
+            reverse('mines-start'), {'bet_amount': bet, 'mines_count': 3},
+            content_type='application/json', HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def balance(self):
+        return Profile.objects.get(user=self.user).balance
+
+    def test_cache_is_shared_between_workers(self):
+        self.assertNotIsInstance(caches[settings.IDEMPOTENCY_CACHE_ALIAS], LocMemCache)
+
+    def test_retry_replays_the_response(self):
+        first = self.start('retry-1')
+        second = self.start('retry-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(MinesGame.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self.balance(), 9_900)
+
+    def test_retry_while_first_is_running(self):
+        key = idempotency_cache_key(self.user.id, 'StartMinesGameView', 'busy')
+        caches[settings.IDEMPOTENCY_CACHE_ALIAS].set(key, IN_FLIGHT)
+        self.assertEqual(self.start('busy').status_code, 409)
+        self.assertFalse(MinesGame.objects.filter(user=self.user).exists())
+
+    def test_key_reused_for_a_different_request(self):
+        self.assertEqual(self.start('reused').status_code, 201)
+        self.assertEqual(self.start('reused', bet='2.00').status_code, 422)
+        self.assertEqual(self.balance(), 9_900)
+
+
+@override_settings(MINES_REAP_INTERVAL_SECONDS=0, DEFERRED_TASK_WORKERS=0)
+class ReaperTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reaper_player', password='x')
+        Profile.objects.filter(user=self.user).update(balance=10_000)
+
+    def abandoned_game(self, revealed=(3, 4)):
+        stale = timezone.now() - timedelta(hours=1)
+        return MinesGame.objects.create(
+            user=self.user, bet_amount=1_000, mines_count=3, server_seed_bytes=bytes(32), client_seed='c',
+            nonce=0, mine_positions=[0, 1, 2], revealed_tiles=list(revealed),
+            current_multiplier=to_bps(calculate_multiplier(len(revealed), 3)) if revealed else ONE_X,
+            created_at=stale, last_action_at=stale,
+        )
+
+    def balance(self):
+        return Profile.objects.get(user=self.user).balance
+
+    def test_cashout_policy_pays_the_current_multiplier(self):
+        game = self.abandoned_game()
+        payout, _ = cashout_amounts(game)
+        self.assertEqual(reap_abandoned_mines_games(idle_seconds=60, policy='cashout'), 1)
+        game.refresh_from_db()
+        self.assertEqual((game.status, game.payout_amount), ('disconnected', payout))
+        self.assertEqual(self.balance(), 10_000 + payout)
+        self.assertTrue(BetRecord.objects.filter(game_type='mines', game_id=game.pk, status='disconnected').exists())
+
+    def test_cashout_policy_refunds_unrevealed_games(self):
+        game = self.abandoned_game(revealed=())
+        reap_abandoned_mines_games(idle_seconds=60, policy='cashout')
+        game.refresh_from_db()
+        self.assertEqual((game.payout_amount, game.net_profit), (1_000, 0))
+        self.assertEqual(self.balance(), 11_000)
+
+    def test_forfeit_policy_keeps_the_bet(self):
+        game = self.abandoned_game()
+        reap_abandoned_mines_games(idle_seconds=60, policy='forfeit')
+        game.refresh_from_db()
+        self.assertEqual((game.status, game.payout_amount, game.net_profit), ('disconnected', 0, -1_000))
+        self.assertEqual(self.balance(), 10_000)
+
+    def test_recent_activity_is_not_reaped(self):
+        game = self.abandoned_game()
+        MinesGame.objects.filter(pk=game.pk).update(last_action_at=timezone.now())
+        self.assertEqual(reap_abandoned_mines_games(idle_seconds=60), 0)
+        self.assertEqual(MinesGame.objects.get(pk=game.pk).status, 'active')
+
+    def test_credit_is_kept_when_a_bet_loaded_the_balance_before_it(self):
+        # The bet request has read the profile (authentication) when the reaper
+        # pays out; the bet must debit the new balance, not the one it read
+        game = self.abandoned_game()
+        payout, _ = cashout_amounts(game)
+        validate = BetValidator.validate_bet_amount
+
+        def reap_then_validate(*args):
+            reap_abandoned_mines_games(idle_seconds=60, policy='cashout')
+            return validate(*args)
+
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+        with mock.patch('api.views.BetValidator.validate_bet_amount', side_effect=reap_then_validate):
+            response = self.client.post(
+                reverse('keno-start'), {'bet_amount': '1.00', 'numbers_selected': [1]}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 201)
+        keno = KenoGame.objects.get(user=self.user)
+        self.assertEqual(self.balance(), 10_000 + payout - 100 + keno.payout_amount)
+        self.assertEqual(response.json()['balance'], format_cents(self.balance()))
+
+    def test_batches_skip_locked_games(self):
+        if not connection.features.has_select_for_update_skip_locked:
+            self.skipTest("SKIP LOCKED is not supported by this database")
+        self.abandoned_game()
+        with CaptureQueriesContext(connection) as queries:
+            reap_abandoned_mines_games(idle_seconds=60)
+        self.assertTrue(any('SKIP LOCKED' in query['sql'] for query in queries))
+
+
+@override_settings(MINES_REAP_INTERVAL_SECONDS=0, DEFERRED_TASK_WORKERS=0)
+class LeaderboardRankTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.month = timezone.localdate().replace(day=1)
+        # Ties are broken by user id, so p1, p2 and p3 (created in that order) rank 2nd to 4th
+        cls.players = []
+        for name, balance, wagered in [('p0', 50000, 900), ('p1', 30000, 500), ('p2', 30000, 500),
+                                       ('p3', 30000, 500), ('p4', 10000, 100), ('p5', 5000, 0)]:
+            user = User.objects.create_user(name)
+            Profile.objects.filter(user=user).update(balance=balance)
+            PlayerMonthlyTotals.objects.create(user=user, month=cls.month, total_wagered=wagered)
+            cls.players.append(user)
+        # Deactivated players are off the boards, even ahead of everyone or inside a tie
+        for name, balance in [('gone', 99999), ('gone_tied', 30000)]:
+            user = User.objects.create_user(name, is_active=False)
+            Profile.objects.filter(user=user).update(balance=balance)
+            PlayerMonthlyTotals.objects.create(user=user, month=cls.month, total_wagered=balance)
+
+    def window(self, player, neighbours=2, category='balance'):
+        rank, entries = rank_window(category, self.month, player.id, neighbours)
+        return rank, [(entry['rank'], entry['username']) for entry in entries]
+
+    def test_top_of_the_board(self):
+        self.assertEqual(self.window(self.players[0]), (1, [(1, 'p0'), (2, 'p1'), (3, 'p2')]))
+
+    def test_ties(self):
+        self.assertEqual(
+            self.window(self.players[2]), (3, [(1, 'p0'), (2, 'p1'), (3, 'p2'), (4, 'p3'), (5, 'p4')])
+        )
+        self.assertEqual(self.window(self.players[3], neighbours=1), (4, [(3, 'p2'), (4, 'p3'), (5, 'p4')]))
+
+    def test_bottom_of_the_board(self):
+        self.assertEqual(self.window(self.players[5]), (6, [(4, 'p3'), (5, 'p4'), (6, 'p5')]))
+        self.assertEqual(self.window(self.players[5], neighbours=0), (6, [(6, 'p5')]))
+
+    def test_monthly_board_leaves_out_players_without_a_value(self):
+        self.assertEqual(self.window(self.players[4], category='total_wagered'),
+                         (5, [(3, 'p2'), (4, 'p3'), (5, 'p4')]))
+        self.assertEqual(self.window(self.players[5], category='total_wagered'), (None, []))
+        self.assertEqual(rank_window('total_wagered', self.month.replace(year=self.month.year - 1),
+                                     self.players[0].id, 2), (None, []))
+
+    def test_deactivated_player_has_no_rank(self):
+        gone = User.objects.get(username='gone')
+        self.assertEqual(self.window(gone), (None, []))
+
+    def test_ranks_match_top_entries(self):
+        for category in ('balance', 'total_wagered'):
+            top = top_entries(category, self.month, 50)
+            for entry in top:
+                with self.subTest(category=category, username=entry['username']):
+                    user = User.objects.get(username=entry['username'])
+                    rank, (mine,) = rank_window(category, self.month, user.id, 0)
+                    self.assertEqual((rank, mine), (entry['rank'], entry))
+
+
+class CooldownRewardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reward_player', password='x')
+        Profile.objects.filter(user=self.user).update(balance=10_000)
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+        self.reward = get_reward('daily')
+
+    def claim(self):
+        return self.client.post(reverse('claim-daily-reward'))
+
+    def balance(self):
+        return Profile.objects.get(user=self.user).balance
+
+    def test_second_claim_is_refused(self):
+        self.assertEqual(self.claim().status_code, 200)
+        second = self.claim()
+        self.assertEqual(second.status_code, 400)
+        self.assertGreater(second.json()['time_remaining'], 0)
+        self.assertEqual(self.balance(), 10_000 + self.reward.amount)
+
+    def test_status_reads_the_profile(self):
+        self.claim()
+        # Cleared directly in the database, as another worker's claim or an admin would
+        Profile.objects.filter(user=self.user).update(last_daily_claim=None)
+        response = self.client.get(reverse('claim-daily-reward'))
+        self.assertTrue(response.json()['can_claim'])
+
+    def test_claim_is_one_returning_update(self):
+        if not connection.features.can_return_columns_from_insert:
+            self.skipTest("UPDATE ... RETURNING is not supported by this database")
+        with CaptureQueriesContext(connection) as queries:
+            claimed, new_balance, _ = claim_reward(self.reward, self.user)
+        self.assertTrue(claimed)
+        self.assertEqual(new_balance, 10_000 + self.reward.amount)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('RETURNING', queries[0]['sql'])
+        self.assertEqual(claim_reward(self.reward, self.user)[:2], (False, None))
+
+    def test_claim_without_returning(self):
+        with mock.patch.object(connection.features, 'can_return_columns_from_insert', False):
+            self.assertEqual(claim_reward(self.reward, self.user)[:2], (True, 10_000 + self.reward.amount))
+            self.assertEqual(claim_reward(self.reward, self.user)[:2], (False, None))
+        self.assertEqual(self.balance(), 10_000 + self.reward.amount)
+
+    def test_claim_during_a_bet_is_kept(self):
+        validate = BetValidator.validate_bet_amount
+
+        def claim_then_validate(*args):
+            claim_reward(self.reward, User.objects.get(pk=self.user.pk))
+            return validate(*args)
+
+        with mock.patch('api.views.BetValidator.validate_bet_amount', side_effect=claim_then_validate):
+            response = self.client.post(
+                reverse('keno-start'), {'bet_amount': '1.00', 'numbers_selected': [1]}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 201)
+        keno = KenoGame.objects.get(user=self.user)
+        self.assertEqual(self.balance(), 10_000 + self.reward.amount - 100 + keno.payout_amount)
+
+
+@override_settings(MINES_REAP_INTERVAL_SECONDS=0, DEFERRED_TASK_WORKERS=0)
+class SessionBootstrapTests(TestCase):
+    ENDPOINTS = {
+        'user': 'current-user',
+        'balance': 'user-balance',
+        'seed_info': 'mines-seed-info',
+        'mines_active': 'mines-active',
+        'keno_active': 'keno-active',
+        'mines_stats': 'mines-stats',
+        'keno_stats': 'keno-stats',
+        'daily_reward': 'claim-daily-reward',
+        'ad_reward': 'check-ad-reward',
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('bootstrap_player', password='x')
+        Profile.objects.filter(user=self.user).update(balance=10_000)
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+        self.client.post(reverse('mines-start'), {'bet_amount': '1.00', 'mines_count': 3}, content_type='application/json')
+
+    def bootstrap(self, **params):
+        with QueryRecorder().record() as recorder:
+            response = self.client.get(reverse('session-bootstrap'), params)
+        return response, recorder
+
+    def test_sections_match_their_endpoints(self):
+        response, recorder = self.bootstrap()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), set(self.ENDPOINTS))
+        for section, route in self.ENDPOINTS.items():
+            with self.subTest(section=section):
+                self.assertEqual(data[section], self.client.get(reverse(route)).json())
+        # Authentication (with the profile), the seed pair and the two active game lookups
+        self.assertEqual(recorder.queries, 4)
+
+    def test_fields_limit_sections_and_queries(self):
+        response, recorder = self.bootstrap(fields='user,balance,mines_stats')
+        self.assertEqual(set(response.json()), {'user', 'balance', 'mines_stats'})
+        self.assertEqual(recorder.queries, 1)
+
+    def test_unknown_field(self):
+        response, _ = self.bootstrap(fields='user,wallet')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('wallet', response.json()['error'])
+
+
+@override_settings(MINES_REAP_INTERVAL_SECONDS=0, DEFERRED_TASK_WORKERS=0)
+class StateETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('etag_player', password='x')
+        Profile.objects.filter(user=self.user).update(balance=10_000)
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+
+    def stats(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse('keno-stats'), **headers)
+
+    def test_unchanged_state_gets_304(self):
+        first = self.stats()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'private, no-cache')
+
+        second = self.stats(first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+        self.assertEqual(second['ETag'], first['ETag'])
+        # Weak validators and lists match too
+        self.assertEqual(self.stats(f'"other", W/{first["ETag"]}').status_code, 304)
+
+    def test_changes_give_a_new_etag(self):
+        etag = self.stats()['ETag']
+        self.client.post(
+            reverse('keno-start'), {'bet_amount': '1.00', 'numbers_selected': [1]}, content_type='application/json'
+        )
+        response = self.stats(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etags_differ_per_view_and_user(self):
+        etag = self.stats()['ETag']
+        self.assertEqual(self.client.get(reverse('mines-stats'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        other = User.objects.create_user('etag_other', password='x')
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(other).access_token)
+        self.assertEqual(self.stats(etag).status_code, 200)
+
+
+class ORJSONRendererTests(TestCase):
+    def assertSameBytes(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_parity_with_json_renderer(self):
+        payloads = {
+            'decimals': [Decimal('1.10'), Decimal('0'), Decimal('-12.345'), Decimal('0.00001'), Decimal('1E+20')],
+            'floats': [1.5, 0.1 + 0.2, 5.55e-17, 1e-5, -0.0],
+            'datetimes': [
+                timezone.now(),
+                datetime(2026, 1, 2, 3, 4, 5, 678901),
+                datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+                date(2026, 1, 2),
+                dt_time(3, 4, 5, 600),
+                timedelta(days=1, seconds=5),
+            ],
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy("Bet amount is required"),
+            'non_ascii': ["Zoë", "Crown 👑", "日本語", "\u2028line\u2029para", "é" * 3],
+            'strings': ["", "e-5", '"quoted" \\ back\\slash', "\x00\x1f"],
+            'ints': [0, -1, 2 ** 63 - 1, 2 ** 64, -(2 ** 63) - 1],
+            'nested': {'a': [{'b': None}, True, False], 'empty': {}, 'list': []},
+            'non_string_keys': {1: 'one', 2.5: 'two'},
+        }
+        for key, value in payloads.items():
+            with self.subTest(key=key):
+                self.assertSameBytes({key: value})
+        self.assertSameBytes(payloads)
+        self.assertSameBytes(None)
+        self.assertSameBytes([])
+
+    def test_common_payloads_skip_the_fallback(self):
+        # A fixed id: a random one can contain "e-", which sends the payload to the fallback
+        data = {'amount': Decimal('1.10'), 'when': timezone.now(), 'id': uuid.UUID('12345678-1234-5678-1234-567812345678'), 'name': "Zoë 👑\u2028"}
+        expected = JSONRenderer().render(data)
+        with mock.patch.object(JSONRenderer, 'render') as fallback:
+            self.assertEqual(ORJSONRenderer().render(data), expected)
+        fallback.assert_not_called()
+
+    def test_invalid_values_fail_like_json_renderer(self):
+        for value in [Decimal('NaN'), Decimal('Infinity'), object()]:
+            with self.subTest(value=value):
+                with self.assertRaises((TypeError, ValueError)) as expected:
+                    JSONRenderer().render({'value': value})
+                with self.assertRaises(type(expected.exception)):
+                    ORJSONRenderer().render({'value': value})
+
+
+class ORJSONParserTests(TestCase):
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(BytesIO(body), 'application/json', {'encoding': encoding})
+
+    def test_parity_with_json_parser(self):
+        for body in [
+            b'{"bet_amount": "1.10", "mines_count": 3}',
+            b'[1, 2.5, -0.0, 1e-5, true, false, null]',
+            b'{"n": 123456789012345678901234567890}',
+            b'{"name": "Zo\\u00eb \\ud83d\\udc51"}',
+            '{"raw": "Zoë 👑 日本語"}'.encode(),
+            b'{"lone": "\\ud800"}',
+            b'"text"',
+            b'1e999',
+        ]:
+            with self.subTest(body=body):
+                self.assertEqual(self.parse(ORJSONParser(), body), self.parse(JSONParser(), body))
+        self.assertEqual(self.parse(ORJSONParser(), '{"name": "Zoë"}'.encode('latin-1'), 'latin-1'), {'name': 'Zoë'})
+
+    def test_malformed_bodies_raise_parse_error(self):
+        for body in [b'', b'{', b'{"a": 1,}', b"{'a': 1}", b'[1, 2', b'NaN', b'{"a": Infinity}',
+                     b'\xff\xfe{}', b'{"a": "\xff"}', b'{} {}']:
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(JSONParser(), body)
+                with self.assertRaises(ParseError):
+                    self.parse(ORJSONParser(), body)
+
+    def test_malformed_request_is_a_400(self):
+        response = self.client.post(reverse('register'), b'{"username": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+
+class RequestProfilerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        override = override_settings(PROFILER_DIR=self.output_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def login(self, **fields):
+        user = User.objects.create_user('profiled', password='x', **fields)
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+
+    def get(self, **headers):
+        return self.client.get(reverse('keno-stats'), **headers)
+
+    def test_staff_request_is_profiled(self):
+        self.login(is_staff=True)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(HTTP_X_PROFILE_REQUEST='1')
+        self.assertEqual(response.status_code, 200)
+
+        profile_id = response['X-Profile-Id']
+        with open(os.path.join(self.output_dir, f'{profile_id}.json')) as f:
+            summary = json.load(f)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, f'{profile_id}.collapsed')))
+        # The middleware's staff check and the view share one authentication,
+        # which ran before profiling started
+        self.assertEqual(sum('"auth_user"' in query['sql'] for query in queries), 1)
+        self.assertEqual((summary['status'], summary['sql_count']), (200, len(queries) - 1))
+
+    def test_switch_interval_is_left_alone(self):
+        self.login(is_staff=True)
+        switch_interval = sys.getswitchinterval()
+        with mock.patch('sys.setswitchinterval') as set_switch_interval:
+            self.get(HTTP_X_PROFILE_REQUEST='1')
+        set_switch_interval.assert_not_called()
+        self.assertEqual(sys.getswitchinterval(), switch_interval)
+
+    def test_other_requests_are_not_profiled(self):
+        self.login()
+        self.assertNotIn('X-Profile-Id', self.get(HTTP_X_PROFILE_REQUEST='1'))
+        self.client.cookies.pop('access_token')
+        self.assertNotIn('X-Profile-Id', self.get(HTTP_X_PROFILE_REQUEST='1'))
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_staff_requests_without_the_header(self):
+        self.login(is_staff=True)
+        self.assertNotIn('X-Profile-Id', self.get())
+
+
+class HealthCheckTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def readyz(self):
+        response = self.client.get('/readyz')
+        return response.status_code, response.json()
+
+    def failing_readyz(self):
+        # Failure details go to the log, never into the response
+        with self.assertLogs('api.health', 'WARNING'):
+            return self.readyz()
+
+    def test_healthz_needs_nothing(self):
+        with mock.patch('api.health.check_database', side_effect=RuntimeError("down")), \
+                self.assertNumQueries(0):
+            response = self.client.get('/healthz', HTTP_HOST='probe.internal')
+        self.assertEqual((response.status_code, response.json()), (200, {'status': 'ok'}))
+
+    def test_ready(self):
+        status_code, body = self.readyz()
+        self.assertEqual(status_code, 200)
+        self.assertEqual(body, {
+            'status': 'ready', 'checks': {'database': 'ok', 'token_blacklist': 'ok', 'cache': 'ok'},
+        })
+
+    def test_database_down(self):
+        with mock.patch.dict(READINESS_CHECKS, database=(mock.Mock(side_effect=RuntimeError("down")), True)):
+            status_code, body = self.failing_readyz()
+        self.assertEqual(status_code, 503)
+        self.assertEqual((body['status'], body['checks']['database']), ('unavailable', 'error'))
+
+    def test_blacklist_not_loadable(self):
+        with mock.patch('api.health.blacklist_filter') as blacklist:
+            blacklist.is_warm = False
+            blacklist.contains.side_effect = RuntimeError("no table")
+            status_code, body = self.failing_readyz()
+        self.assertEqual((status_code, body['checks']['token_blacklist']), (503, 'error'))
+
+    def test_cache_down_is_not_fatal(self):
+        with mock.patch('api.health.cache') as broken:
+            broken.set.side_effect = ConnectionError("refused")
+            status_code, body = self.failing_readyz()
+        self.assertEqual(status_code, 200)
+        self.assertEqual((body['status'], body['checks']['cache']), ('ready', 'error'))
+
+        with mock.patch('api.health.cache') as forgetful:
+            forgetful.get.return_value = None
+            self.assertEqual(self.failing_readyz()[1]['checks']['cache'], 'error')
+
+
+# Test handlers: each call records its label, and fails while _flaky_failures
+# still counts failures for it
+_handled_labels = []
+_flaky_failures = {}
+
+
+@deferred_task('test_record')
+def _record_label(profile, label):
+    if _flaky_failures.get(label, 0) > 0:
+        _flaky_failures[label] -= 1
+        raise RuntimeError(f"{label} failed")
+    _handled_labels.append(label)
+
+
+@override_settings(DEFERRED_TASK_WORKERS=0, DEFERRED_TASK_MAX_ATTEMPTS=3)
+class DeferredTaskTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('deferred_player', password='x')
+        _handled_labels.clear()
+        _flaky_failures.clear()
+        retry = mock.patch('api.deferred._schedule_retry')
+        self.schedule_retry = retry.start()
+        self.addCleanup(retry.stop)
+
+    def enqueue(self, *labels, user=None):
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            for label in labels:
+                enqueue('test_record', (user or self.user).id, label=label)
+
+    def make_due(self):
+        DeferredTask.objects.update(run_after=timezone.now())
+
+    def test_tasks_run_in_order_after_commit(self):
+        self.enqueue('a', 'b', 'c')
+        self.assertEqual(_handled_labels, ['a', 'b', 'c'])
+        self.assertFalse(DeferredTask.objects.exists())
+
+    def test_failure_backs_off_and_holds_later_tasks(self):
+        _flaky_failures['a'] = 1
+        before = timezone.now()
+        with self.assertLogs('api.deferred', 'WARNING'):
+            self.enqueue('a', 'b')
+
+        self.assertEqual(_handled_labels, [])
+        failed = DeferredTask.objects.order_by('id').first()
+        self.assertEqual((failed.attempts, failed.status), (1, 'pending'))
+        self.assertIn('a failed', failed.last_error)
+        self.assertGreaterEqual(failed.run_after, before + timedelta(seconds=2))
+        # Each commit callback drained, and each found the first task waiting
+        self.assertAlmostEqual(self.schedule_retry.call_args.args[1], 2, delta=1)
+
+        # Not due yet: nothing runs
+        self.assertEqual(drain_user(self.user.id), 0)
+        self.make_due()
+        self.assertEqual(drain_user(self.user.id), 2)
+        self.assertEqual(_handled_labels, ['a', 'b'])
+
+    def test_retry_delay_grows_to_a_cap(self):
+        self.assertEqual([_retry_delay(attempts) for attempts in (1, 2, 3)], [2, 4, 8])
+        self.assertEqual(_retry_delay(20), MAX_RETRY_DELAY_SECONDS)
+
+    def test_gives_up_after_max_attempts(self):
+        _flaky_failures['a'] = 99
+        with self.assertLogs('api.deferred', 'WARNING') as logs:
+            self.enqueue('a', 'b')
+            for _ in range(2):
+                self.make_due()
+                drain_user(self.user.id)
+        self.assertIn('failed for good', logs.output[-1])
+
+        self.assertEqual(DeferredTask.objects.get().status, 'failed')
+        self.assertEqual(_handled_labels, ['b'])
+
+    def test_profile_is_not_locked_while_handlers_run(self):
+        select_for_update = QuerySet.select_for_update
+        locked = []
+
+        def record(queryset, *args, **kwargs):
+            locked.append(queryset.model)
+            return select_for_update(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=record):
+            self.enqueue('a')
+        self.assertEqual(_handled_labels, ['a'])
+        self.assertNotIn(Profile, locked)
+
+    def test_command_processes_leftovers(self):
+        other = User.objects.create_user('deferred_other', password='x')
+        # As if the process died before draining
+        DeferredTask.objects.bulk_create([
+            DeferredTask(user=self.user, name='test_record', payload={'label': 'a'}),
+            DeferredTask(user=other, name='test_record', payload={'label': 'b'}),
+            DeferredTask(user=self.user, name='test_record', payload={'label': 'c'}),
+            DeferredTask(user=other, name='test_record', payload={'label': 'later'},
+                         run_after=timezone.now() + timedelta(minutes=5)),
+        ])
+        out = StringIO()
+        call_command('process_deferred_tasks', stdout=out)
+        self.assertIn('Completed 3 deferred tasks', out.getvalue())
+        self.assertEqual(sorted(_handled_labels), ['a', 'b', 'c'])
+        self.assertLess(_handled_labels.index('a'), _handled_labels.index('c'))
+        self.assertEqual(DeferredTask.objects.get().payload, {'label': 'later'})
+
+
+class SyntheticDataTests(TestCase):
+    OPTIONS = ['--users', '6', '--games-per-user', '10', '--until', '2026-01-31', '--months', '3']
+
+    def generate(self, prefix, *options):
+        call_command('generate_synthetic_data', *self.OPTIONS, '--prefix', prefix, *options, stdout=StringIO())
+
+    def snapshot(self, prefix):
+        """Every generated row with its user's index in place of ids, in a stable order."""
+        def rows(model, *fields):
+            queryset = model.objects.filter(user__username__startswith=prefix)
+            return sorted(
+                (username.removeprefix(prefix), *values)
+                for username, *values in queryset.values_list('user__username', *fields)
+            )
+
+        game_fields = ('nonce', 'bet_amount', 'server_seed_bytes', 'client_seed', 'status', 'payout_amount', 'created_at')
+        return {
+            'profiles': rows(Profile, 'balance', 'mines_nonce'),
+            'seed_pairs': rows(SeedPair, 'server_seed', 'client_seed'),
+            'mines': rows(MinesGame, *game_fields, 'mine_positions', 'revealed_tiles'),
+            'keno': rows(KenoGame, *game_fields, 'numbers_selected', 'drawn_numbers'),
+            'monthly': rows(PlayerMonthlyTotals, 'month', 'total_wagered', 'biggest_win'),
+        }
+
+    def test_same_seed_same_rows_whatever_the_batch_size(self):
+        self.generate('first_', '--seed', '7', '--batch-size', '5000')
+        self.generate('second_', '--seed', '7', '--batch-size', '3')
+        first = self.snapshot('first_')
+        self.assertTrue(first['mines'] and first['keno'])
+        self.assertEqual(self.snapshot('second_'), first)
+
+    def test_other_seed_other_rows(self):
+        self.generate('first_', '--seed', '7')
+        self.generate('other_', '--seed', '8')
+        self.assertNotEqual(self.snapshot('other_')['profiles'], self.snapshot('first_')['profiles'])
+
+    def test_games_are_provably_fair(self):
+        self.generate('fair_', '--seed', '7')
+        for game in MinesGame.objects.filter(user__username__startswith='fair_'):
+            self.assertEqual(
+                game.mine_positions,
+                generate_mine_positions(game.server_seed, game.client_seed, game.nonce, game.mines_count),
+            )
+        for game in KenoGame.objects.filter(user__username__startswith='fair_'):
+            self.assertEqual(game.drawn_numbers, draw_keno_numbers(game.server_seed, game.client_seed, game.nonce))
+
+
+# A second, real database for the replica routing tests. It is only created
+# for test classes that list it in ``databases``; its tables are built from
+# the models (migrations never run on the replica) and it only holds what
+# ``replicate()`` copies over, so anything written since reads as lag.
+_default_db = connections.settings['default']
+connections.settings.setdefault('replica', {
+    **_default_db, 'NAME': ':memory:', 'TEST': {**_default_db['TEST'], 'NAME': None, 'MIRROR': None},
+})
+
+
+def _replicated_models():
+    return [model for model in apps.get_models() if model._meta.managed and not model._meta.proxy]
+
+
+def replicate():
+    """Make the replica an exact copy of the primary, as replication would."""
+    replica = connections['replica']
+    with replica.cursor() as cursor:
+        for model in _replicated_models():
+            cursor.execute(f"DELETE FROM {replica.ops.quote_name(model._meta.db_table)}")
+    for model in _replicated_models():
+        model._base_manager.using('replica').bulk_create(model._base_manager.using('default'))
+
+
+@override_settings(
+    REPLICA_DATABASE_ALIAS='replica', READ_YOUR_WRITES_SECONDS=5,
+    MINES_REAP_INTERVAL_SECONDS=0, DEFERRED_TASK_WORKERS=0,
+)
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica'}
+
+    REPLICA_ROUTES = (
+        'mines-history', 'keno-history', 'recent-wins', 'mines-recent-wins',
+        'leaderboard', 'leaderboard-rank', 'admin-analytics',
+    )
+    PRIMARY_ROUTES = ('current-user', 'user-balance', 'mines-active', 'mines-stats', 'session-bootstrap')
+
+    @classmethod
+    def setUpClass(cls):
+        replica = connections['replica']
+        existing = set(replica.introspection.table_names())
+        with replica.schema_editor() as editor:
+            for model in _replicated_models():
+                if model._meta.db_table not in existing:
+                    editor.create_model(model)
+        super().setUpClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user('replica_player', password='x', is_staff=True)
+        Profile.objects.filter(user=self.user).update(balance=10_000)
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+        self.play_keno()
+        replicate()
+        # Forget the pin from playing above
+        cache.clear()
+
+    def play_keno(self):
+        response = self.client.post(
+            reverse('keno-start'), {'bet_amount': '1.00', 'numbers_selected': [1]}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def history(self):
+        return self.client.get(reverse('keno-history')).json()['count']
+
+    def replica_queries(self, route):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = self.client.get(reverse(route), {'category': 'total_wagered'})
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(queries)
+
+    def test_only_marked_views_read_the_replica(self):
+        for route in self.REPLICA_ROUTES:
+            with self.subTest(route=route):
+                self.assertGreater(self.replica_queries(route), 0)
+        for route in self.PRIMARY_ROUTES:
+            with self.subTest(route=route):
+                self.assertEqual(self.replica_queries(route), 0)
+
+    def test_writes_pin_the_user_to_the_primary(self):
+        # Written without a request, so nothing pins the user: the replica lags
+        KenoGame.objects.create(
+            user=self.user, bet_amount=100, numbers_selected=[1], server_seed_bytes=bytes(32), client_seed='c',
+            nonce=99, drawn_numbers=list(range(1, 11)), matches=1, status='won', completed_at=timezone.now(),
+        )
+        self.assertEqual(self.history(), 1)
+
+        self.play_keno()
+        self.assertEqual(self.history(), 3)
+
+    def test_pin_expires(self):
+        self.play_keno()
+        self.assertEqual(self.history(), 2)
+
+        later = time.time() + 6
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(self.history(), 1)
+
+    def test_etag_versions_the_replica_body(self):
+        fresh = self.client.get(reverse('keno-history'))
+        # The primary moves on; the replica has not seen it yet
+        bump_state_version(self.user.id)
+        stale = self.client.get(reverse('keno-history'))
+        self.assertEqual(stale.json(), fresh.json())
+        self.assertEqual(stale['ETag'], fresh['ETag'])
+
+        replicate()
+        self.assertEqual(self.client.get(reverse('keno-history'), HTTP_IF_NONE_MATCH=fresh['ETag']).status_code, 200)
+
+    def test_failed_writes_do_not_pin(self):
+        response = self.client.post(
+            reverse('keno-start'), {'bet_amount': '1.00', 'numbers_selected': []}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertGreater(self.replica_queries('keno-history'), 0)
+
+
+@dataclass
+class Budget:
+    """Most queries and result rows one request to a route may use; ``prepare`` names a QueryBudgetTests method."""
+    queries: int
+    rows: int
+    method: str = 'get'
+    auth: str = 'player'  # 'player', 'staff' or None
+    prepare: str = None
+
+
+# One entry per route in api/urls.py, keyed by URL name. Budgets are for one
+# request against the fixtures of QueryBudgetTests; a view whose queries grow
+# with the amount of data fails even within its budget.
+QUERY_BUDGETS = {
+    'test-view': Budget(0, 0, auth=None),
+    'register': Budget(5, 3, method='post', auth=None, prepare='new_account'),
+    'cookie-login': Budget(2, 2, method='post', auth=None, prepare='credentials'),
+    'cookie-refresh': Budget(2, 2, method='post', auth=None, prepare='refresh_cookie'),
+    'csrf-token': Budget(0, 0, auth=None),
+    'current-user': Budget(1, 1),
+    'user-balance': Budget(1, 1),
+    'claim-welcome-bonus': Budget(4, 2, method='post', prepare='unclaimed_welcome_bonus'),
+    'claim-daily-reward': Budget(2, 2, method='post', prepare='claimable_rewards'),
+    'claim-ad-reward': Budget(2, 2, method='post', prepare='claimable_rewards'),
+    'check-ad-reward': Budget(1, 1),
+    'logout': Budget(7, 4, method='post', prepare='refresh_cookie'),
+    'session-bootstrap': Budget(4, 2),
+    'mines-start': Budget(10, 5, method='post', prepare='mines_bet'),
+    'mines-reveal': Budget(5, 2, method='post', prepare='safe_reveal'),
+    'mines-cashout': Budget(9, 5, method='post', prepare='cashout'),
+    'mines-reroll-seed': Budget(7, 2, method='post', prepare='no_active_games'),
+    'mines-seed-info': Budget(2, 2),
+    'mines-history': Budget(2, 51),
+    'mines-active': Budget(2, 1),
+    'mines-stats': Budget(1, 1),
+    'mines-recent-wins': Budget(1, 50, auth=None),
+    'keno-start': Budget(11, 6, method='post', prepare='keno_bet'),
+    'keno-history': Budget(2, 51),
+    'keno-active': Budget(2, 1),
+    'keno-stats': Budget(1, 1),
+    'recent-wins': Budget(1, 50, auth=None),
+    'leaderboard': Budget(1, 50, auth=None, prepare='leaderboard_category'),
+    'leaderboard-rank': Budget(5, 7, prepare='leaderboard_category'),
+    'verify': Budget(0, 0, method='post', auth=None, prepare='verify_items'),
+    'admin-analytics': Budget(4, 4, auth='staff'),
+}
+
+
+class _RowCountingCursor(CursorWrapper):
+    """Cursor wrapper that adds the rows every fetch returns to ``recorder.rows``."""
+
+    recorder = None
+
+    def _fetch(self, name, *args):
+        return CursorWrapper.__getattr__(self, name)(*args)
+
+    def fetchone(self):
+        row = self._fetch('fetchone')
+        if row is not None:
+            self.recorder.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._fetch('fetchmany', *args)
+        self.recorder.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch('fetchall')
+        self.recorder.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in super().__iter__():
+            self.recorder.rows += 1
+            yield row
+
+
+class QueryRecorder:
+    """Counts the queries run and the result rows fetched inside the ``with`` block."""
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.sql = []
+
+    def _count(self, execute, sql, params, many, context):
+        self.queries += 1
+        self.sql.append(sql)
+        return execute(sql, params, many, context)
+
+    def _make_cursor(self, cursor):
+        wrapped = _RowCountingCursor(cursor, connection)
+        wrapped.recorder = self
+        return wrapped
+
+    @contextmanager
+    def record(self):
+        with connection.execute_wrapper(self._count), \
+                mock.patch.object(connection, 'make_cursor', self._make_cursor):
+            yield self
+
+
+@override_settings(
+    TOKEN_PRUNE_INTERVAL_SECONDS=0,
+    MINES_REAP_INTERVAL_SECONDS=0,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class QueryBudgetTests(TestCase):
+    """
+    Request every route and hold it to its QUERY_BUDGETS entry, before and after growing the data.
+
+    The fixtures are a handful of players with settled games, monthly stats
+    and seed pairs; ``_add_players`` then adds more players and more history
+    for the requesting player. Query counts must not grow with it.
+    """
+
+    PASSWORD = 'budget-password'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user('budget_player', password=cls.PASSWORD)
+        cls.staff = User.objects.create_user('budget_staff', password=cls.PASSWORD, is_staff=True)
+        cls.player.profile.balance = 10_000_000  # Cents
+        cls.player.profile.save()
+        cls.players = 0
+        cls._add_players(3, games_each=10)
+
+    @classmethod
+    def _add_players(cls, count, games_each):
+        """Add ``count`` players, and ``games_each`` more settled games of each type for them and the player."""
+        now = timezone.now()
+        users = [User.objects.create_user(f'budget_{cls.players + i}', password='x') for i in range(count)]
+        cls.players += count
+        mines, keno, stats = [], [], []
+        for user in [cls.player, *users]:
+            for i in range(games_each):
+                won = i % 2 == 0
+                payout = 200 if won else 0  # Cents
+                created_at = now - timedelta(minutes=i + 1)
+                common = dict(
+                    user=user, bet_amount=100, server_seed_bytes=bytes(32), client_seed='budget', nonce=i,
+                    status='won' if won else 'lost', payout_amount=payout, net_profit=payout - 100,
+                    created_at=created_at, completed_at=created_at,
+                )
+                mines.append(MinesGame(mines_count=3, mine_positions=[0, 1, 2], revealed_tiles=[3], **common))
+                keno.append(KenoGame(numbers_selected=[1, 2], drawn_numbers=list(range(1, 11)), matches=2, **common))
+            for game_type in ('mines', 'keno'):
+                row, _ = PlayerMonthlyStats.objects.get_or_create(
+                    user=user, game_type=game_type, month=month_start(now)
+                )
+                PlayerMonthlyStats.objects.filter(pk=row.pk).update(
+                    games_played=row.games_played + games_each,
+                    total_wagered=row.total_wagered + games_each * 100,
+                    biggest_win=200,
+                )
+            totals, _ = PlayerMonthlyTotals.objects.get_or_create(user=user, month=month_start(now))
+            PlayerMonthlyTotals.objects.filter(pk=totals.pk).update(
+                total_wagered=totals.total_wagered + games_each * 200, biggest_win=200
+            )
+        MinesGame.objects.bulk_create(mines)
+        KenoGame.objects.bulk_create(keno)
+        BetRecord.objects.bulk_create(
+            [bet_record('mines', game) for game in mines] + [bet_record('keno', game) for game in keno]
+        )
+
+    def setUp(self):
+        # Throttle buckets and auth caches must not leak between requests of different tests
+        cache.clear()
+
+    # Request data for the routes that need some, named in QUERY_BUDGETS
+
+    def new_account(self):
+        self.accounts = getattr(self, 'accounts', 0) + 1
+        return {'username': f'budget_new_{self.accounts}', 'password': self.PASSWORD}
+
+    def credentials(self):
+        return {'username': self.player.username, 'password': self.PASSWORD}
+
+    def refresh_cookie(self):
+        self.client.cookies['refresh_token'] = str(RefreshToken.for_user(self.player))
+        return {}
+
+    def unclaimed_welcome_bonus(self):
+        self.player.profile.__class__.objects.filter(user=self.player).update(welcome_bonus_claimed=False)
+        return {}
+
+    def claimable_rewards(self):
+        self.player.profile.__class__.objects.filter(user=self.player).update(last_daily_claim=None, last_ad_claim=None)
+        return {}
+
+    def no_active_games(self):
+        MinesGame.objects.filter(user=self.player, status='active').update(status='disconnected')
+        KenoGame.objects.filter(user=self.player, status='active').update(status='disconnected')
+        return {}
+
+    def mines_bet(self):
+        self.no_active_games()
+        return {'bet_amount': 1, 'mines_count': 3}
+
+    def _start_mines(self):
+        self.no_active_games()
+        response = self.client.post(reverse('mines-start'), self.mines_bet(), content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return MinesGame.objects.get(pk=response.json()['game_id'])
+
+    def _safe_tile(self, game):
+        return next(tile for tile in range(25) if tile not in game.mine_positions + game.revealed_tiles)
+
+    def safe_reveal(self):
+        game = self._start_mines()
+        return {'game_id': game.pk, 'tile_position': self._safe_tile(game)}
+
+    def cashout(self):
+        game = self._start_mines()
+        response = self.client.post(
+            reverse('mines-reveal'), {'game_id': game.pk, 'tile_position': self._safe_tile(game)},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return {'game_id': game.pk}
+
+    def keno_bet(self):
+        # One spot always pays (0.4x on a miss), so every request takes the same path
+        return {'bet_amount': 1, 'numbers_selected': [7]}
+
+    def leaderboard_category(self):
+        return {'category': 'total_wagered'}
+
+    def verify_items(self):
+        return {'games': [
+            {'game': 'mines', 'server_seed': 'a' * 64, 'client_seed': 'budget', 'nonce': i, 'mines_count': 3}
+            for i in range(5)
+        ]}
+
+    def _login(self, auth):
+        self.client.cookies.clear()
+        if auth:
+            user = self.staff if auth == 'staff' else self.player
+            self.client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+
+    def measure(self, name):
+        """Request route ``name`` as its budget says; returns the QueryRecorder."""
+        budget = QUERY_BUDGETS[name]
+        self._login(budget.auth)
+        data = getattr(self, budget.prepare)() if budget.prepare else {}
+        url = reverse(name)
+
+        with QueryRecorder().record() as recorder:
+            if budget.method == 'get':
+                response = self.client.get(url, data)
+            else:
+                response = self.client.post(url, data, content_type='application/json')
+
+        self.assertLess(response.status_code, 400, f"{name}: {response.content[:500]}")
+        return recorder
+
+    def assertWithinBudget(self, name, recorder):
+        budget = QUERY_BUDGETS[name]
+        queries = "\n".join(recorder.sql)
+        self.assertLessEqual(
+            recorder.queries, budget.queries, f"{name} ran {recorder.queries} queries:\n{queries}"
+        )
+        self.assertLessEqual(
+            recorder.rows, budget.rows, f"{name} fetched {recorder.rows} rows:\n{queries}"
+        )
+
+    def test_every_route_has_a_budget(self):
+        names = {pattern.name for pattern in urlpatterns}
+        self.assertEqual(names - set(QUERY_BUDGETS), set(), "routes without a query budget")
+        self.assertEqual(set(QUERY_BUDGETS) - names, set(), "budgets for routes that no longer exist")
+
+    def test_query_budgets(self):
+        small = {}
+        for name in QUERY_BUDGETS:
+            with self.subTest(route=name, data='small'):
+                small[name] = self.measure(name)
+                self.assertWithinBudget(name, small[name])
+
+        self._add_players(20, games_each=60)
+
+        for name in QUERY_BUDGETS:
+            with self.subTest(route=name, data='large'):
+                large = self.measure(name)
+                self.assertWithinBudget(name, large)
+                self.assertLessEqual(
+                    large.queries, small[name].queries,
+                    f"{name} runs more queries with more data:\n" + "\n".join(large.sql)
+                )
@@ -0,0 +1,97 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.throttling import (
+    SimpleRateThrottle,
+    AnonRateThrottle,
+    UserRateThrottle,
+    ScopedRateThrottle,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stand-in for the throttle cache while it is unreachable
+local_buckets = LocMemCache('throttle-fallback', {})
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token-bucket version of DRF's ``SimpleRateThrottle``.
+
+    Rates keep DRF's "<num>/<period>" format: ``num`` is the bucket capacity
+    (the allowed burst) and the bucket refills at ``num / period`` tokens per
+    second. Each key stores a single ``(tokens, timestamp)`` pair instead of a
+    list of request timestamps, so memory per client is constant.
+
+    State lives in the cache named by ``THROTTLE_CACHE_ALIAS``; point it at a
+    shared backend (see ``REDIS_URL``) to make limits global across workers.
+    Concurrent requests may race on the read-modify-write and let a request
+    or two through, which is fine for rate limiting. If that cache is down the
+    buckets move to this worker's memory until it is back, so limits become
+    per worker instead of disappearing.
+    """
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+    def _get_state(self):
+        try:
+            return self.cache, self.cache.get(self.key)
+        except Exception:
+            logger.warning("Throttle cache unavailable, using this worker's buckets", exc_info=True)
+            return local_buckets, local_buckets.get(self.key)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        capacity = self.num_requests
+        refill_per_second = self.num_requests / self.duration
+        now = time.time()
+
+        bucket_cache, state = self._get_state()
+
+        if state is None:
+            tokens = capacity
+        else:
+            tokens, updated_at = state
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+            self._wait = 0
+        else:
+            self._wait = (1 - tokens) / refill_per_second
+
+        try:
+            # A full bucket needs no state, so entries expire after one period
+            bucket_cache.set(self.key, (tokens, now), self.duration)
+        except Exception:
+            logger.warning("Throttle cache unavailable, state not saved", exc_info=True)
+            local_buckets.set(self.key, (tokens, now), self.duration)
+
+        return allowed
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class AnonTokenBucketThrottle(AnonRateThrottle, TokenBucketThrottle):
+    """Per-IP bucket for anonymous requests (scope ``anon``)."""
+
+
+class UserTokenBucketThrottle(UserRateThrottle, TokenBucketThrottle):
+    """Per-user bucket for authenticated requests, per-IP otherwise (scope ``user``)."""
+
+
+class ScopedTokenBucketThrottle(ScopedRateThrottle, TokenBucketThrottle):
+    """Per-endpoint-group bucket, selected by a view's ``throttle_scope`` (``game``, ``feed``, ``auth``)."""
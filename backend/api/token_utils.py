@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+
+class BlacklistFilter:
+    """
+    In-process set of blacklisted refresh-token JTIs.
+
+    New blacklist rows are pulled incrementally (by primary key) at most every
+    ``sync_seconds``, so checking a token that is *not* blacklisted - the
+    common case - usually costs no query. Tokens blacklisted by this process
+    are added immediately; ones blacklisted by other workers show up within
+    ``sync_seconds``. Entries are dropped once the token has expired, which
+    keeps the set bounded by the number of live blacklisted tokens.
+
+    Rows can commit out of id order (a transaction that took the lower id
+    commits after one with a higher id), so each sync re-reads from where the
+    syncs of the last ``OVERLAP_SECONDS`` started. A row committing up to that
+    long after it was inserted is still picked up.
+    """
+
+    FULL_RELOAD_SECONDS = 600
+    OVERLAP_SECONDS = 60
+
+    def __init__(self, sync_seconds):
+        self.sync_seconds = sync_seconds
+        self._expires = {}  # jti -> expiry epoch seconds
+        self._last_id = 0
+        self._starts = deque()  # (sync time, highest id before that sync) of recent syncs
+        self._synced_at = 0.0
+        self._reloaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _sync(self):
+        now = time.time()
+        if now - self._synced_at < self.sync_seconds:
+            return
+
+        with self._lock:
+            if now - self._synced_at < self.sync_seconds:
+                return
+
+            if now - self._reloaded_at >= self.FULL_RELOAD_SECONDS:
+                # Periodically start over to forget un-blacklisted rows
+                self._expires = {}
+                self._last_id = 0
+                self._starts.clear()
+                self._reloaded_at = now
+
+            last_id = self._last_id
+            rows = BlacklistedToken.objects.filter(
+                id__gt=self._starts[0][1] if self._starts else last_id,
+                token__expires_at__gt=timezone.now()
+            ).order_by('id').values_list('id', 'token__jti', 'token__expires_at')
+
+            for row_id, jti, expires_at in rows:
+                self._expires[jti] = expires_at.timestamp()
+                self._last_id = max(self._last_id, row_id)
+
+            # Syncs at least OVERLAP_SECONDS old have now been re-read after that long
+            while self._starts and self._starts[0][0] <= now - self.OVERLAP_SECONDS:
+                self._starts.popleft()
+            self._starts.append((now, last_id))
+
+            self._expires = {jti: exp for jti, exp in self._expires.items() if exp > now}
+            self._synced_at = now
+
+    def contains(self, jti):
+        self._sync()
+        return jti in self._expires
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._expires[jti] = expires_at
+
+    def reset(self):
+        with self._lock:
+            self._expires = {}
+            self._last_id = 0
+            self._starts.clear()
+            self._synced_at = 0.0
+            self._reloaded_at = 0.0
+
+    @property
+    def is_warm(self):
+        return self._synced_at > 0
+
+    def __len__(self):
+        return len(self._expires)
+
+
+blacklist_filter = BlacklistFilter(getattr(settings, 'TOKEN_BLACKLIST_SYNC_SECONDS', 5))
+
+
+class FilteredRefreshToken(RefreshToken):
+    """Refresh token that checks the in-process blacklist filter instead of querying every time."""
+
+    def check_blacklist(self):
+        if blacklist_filter.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return blacklisted
+
+
+def prune_expired_tokens(batch_size=1000):
+    """
+    Delete expired outstanding tokens (and, by cascade, their blacklist rows) in batches.
+
+    Expired tokens fail validation on their own, so neither table needs to keep them.
+    Returns the number of outstanding tokens deleted.
+    """
+    deleted = 0
+    now = timezone.now()
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lt=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+
+_last_prune_check = 0.0
+
+
+def schedule_token_pruning():
+    """
+    Prune expired tokens in a background thread, at most every TOKEN_PRUNE_INTERVAL_SECONDS.
+
+    Called from the login view. The shared cache lock makes sure only one
+    worker prunes per interval; set the interval to 0 to disable (e.g. when
+    running ``manage.py prune_tokens`` from cron instead).
+    """
+    global _last_prune_check
+
+    interval = getattr(settings, 'TOKEN_PRUNE_INTERVAL_SECONDS', 3600)
+    now = time.time()
+    if interval <= 0 or now - _last_prune_check < interval:
+        return
+    _last_prune_check = now
+
+    try:
+        if not cache.add('token-prune-lock', True, interval):
+            return
+    except Exception:
+        logger.warning("Cache unavailable, skipping token pruning")
+        return
+
+    def run():
+        try:
+            deleted = prune_expired_tokens()
+            if deleted:
+                logger.info("Pruned %s expired refresh tokens", deleted)
+        except Exception:
+            logger.exception("Token pruning failed")
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name='token-prune', daemon=True).start()
@@ -13,6 +13,7 @@ from api.views import (
     ClaimAdRewardView,
     CheckAdRewardView,
     LogoutView,
+    SessionBootstrapView,
     StartMinesGameView,
     RevealTileView,
     CashoutView,
@@ -28,6 +29,8 @@ from api.views import (
     RecentWinsView,
     MinesRecentWinsView,
     LeaderboardView,
+    LeaderboardRankView,
+    VerifyGamesView,
     AdminAnalyticsView,
 )
 
@@ -49,6 +52,7 @@ urlpatterns = [
     path("user/claim-ad-reward/", ClaimAdRewardView.as_view(), name="claim-ad-reward"),
     path("user/check-ad-reward/", CheckAdRewardView.as_view(), name="check-ad-reward"),
     path("logout/", LogoutView.as_view(), name="logout"),
+    path("session/bootstrap/", SessionBootstrapView.as_view(), name="session-bootstrap"),
 
     # Mines game endpoints
     path("mines/start/", StartMinesGameView.as_view(), name="mines-start"),
@@ -70,6 +74,10 @@ urlpatterns = [
     
     # Leaderboard endpoint
     path("leaderboard/", LeaderboardView.as_view(), name="leaderboard"),
+    path("leaderboard/me/", LeaderboardRankView.as_view(), name="leaderboard-rank"),
+
+    # Provably fair verification endpoint (public)
+    path("verify/", VerifyGamesView.as_view(), name="verify"),
     
     # Admin analytics endpoint
     path("admin/analytics/", AdminAnalyticsView.as_view(), name="admin-analytics"),
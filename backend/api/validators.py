@@ -1,19 +1,21 @@
 import re
 from decimal import Decimal, InvalidOperation
 
+from api.money import CENTS_PER_UNIT, format_cents
+
 class BetValidator:
     """Validator for game bet amounts"""
     
-    MIN_BET = Decimal('0.01')
-    MAX_BET = Decimal('9999999999.99')
+    MIN_BET = 1  # Cents
+    MAX_BET = 999_999_999_999  # Cents ($9,999,999,999.99)
     MAX_DECIMALS = 2
     BET_REGEX = r'^\d+(\.\d{1,2})?$'
     
     @staticmethod
     def validate_bet_amount(bet_input, user_balance=None):
         """
-        Validate bet amount
-        Returns: (is_valid: bool, error: str or None, value: Decimal or None)
+        Validate bet amount (``user_balance`` in cents)
+        Returns: (is_valid: bool, error: str or None, value in cents: int or None)
         """
         if bet_input is None:
             return False, "Bet amount is required", None
@@ -23,27 +25,30 @@ class BetValidator:
             bet_amount = Decimal(str(bet_input))
         except (InvalidOperation, TypeError, ValueError):
             return False, "Bet must be a valid number", None
+        if not bet_amount.is_finite():
+            return False, "Bet must be a valid number", None
         
         # Check for negative
         if bet_amount < 0:
             return False, "Bet amount cannot be negative", None
         
+        bet_cents = bet_amount * CENTS_PER_UNIT
+        
         # Check minimum
-        if bet_amount < BetValidator.MIN_BET:
-            return False, f"Bet must be at least ${float(BetValidator.MIN_BET):.2f}", None
+        if bet_cents < BetValidator.MIN_BET:
+            return False, f"Bet must be at least ${format_cents(BetValidator.MIN_BET)}", None
         
         # Check maximum
-        if bet_amount > BetValidator.MAX_BET:
-            return False, f"Bet cannot exceed ${float(BetValidator.MAX_BET):.2f}", None
+        if bet_cents > BetValidator.MAX_BET:
+            return False, f"Bet cannot exceed ${format_cents(BetValidator.MAX_BET)}", None
         
         # Check decimal places
-        if bet_amount.as_tuple().exponent < -BetValidator.MAX_DECIMALS:
+        if bet_cents != bet_cents.to_integral_value():
             return False, f"Bet can have maximum {BetValidator.MAX_DECIMALS} decimal places", None
+        bet_cents = int(bet_cents)
         
         # Check user balance if provided
-        if user_balance is not None:
-            user_balance_decimal = Decimal(str(user_balance))
-            if bet_amount > user_balance_decimal:
-                return False, f"Insufficient balance (you have ${float(user_balance_decimal):.2f})", None
+        if user_balance is not None and bet_cents > user_balance:
+            return False, f"Insufficient balance (you have ${format_cents(user_balance)})", None
         
-        return True, None, bet_amount
+        return True, None, bet_cents
@@ -0,0 +1,88 @@
+from functools import lru_cache
+
+from django.conf import settings
+
+from api.keno_utils import draw_keno_numbers, calculate_keno_multiplier, calculate_matches
+from api.mines_utils import generate_mine_positions, hash_seed
+from api.money import format_bps, to_bps
+
+MAX_SEED_LENGTH = 128
+
+
+@lru_cache(maxsize=getattr(settings, 'VERIFY_CACHE_SIZE', 4096))
+def _mine_positions(server_seed, client_seed, nonce, mines_count):
+    return tuple(generate_mine_positions(server_seed, client_seed, nonce, mines_count))
+
+
+@lru_cache(maxsize=getattr(settings, 'VERIFY_CACHE_SIZE', 4096))
+def _keno_draw(server_seed, client_seed, nonce):
+    return tuple(draw_keno_numbers(server_seed, client_seed, nonce))
+
+
+@lru_cache(maxsize=getattr(settings, 'VERIFY_CACHE_SIZE', 4096))
+def _seed_hash(server_seed):
+    return hash_seed(server_seed)
+
+
+def _read_int(item, name, low, high):
+    value = item.get(name)
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        raise ValueError(f"{name} must be an integer between {low} and {high}")
+    return value
+
+
+def verify_outcome(item):
+    """
+    Derive the outcome of one game from its seeds, exactly as the game views do.
+
+    ``item`` is a dict with ``game`` ("mines" or "keno"), ``server_seed``,
+    ``client_seed`` and ``nonce``, plus ``mines_count`` for Mines and an
+    optional ``numbers_selected`` for Keno (to also compute matches and the
+    multiplier). Raises ValueError for malformed items. Derived outcomes are
+    memoized in bounded LRU caches, since players tend to re-check the same games.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("each item must be an object")
+
+    game = item.get('game')
+    server_seed = item.get('server_seed')
+    client_seed = item.get('client_seed')
+    for name, seed in (('server_seed', server_seed), ('client_seed', client_seed)):
+        if not isinstance(seed, str) or not seed or len(seed) > MAX_SEED_LENGTH:
+            raise ValueError(f"{name} must be a non-empty string of at most {MAX_SEED_LENGTH} characters")
+    nonce = _read_int(item, 'nonce', 0, 2 ** 31 - 1)
+
+    result = {
+        "game": game,
+        "server_seed_hash": _seed_hash(server_seed),
+        "client_seed": client_seed,
+        "nonce": nonce,
+    }
+
+    if game == 'mines':
+        mines_count = _read_int(item, 'mines_count', 1, 24)
+        result["mines_count"] = mines_count
+        result["mine_positions"] = list(_mine_positions(server_seed, client_seed, nonce, mines_count))
+    elif game == 'keno':
+        drawn_numbers = list(_keno_draw(server_seed, client_seed, nonce))
+        result["drawn_numbers"] = drawn_numbers
+
+        numbers_selected = item.get('numbers_selected')
+        if numbers_selected is not None:
+            # Element types first: set() would raise TypeError on lists or dicts
+            if (not isinstance(numbers_selected, list)
+                    or not 1 <= len(numbers_selected) <= 10
+                    or not all(isinstance(n, int) and not isinstance(n, bool) and 1 <= n <= 40
+                               for n in numbers_selected)
+                    or len(set(numbers_selected)) != len(numbers_selected)):
+                raise ValueError("numbers_selected must be 1-10 unique numbers between 1 and 40")
+            matches = calculate_matches(numbers_selected, drawn_numbers)
+            result["numbers_selected"] = numbers_selected
+            result["matches"] = matches
+            # Stored and shown in basis points, like the Keno views
+            result["multiplier"] = format_bps(to_bps(calculate_keno_multiplier(len(numbers_selected), matches)))
+    else:
+        raise ValueError("game must be 'mines' or 'keno'")
+
+    return result
+
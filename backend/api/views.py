@@ -8,29 +8,54 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.views import View
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from decimal import Decimal
-from django.db import transaction
+from django.db import transaction, IntegrityError
 import os
+from django.conf import settings
 
 # Auth & CSRF Protection
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.utils.decorators import method_decorator
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from api.models import User, Profile, MinesGame, KenoGame
+from api.models import User, Profile, MinesGame, KenoGame, GameArchive, BetRecord
 from api.validators import BetValidator
+from api.authentication import revoke_access_token
 
-from api.serializers import ProfileSerializer
+from api.serializers import ProfileSerializer, CookieTokenRefreshSerializer
+from api.token_utils import FilteredRefreshToken, schedule_token_pruning
+from api.reaper import schedule_game_reaping
 from api.models import MinesGame, KenoGame, Profile
 from django.db import models
 from api.mines_utils import (
-    generate_server_seed,
-    generate_client_seed,
-    hash_seed,
     generate_mine_positions,
     calculate_multiplier,
+    hash_seed,
+)
+from api.seed_utils import find_committed_pair, take_committed_seeds, rotate_seed_pair
+from api.settlement import (
+    GameNotActive, save_reveal, close_game, cashout_amounts, lock_profile, credit_balance,
+    queue_mines_start, queue_mines_result, queue_keno_result, record_keno_game
+)
+from api.money import ONE_X, cents_to_decimal, format_bps, format_cents, payout_cents, to_bps
+from api.throttling import ScopedTokenBucketThrottle
+from api.idempotency import idempotent
+from api.conditional import state_etag, bump_state_version
+from api.routers import read_from_replica
+from api.rewards import get_reward, claim_reward, last_claim, seconds_until_claimable
+from api.payloads import (
+    current_user_payload,
+    balance_payload,
+    seed_info_payload,
+    active_mines_payload,
+    active_keno_payload,
+    mines_stats_payload,
+    keno_stats_payload,
+    reward_status_payload,
 )
+from api.verify_utils import verify_outcome
+from api.leaderboard_utils import LEADERBOARD_CATEGORIES, top_entries, rank_window
 from api.keno_utils import (
     draw_keno_numbers,
     calculate_keno_multiplier,
@@ -48,6 +73,7 @@ class TestView(View):
 @method_decorator(csrf_exempt, name='dispatch')
 class RegisterUserView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'auth'
 
     def post(self, request, *args, **kwargs):
         username = request.data.get("username")
@@ -56,18 +82,27 @@ class RegisterUserView(APIView):
         if not username or not password:
             return Response({"error": "Username and password required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if User.objects.filter(username=username).exists():
-            return Response({"error": "Username already exists."}, status=status.HTTP_400_BAD_REQUEST)
+        # Hash first (on the api.hashing pool) so the transaction holds no
+        # connection or locks while it runs
+        encoded_password = make_password(password)
 
-        user = User.objects.create_user(username=username, password=password)
-        user.save()
+        # One transaction for the user and its profile (post_save signal); let the
+        # unique index reject duplicates instead of checking first
+        try:
+            with transaction.atomic():
+                User.objects.create(username=User.normalize_username(username), password=encoded_password)
+        except IntegrityError:
+            return Response({"error": "Username already exists."}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({"message": "User created successfully!"}, status=status.HTTP_201_CREATED)
 
 @method_decorator(csrf_exempt, name='dispatch')  # ✅ no CSRF needed for login
 class CookieTokenObtainPairView(TokenObtainPairView):
+    throttle_scope = 'auth'
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
+        # Every login adds an OutstandingToken row; occasionally clear out expired ones
+        schedule_token_pruning()
         data = getattr(response, "data", {})
         access_token = data.get("access")
         refresh_token = data.get("refresh")
@@ -100,6 +135,9 @@ class CookieTokenObtainPairView(TokenObtainPairView):
     
 # Auth cookie view
 class CookieTokenRefreshView(TokenRefreshView):
+    serializer_class = CookieTokenRefreshSerializer
+    throttle_scope = 'auth'
+
     def post(self, request, *args, **kwargs):
         refresh_token = request.COOKIES.get("refresh_token")
         if not refresh_token:
@@ -151,13 +189,7 @@ class CurrentUserView(APIView):
     def get(self, request):
         user = request.user
         profile = getattr(user, "profile", None)
-        return Response({
-            "username": user.username,
-            "profile": {
-                "balance": profile.balance if profile else 0,
-                "welcome_bonus_claimed": profile.welcome_bonus_claimed if profile else False,
-            },
-        })
+        return Response(current_user_payload(user, profile))
     
 class UserBalanceView(generics.RetrieveUpdateAPIView):
     serializer_class = ProfileSerializer
@@ -167,6 +199,14 @@ class UserBalanceView(generics.RetrieveUpdateAPIView):
         # Returns the current user's profile
         return self.request.user.profile
 
+    @state_etag
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+WELCOME_BONUS = 100_000  # Cents ($1000.00)
+
+
 class ClaimWelcomeBonusView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -180,140 +220,71 @@ class ClaimWelcomeBonusView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Use transaction to ensure atomicity
-        with transaction.atomic():
-            # Add the welcome bonus to balance
-            welcome_amount = Decimal('1000.00')
-            profile.balance += welcome_amount
-            profile.welcome_bonus_claimed = True
-            profile.save()
+        # One conditional UPDATE: a concurrent claim cannot pay twice, and
+        # concurrent bets or payouts are not overwritten
+        welcome_amount = WELCOME_BONUS
+        claimed = Profile.objects.filter(pk=profile.pk, welcome_bonus_claimed=False).update(
+            balance=models.F('balance') + welcome_amount,
+            welcome_bonus_claimed=True,
+            state_version=models.F('state_version') + 1,
+        )
+        if not claimed:
+            return Response(
+                {"error": "Welcome bonus has already been claimed"}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        profile.refresh_from_db(fields=['balance', 'welcome_bonus_claimed', 'state_version'])
         
         return Response({
             "message": "Welcome bonus claimed successfully!",
-            "bonus_amount": welcome_amount,
-            "new_balance": profile.balance,
+            "bonus_amount": cents_to_decimal(welcome_amount),
+            "new_balance": cents_to_decimal(profile.balance),
             "welcome_bonus_claimed": profile.welcome_bonus_claimed
         }, status=status.HTTP_200_OK)
 
-class ClaimDailyRewardView(APIView):
+class CooldownRewardView(APIView):
+    """Status (GET) and claim (POST) for one of the COOLDOWN_REWARDS types."""
     permission_classes = [IsAuthenticated]
-    
+    reward_name = None
+
     def get(self, request):
-        """Check if user can claim daily reward"""
-        profile = request.user.profile
-        
-        can_claim = True
-        time_remaining = 0
-        
-        if profile.last_daily_claim:
-            time_since_claim = timezone.now() - profile.last_daily_claim
-            hours_since_claim = time_since_claim.total_seconds() / 3600
-            
-            if hours_since_claim < 12:
-                can_claim = False
-                time_remaining = int((12 * 3600) - time_since_claim.total_seconds())
-        
-        return Response({
-            "can_claim": can_claim,
-            "time_remaining": time_remaining,
-            "last_claim": profile.last_daily_claim,
-        }, status=status.HTTP_200_OK)
-    
-    def post(self, request):
-        """Claim daily reward"""
-        profile = request.user.profile
-        
-        # Check if 12 hours have passed since last claim
-        if profile.last_daily_claim:
-            time_since_claim = timezone.now() - profile.last_daily_claim
-            hours_since_claim = time_since_claim.total_seconds() / 3600
-            
-            if hours_since_claim < 12:
-                time_remaining = int((12 * 3600) - time_since_claim.total_seconds())
-                return Response(
-                    {
-                        "error": "Daily reward not available yet",
-                        "time_remaining": time_remaining
-                    }, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        # Use transaction to ensure atomicity
-        with transaction.atomic():
-            # Add the daily reward to balance
-            daily_amount = Decimal('250.00')
-            profile.balance += daily_amount
-            profile.last_daily_claim = timezone.now()
-            profile.save()
-        
-        return Response({
-            "message": "Daily reward claimed successfully!",
-            "reward_amount": daily_amount,
-            "new_balance": profile.balance,
-            "next_claim_at": profile.last_daily_claim
-        }, status=status.HTTP_200_OK)
+        """Check if user can claim the reward"""
+        reward = get_reward(self.reward_name)
+        claimed_at = last_claim(reward, request.user)
+        return Response(reward_status_payload(reward, claimed_at), status=status.HTTP_200_OK)
 
-class ClaimAdRewardView(APIView):
-    permission_classes = [IsAuthenticated]
-    
     def post(self, request):
-        """Claim ad reward"""
-        profile = request.user.profile
-        
-        # Check if 5 minutes have passed since last claim
-        if profile.last_ad_claim:
-            time_since_claim = timezone.now() - profile.last_ad_claim
-            minutes_since_claim = time_since_claim.total_seconds() / 60
-            
-            if minutes_since_claim < 5:
-                time_remaining = int((5 * 60) - time_since_claim.total_seconds())
-                return Response(
-                    {
-                        "error": "Ad reward not available yet",
-                        "time_remaining": time_remaining
-                    }, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        # Use transaction to ensure atomicity
-        with transaction.atomic():
-            # Add the ad reward to balance
-            ad_amount = Decimal('100.00')
-            profile.balance += ad_amount
-            profile.last_ad_claim = timezone.now()
-            profile.save()
-        
-        return Response({
-            "message": "Ad reward claimed successfully!",
-            "reward_amount": ad_amount,
-            "new_balance": profile.balance,
-            "next_claim_at": profile.last_ad_claim
-        }, status=status.HTTP_200_OK)
+        """Claim the reward"""
+        reward = get_reward(self.reward_name)
+        claimed, new_balance, claimed_at = claim_reward(reward, request.user)
+
+        if not claimed:
+            return Response(
+                {
+                    "error": f"{reward.label} not available yet",
+                    "time_remaining": seconds_until_claimable(reward, claimed_at)
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-class CheckAdRewardView(APIView):
-    permission_classes = [IsAuthenticated]
-    
-    def get(self, request):
-        """Check if user can claim ad reward"""
-        profile = request.user.profile
-        
-        can_claim = True
-        time_remaining = 0
-        
-        if profile.last_ad_claim:
-            time_since_claim = timezone.now() - profile.last_ad_claim
-            minutes_since_claim = time_since_claim.total_seconds() / 60
-            
-            if minutes_since_claim < 5:
-                can_claim = False
-                time_remaining = int((5 * 60) - time_since_claim.total_seconds())
-        
         return Response({
-            "can_claim": can_claim,
-            "time_remaining": time_remaining,
-            "last_claim": profile.last_ad_claim,
+            "message": f"{reward.label} claimed successfully!",
+            "reward_amount": cents_to_decimal(reward.amount),
+            "new_balance": cents_to_decimal(new_balance),
+            "next_claim_at": claimed_at
         }, status=status.HTTP_200_OK)
 
+class ClaimDailyRewardView(CooldownRewardView):
+    reward_name = 'daily'
+
+class ClaimAdRewardView(CooldownRewardView):
+    reward_name = 'ad'
+    http_method_names = ['post', 'options']
+
+class CheckAdRewardView(CooldownRewardView):
+    reward_name = 'ad'
+    http_method_names = ['get', 'options']
+
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -325,12 +296,17 @@ class LogoutView(APIView):
             # If we have a refresh token, blacklist it
             if refresh_token:
                 try:
-                    token = RefreshToken(refresh_token)
+                    token = FilteredRefreshToken(refresh_token)
                     token.blacklist()
                 except Exception as e:
                     # Token might already be invalid, but continue with logout
                     print(f"Token blacklist error: {e}")
             
+            # Stop accepting the access token on every worker, cached or not
+            access_token = request.COOKIES.get('access_token')
+            if access_token and request.auth is not None:
+                revoke_access_token(access_token, request.auth)
+            
             # Create response
             response = Response({
                 "message": "Logged out successfully"
@@ -352,11 +328,92 @@ class LogoutView(APIView):
             return response
 
 
+# Session bootstrap
+class SessionBootstrapView(APIView):
+    """
+    Everything the frontend loads on page load, in one request.
+
+    Replaces separate calls to user/me, user/balance, mines/seed-info,
+    mines/active, keno/active, mines/stats, keno/stats and both reward
+    status endpoints; each section has the same shape as that endpoint's
+    response. ``?fields=user,mines_active`` limits the response (and the
+    queries) to the listed sections. The profile comes with the user from
+    authentication, so only seed_info, mines_active and keno_active query.
+    """
+    permission_classes = [IsAuthenticated]
+
+    SECTIONS = (
+        'user',
+        'balance',
+        'seed_info',
+        'mines_active',
+        'keno_active',
+        'mines_stats',
+        'keno_stats',
+        'daily_reward',
+        'ad_reward',
+    )
+
+    def get(self, request):
+        fields = request.query_params.get('fields')
+        if fields:
+            requested = [name.strip() for name in fields.split(',') if name.strip()]
+            unknown = [name for name in requested if name not in self.SECTIONS]
+            if unknown:
+                return Response({
+                    "error": f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(self.SECTIONS)}"
+                }, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            requested = self.SECTIONS
+
+        try:
+            user = request.user
+            profile = user.profile
+            data = {}
+
+            for name in self.SECTIONS:
+                if name not in requested:
+                    continue
+                if name == 'user':
+                    data[name] = current_user_payload(user, profile)
+                elif name == 'balance':
+                    data[name] = balance_payload(profile)
+                elif name == 'seed_info':
+                    data[name] = seed_info_payload(profile, find_committed_pair(user))
+                elif name == 'mines_active':
+                    game = MinesGame.objects.active_for(user)
+                    data[name] = active_mines_payload(game)
+                elif name == 'keno_active':
+                    game = KenoGame.objects.active_for(user)
+                    data[name] = active_keno_payload(game)
+                elif name == 'mines_stats':
+                    data[name] = mines_stats_payload(profile)
+                elif name == 'keno_stats':
+                    data[name] = keno_stats_payload(profile)
+                elif name == 'daily_reward':
+                    reward = get_reward('daily')
+                    data[name] = reward_status_payload(reward, last_claim(reward, user))
+                elif name == 'ad_reward':
+                    reward = get_reward('ad')
+                    data[name] = reward_status_payload(reward, last_claim(reward, user))
+
+            return Response(data, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({
+                "error": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # Mines Game Views
 class StartMinesGameView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'game'
     
+    @idempotent
     def post(self, request):
+        # Abandoned games would otherwise stay active forever; occasionally sweep them
+        schedule_game_reaping()
         try:
             bet_amount = request.data.get('bet_amount')
             mines_count = request.data.get('mines_count')
@@ -384,26 +441,32 @@ class StartMinesGameView(APIView):
                     "error": "Mines count must be between 1 and 24"
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Check if user has an active game
-            active_game = MinesGame.objects.filter(
+            # Check if user has an active game (the unique constraint catches races below)
+            has_active_game = MinesGame.objects.filter(
                 user=request.user,
                 status='active'
-            ).first()
+            ).exists()
             
-            if active_game:
+            if has_active_game:
                 return Response({
                     "error": "You already have an active game. Please finish or cashout first."
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Check if user has sufficient balance
-            if request.user.profile.balance < bet_amount:
+            if request.user.profile.balance < validated_bet:
                 return Response({
                     "error": "Insufficient balance"
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Deduct bet from balance
             with transaction.atomic():
-                profile = request.user.profile
+                # Re-read under a lock: a payout committed since the request
+                # loaded the profile must not be overwritten
+                profile = lock_profile(request.user.id)
+                if profile.balance < validated_bet:
+                    return Response({
+                        "error": "Insufficient balance"
+                    }, status=status.HTTP_400_BAD_REQUEST)
                 profile.balance -= validated_bet
                 
                 # Get current nonce and increment it (always increments)
@@ -413,32 +476,13 @@ class StartMinesGameView(APIView):
                 # Increment games played on current seed
                 profile.seed_games_played += 1
                 
-                # Update statistics
-                profile.mines_games_played += 1
-                profile.mines_total_wagered += Decimal(str(bet_amount))
-                
-                # Use pre-generated server seed if it exists, otherwise generate new one
-                if profile.next_server_seed and profile.next_server_seed_hash:
-                    server_seed = profile.next_server_seed
-                    server_seed_hash = profile.next_server_seed_hash
-                else:
-                    server_seed = generate_server_seed()
-                    server_seed_hash = hash_seed(server_seed)
+                # Statistics are updated after commit (queue_mines_start below)
+                profile.save(update_fields=['balance', 'mines_nonce', 'seed_games_played'])
                 
-                # Generate new server seed for next game
-                next_server_seed = generate_server_seed()
-                profile.next_server_seed = next_server_seed
-                profile.next_server_seed_hash = hash_seed(next_server_seed)
-                
-                # Use provided client_seed, or use profile's current seed, or generate new one
-                if not client_seed:
-                    if profile.current_client_seed:
-                        client_seed = profile.current_client_seed
-                    else:
-                        client_seed = generate_client_seed()
-                        profile.current_client_seed = client_seed
-                
-                profile.save()
+                # Use the committed server seed (its hash was shown in advance) with the
+                # provided client_seed or the player's current one, and commit the next one
+                server_seed, client_seed = take_committed_seeds(request.user, client_seed)
+                server_seed_hash = hash_seed(server_seed)
                 
                 # Generate mine positions using the current nonce
                 mine_positions = generate_mine_positions(
@@ -451,17 +495,19 @@ class StartMinesGameView(APIView):
                 # Create game
                 game = MinesGame.objects.create(
                     user=request.user,
-                    bet_amount=bet_amount,
+                    bet_amount=validated_bet,
                     mines_count=mines_count,
-                    server_seed=server_seed,
-                    server_seed_hash=server_seed_hash,
+                    server_seed_bytes=bytes.fromhex(server_seed),
                     client_seed=client_seed,
                     nonce=current_nonce,
                     mine_positions=mine_positions,
                     revealed_tiles=[],
-                    current_multiplier=1.00,
+                    current_multiplier=ONE_X,
                     status='active'
                 )
+                
+                # Player statistics are updated after commit
+                queue_mines_start(game)
             
             return Response({
                 "game_id": game.id,
@@ -469,12 +515,17 @@ class StartMinesGameView(APIView):
                 "client_seed": client_seed,
                 "nonce": game.nonce,
                 "mines_count": mines_count,
-                "bet_amount": str(bet_amount),
-                "current_multiplier": str(game.current_multiplier),
+                "bet_amount": format_cents(validated_bet),
+                "current_multiplier": format_bps(game.current_multiplier),
                 "revealed_tiles": [],
-                "balance": str(request.user.profile.balance)
+                "balance": format_cents(profile.balance)
             }, status=status.HTTP_201_CREATED)
             
+        except IntegrityError:
+            # A concurrent start won; unique_active_mines_game_per_user rolled this one back
+            return Response({
+                "error": "You already have an active game. Please finish or cashout first."
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 "error": str(e)
@@ -483,7 +534,9 @@ class StartMinesGameView(APIView):
 
 class RevealTileView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'game'
     
+    @idempotent
     def post(self, request):
         try:
             game_id = request.data.get('game_id')
@@ -526,24 +579,11 @@ class RevealTileView(APIView):
             with transaction.atomic():
                 if is_mine:
                     # Player hit a mine - game over
-                    game.status = 'lost'
-                    game.completed_at = timezone.now()
-                    game.payout_amount = 0
-                    game.net_profit = -game.bet_amount
-                    game.save()
+                    close_game(game, 'lost', 0, -game.bet_amount)
                     
-                    # Update player statistics
-                    profile = request.user.profile
-                    profile.mines_games_lost += 1
-                    profile.mines_total_profit -= game.bet_amount
-                    
-                    # Update streak (loss makes it negative or decreases it)
-                    if profile.mines_current_streak > 0:
-                        profile.mines_current_streak = -1  # Start loss streak
-                    else:
-                        profile.mines_current_streak -= 1  # Continue loss streak
-                    
-                    profile.save()
+                    # Player statistics are updated after commit
+                    queue_mines_result(game, 'lost')
+                    bump_state_version(request.user.id)
                     
                     return Response({
                         "game_over": True,
@@ -552,8 +592,8 @@ class RevealTileView(APIView):
                         "mine_positions": game.mine_positions,
                         "server_seed": game.server_seed,  # Reveal seed after game ends
                         "payout": "0.00",
-                        "net_profit": str(game.net_profit),
-                        "balance": str(request.user.profile.balance)
+                        "net_profit": format_cents(game.net_profit),
+                        "balance": format_cents(request.user.profile.balance)
                     }, status=status.HTTP_200_OK)
                 else:
                     # Safe tile - update game
@@ -561,7 +601,7 @@ class RevealTileView(APIView):
                     tiles_revealed = len(game.revealed_tiles)
                     
                     # Calculate new multiplier
-                    new_multiplier = calculate_multiplier(tiles_revealed, game.mines_count)
+                    new_multiplier = to_bps(calculate_multiplier(tiles_revealed, game.mines_count))
                     game.current_multiplier = new_multiplier
                     
                     # Check if all safe tiles have been revealed (auto-win)
@@ -569,38 +609,16 @@ class RevealTileView(APIView):
                     
                     if safe_tiles_remaining == 0:
                         # All safe tiles revealed - automatic win!
-                        from decimal import Decimal
-                        payout_amount = float(game.bet_amount) * float(new_multiplier)
-                        net_profit = payout_amount - float(game.bet_amount)
-                        
-                        profile = request.user.profile
-                        profile.balance += Decimal(str(payout_amount))
-                        
-                        # Update player statistics
-                        profile.mines_games_won += 1
-                        profile.mines_total_profit += Decimal(str(net_profit))
-                        
-                        # Update biggest win
-                        if Decimal(str(payout_amount)) > profile.mines_biggest_win:
-                            profile.mines_biggest_win = Decimal(str(payout_amount))
-                        
-                        # Update streak (win makes it positive or increases it)
-                        if profile.mines_current_streak < 0:
-                            profile.mines_current_streak = 1  # Start win streak
-                        else:
-                            profile.mines_current_streak += 1  # Continue win streak
+                        payout_amount, net_profit = cashout_amounts(game)
                         
-                        # Update best streak
-                        if profile.mines_current_streak > profile.mines_best_streak:
-                            profile.mines_best_streak = profile.mines_current_streak
+                        close_game(game, 'won', payout_amount, net_profit)
                         
-                        profile.save()
+                        profile = request.user.profile
+                        credit_balance(request.user.id, payout_amount)
+                        profile.refresh_from_db(fields=['balance', 'state_version'])
                         
-                        game.status = 'won'
-                        game.completed_at = timezone.now()
-                        game.payout_amount = payout_amount
-                        game.net_profit = net_profit
-                        game.save()
+                        # Player statistics are updated after commit
+                        queue_mines_result(game, 'won')
                         
                         return Response({
                             "game_over": True,
@@ -608,31 +626,35 @@ class RevealTileView(APIView):
                             "auto_win": True,
                             "tile_position": tile_position,
                             "revealed_tiles": game.revealed_tiles,
-                            "current_multiplier": str(new_multiplier),
-                            "payout": f"{payout_amount:.2f}",
-                            "net_profit": f"{net_profit:.2f}",
+                            "current_multiplier": format_bps(new_multiplier),
+                            "payout": format_cents(payout_amount),
+                            "net_profit": format_cents(net_profit),
                             "mine_positions": game.mine_positions,
                             "server_seed": game.server_seed,
-                            "balance": str(profile.balance),
+                            "balance": format_cents(profile.balance),
                             "message": "Congratulations! All safe tiles revealed!"
                         }, status=status.HTTP_200_OK)
                     
-                    game.save()
+                    save_reveal(game)
                     
                     # Calculate potential payout
-                    potential_payout = float(game.bet_amount) * new_multiplier
+                    potential_payout = payout_cents(game.bet_amount, new_multiplier)
                     
                     return Response({
                         "game_over": False,
                         "hit_mine": False,
                         "tile_position": tile_position,
                         "revealed_tiles": game.revealed_tiles,
-                        "current_multiplier": str(new_multiplier),
-                        "potential_payout": f"{potential_payout:.2f}",
+                        "current_multiplier": format_bps(new_multiplier),
+                        "potential_payout": format_cents(potential_payout),
                         "tiles_revealed": tiles_revealed,
                         "safe_tiles_remaining": safe_tiles_remaining
                     }, status=status.HTTP_200_OK)
                     
+        except GameNotActive:
+            return Response({
+                "error": "Game is not active"
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 "error": str(e)
@@ -641,7 +663,9 @@ class RevealTileView(APIView):
 
 class CashoutView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'game'
     
+    @idempotent
     def post(self, request):
         try:
             game_id = request.data.get('game_id')
@@ -671,50 +695,32 @@ class CashoutView(APIView):
             
             # Calculate payout and update balance
             with transaction.atomic():
-                from decimal import Decimal
-                payout_amount = float(game.bet_amount) * float(game.current_multiplier)
-                net_profit = payout_amount - float(game.bet_amount)
-                
-                profile = request.user.profile
-                profile.balance += Decimal(str(payout_amount))
+                payout_amount, net_profit = cashout_amounts(game)
                 
-                # Update player statistics
-                profile.mines_games_won += 1
-                profile.mines_total_profit += Decimal(str(net_profit))
+                close_game(game, 'won', payout_amount, net_profit)
                 
-                # Update biggest win
-                if Decimal(str(payout_amount)) > profile.mines_biggest_win:
-                    profile.mines_biggest_win = Decimal(str(payout_amount))
-                
-                # Update streak (win makes it positive or increases it)
-                if profile.mines_current_streak < 0:
-                    profile.mines_current_streak = 1  # Start win streak
-                else:
-                    profile.mines_current_streak += 1  # Continue win streak
-                
-                # Update best streak
-                if profile.mines_current_streak > profile.mines_best_streak:
-                    profile.mines_best_streak = profile.mines_current_streak
-                
-                profile.save()
+                profile = request.user.profile
+                credit_balance(request.user.id, payout_amount)
+                profile.refresh_from_db(fields=['balance', 'state_version'])
                 
-                game.status = 'won'
-                game.completed_at = timezone.now()
-                game.payout_amount = payout_amount
-                game.net_profit = net_profit
-                game.save()
+                # Player statistics are updated after commit
+                queue_mines_result(game, 'won')
             
             return Response({
                 "success": True,
-                "payout": f"{payout_amount:.2f}",
-                "net_profit": f"{net_profit:.2f}",
-                "multiplier": str(game.current_multiplier),
+                "payout": format_cents(payout_amount),
+                "net_profit": format_cents(net_profit),
+                "multiplier": format_bps(game.current_multiplier),
                 "tiles_revealed": len(game.revealed_tiles),
                 "mine_positions": game.mine_positions,
                 "server_seed": game.server_seed,  # Reveal seed after game ends
-                "balance": str(profile.balance)
+                "balance": format_cents(profile.balance)
             }, status=status.HTTP_200_OK)
             
+        except GameNotActive:
+            return Response({
+                "error": "Game is not active"
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 "error": str(e)
@@ -723,35 +729,33 @@ class CashoutView(APIView):
 
 class RerollSeedView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'game'
     
+    @idempotent
     def post(self, request):
         try:
             # Check if user has an active game
-            active_game = MinesGame.objects.filter(
+            has_active_game = MinesGame.objects.filter(
                 user=request.user,
                 status='active'
-            ).first()
+            ).exists()
             
-            if active_game:
+            if has_active_game:
                 return Response({
                     "error": "Cannot reroll seed while a game is active"
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Generate new client seed and reset seed games counter
-            new_client_seed = generate_client_seed()
-            profile = request.user.profile
-            profile.current_client_seed = new_client_seed
-            profile.seed_games_played = 0  # Reset games played on this seed
-            
-            # Generate new server seed for next game
-            next_server_seed = generate_server_seed()
-            profile.next_server_seed = next_server_seed
-            profile.next_server_seed_hash = hash_seed(next_server_seed)
-            
-            profile.save()
+            with transaction.atomic():
+                # New client seed and new committed server seed for the next game
+                seed_pair = rotate_seed_pair(request.user)
+                
+                # Reset games played on this seed
+                profile = request.user.profile
+                profile.seed_games_played = 0
+                profile.save(update_fields=['seed_games_played'])
             
             return Response({
-                "client_seed": new_client_seed,
+                "client_seed": seed_pair.client_seed,
                 "seed_games_played": profile.seed_games_played,
                 "message": "New client seed generated. It will be used for your next game."
             }, status=status.HTTP_200_OK)
@@ -768,24 +772,8 @@ class GetSeedInfoView(APIView):
     def get(self, request):
         try:
             profile = request.user.profile
-            
-            # If no client seed exists, generate one
-            if not profile.current_client_seed:
-                profile.current_client_seed = generate_client_seed()
-                profile.save()
-            
-            # If no next server seed exists, generate both seed and hash
-            if not profile.next_server_seed or not profile.next_server_seed_hash:
-                server_seed = generate_server_seed()
-                profile.next_server_seed = server_seed
-                profile.next_server_seed_hash = hash_seed(server_seed)
-                profile.save()
-            
-            return Response({
-                "client_seed": profile.current_client_seed,
-                "seed_games_played": profile.seed_games_played,
-                "next_server_seed_hash": profile.next_server_seed_hash
-            }, status=status.HTTP_200_OK)
+            seed_pair = find_committed_pair(request.user)
+            return Response(seed_info_payload(profile, seed_pair), status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response({
@@ -796,6 +784,8 @@ class GetSeedInfoView(APIView):
 class GameHistoryView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @read_from_replica
+    @state_etag
     def get(self, request):
         try:
             # Get completed games for user (not active)
@@ -809,12 +799,12 @@ class GameHistoryView(APIView):
             for game in games:
                 games_data.append({
                     "game_id": game.id,
-                    "bet_amount": str(game.bet_amount),
+                    "bet_amount": format_cents(game.bet_amount),
                     "mines_count": game.mines_count,
                     "tiles_revealed": len(game.revealed_tiles),
-                    "multiplier": str(game.current_multiplier),
-                    "payout": str(game.payout_amount) if game.payout_amount else "0.00",
-                    "net_profit": str(game.net_profit) if game.net_profit else str(-game.bet_amount),
+                    "multiplier": format_bps(game.current_multiplier),
+                    "payout": format_cents(game.payout_amount or 0),
+                    "net_profit": format_cents(game.net_profit if game.net_profit is not None else -game.bet_amount),
                     "status": game.status,
                     "created_at": game.created_at.isoformat(),
                     "completed_at": game.completed_at.isoformat() if game.completed_at else None,
@@ -844,30 +834,9 @@ class ActiveGameView(APIView):
     def get(self, request):
         try:
             # Get active game for user
-            active_game = MinesGame.objects.filter(
-                user=request.user,
-                status='active'
-            ).first()
+            active_game = MinesGame.objects.active_for(request.user)
             
-            if not active_game:
-                return Response({
-                    "has_active_game": False
-                }, status=status.HTTP_200_OK)
-            
-            return Response({
-                "has_active_game": True,
-                "game_id": active_game.id,
-                "bet_amount": str(active_game.bet_amount),
-                "mines_count": active_game.mines_count,
-                "current_multiplier": str(active_game.current_multiplier),
-                "revealed_tiles": active_game.revealed_tiles,
-                "tiles_revealed": len(active_game.revealed_tiles),
-                "safe_tiles_remaining": active_game.safe_tiles_remaining(),
-                "server_seed_hash": active_game.server_seed_hash,
-                "client_seed": active_game.client_seed,
-                "nonce": active_game.nonce,
-                "created_at": active_game.created_at.isoformat()
-            }, status=status.HTTP_200_OK)
+            return Response(active_mines_payload(active_game), status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response({
@@ -878,32 +847,11 @@ class ActiveGameView(APIView):
 class MinesStatsView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @state_etag
     def get(self, request):
         try:
             profile = request.user.profile
-            
-            # Calculate win rate
-            win_rate = 0
-            if profile.mines_games_played > 0:
-                win_rate = (profile.mines_games_won / profile.mines_games_played) * 100
-            
-            # Calculate average bet
-            avg_bet = 0
-            if profile.mines_games_played > 0:
-                avg_bet = float(profile.mines_total_wagered) / profile.mines_games_played
-            
-            return Response({
-                "games_played": profile.mines_games_played,
-                "games_won": profile.mines_games_won,
-                "games_lost": profile.mines_games_lost,
-                "win_rate": f"{win_rate:.1f}",
-                "total_wagered": str(profile.mines_total_wagered),
-                "total_profit": str(profile.mines_total_profit),
-                "biggest_win": str(profile.mines_biggest_win),
-                "current_streak": profile.mines_current_streak,
-                "best_streak": profile.mines_best_streak,
-                "average_bet": f"{avg_bet:.2f}"
-            }, status=status.HTTP_200_OK)
+            return Response(mines_stats_payload(profile), status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response({
@@ -914,7 +862,9 @@ class MinesStatsView(APIView):
 # Keno Game Views
 class StartKenoGameView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'game'
     
+    @idempotent
     def post(self, request):
         try:
             bet_amount = request.data.get('bet_amount')
@@ -959,25 +909,31 @@ class StartKenoGameView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Check if user has an active game
-            active_game = KenoGame.objects.filter(
+            has_active_game = KenoGame.objects.filter(
                 user=request.user,
                 status='active'
-            ).first()
+            ).exists()
             
-            if active_game:
+            if has_active_game:
                 return Response({
                     "error": "You already have an active game. Please finish it first."
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Check if user has sufficient balance
-            if request.user.profile.balance < bet_amount:
+            if request.user.profile.balance < validated_bet:
                 return Response({
                     "error": "Insufficient balance"
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Deduct bet from balance and create game
             with transaction.atomic():
-                profile = request.user.profile
+                # Re-read under a lock: a payout committed since the request
+                # loaded the profile must not be overwritten
+                profile = lock_profile(request.user.id)
+                if profile.balance < validated_bet:
+                    return Response({
+                        "error": "Insufficient balance"
+                    }, status=status.HTTP_400_BAD_REQUEST)
                 profile.balance -= validated_bet
                 
                 # Get current nonce and increment it
@@ -987,86 +943,40 @@ class StartKenoGameView(APIView):
                 # Increment games played on current seed
                 profile.seed_games_played += 1
                 
-                # Update statistics
-                profile.keno_games_played += 1
-                profile.keno_total_wagered += Decimal(str(bet_amount))
-                
-                # Use pre-generated server seed if it exists, otherwise generate new one
-                if profile.next_server_seed and profile.next_server_seed_hash:
-                    server_seed = profile.next_server_seed
-                    server_seed_hash = profile.next_server_seed_hash
-                else:
-                    server_seed = generate_server_seed()
-                    server_seed_hash = hash_seed(server_seed)
-                
-                # Generate new server seed for next game
-                next_server_seed = generate_server_seed()
-                profile.next_server_seed = next_server_seed
-                profile.next_server_seed_hash = hash_seed(next_server_seed)
-                
-                # Use provided client_seed, or use profile's current seed, or generate new one
-                if not client_seed:
-                    if profile.current_client_seed:
-                        client_seed = profile.current_client_seed
-                    else:
-                        client_seed = generate_client_seed()
-                        profile.current_client_seed = client_seed
-                
-                profile.save()
+                # Use the committed server seed (its hash was shown in advance) with the
+                # provided client_seed or the player's current one, and commit the next one
+                server_seed, client_seed = take_committed_seeds(request.user, client_seed)
+                server_seed_hash = hash_seed(server_seed)
                 
                 # Draw 20 numbers using provably fair algorithm
                 drawn_numbers = draw_keno_numbers(server_seed, client_seed, current_nonce)
                 
                 # Calculate matches and multiplier
                 matches = calculate_matches(numbers_selected, drawn_numbers)
-                multiplier = calculate_keno_multiplier(len(numbers_selected), matches)
+                multiplier = to_bps(calculate_keno_multiplier(len(numbers_selected), matches))
                 
                 # Calculate payout
-                payout_amount = bet_amount * multiplier if multiplier > 0 else 0
-                net_profit = payout_amount - bet_amount
+                payout_amount = payout_cents(validated_bet, multiplier)
+                net_profit = payout_amount - validated_bet
                 
                 # Determine win/loss status
                 if multiplier > 0:
                     game_status = 'won'
-                    profile.keno_games_won += 1
-                    
-                    # Update streak (win makes it positive or increases it)
-                    if profile.keno_current_streak < 0:
-                        profile.keno_current_streak = 1
-                    else:
-                        profile.keno_current_streak += 1
-                    
-                    # Update best streak
-                    if profile.keno_current_streak > profile.keno_best_streak:
-                        profile.keno_best_streak = profile.keno_current_streak
                     
                     # Add payout to balance
-                    profile.balance += Decimal(str(payout_amount))
-                    
-                    # Update biggest win
-                    if Decimal(str(payout_amount)) > profile.keno_biggest_win:
-                        profile.keno_biggest_win = Decimal(str(payout_amount))
+                    profile.balance += payout_amount
                 else:
                     game_status = 'lost'
-                    profile.keno_games_lost += 1
-                    
-                    # Update streak (loss makes it negative or decreases it)
-                    if profile.keno_current_streak > 0:
-                        profile.keno_current_streak = -1
-                    else:
-                        profile.keno_current_streak -= 1
                 
-                # Update profit stats
-                profile.keno_total_profit += Decimal(str(net_profit))
-                profile.save()
+                # Bet and payout in one write, still under the lock
+                profile.save(update_fields=['balance', 'mines_nonce', 'seed_games_played'])
                 
                 # Create game record
                 game = KenoGame.objects.create(
                     user=request.user,
-                    bet_amount=bet_amount,
+                    bet_amount=validated_bet,
                     numbers_selected=sorted(numbers_selected),
-                    server_seed=server_seed,
-                    server_seed_hash=server_seed_hash,
+                    server_seed_bytes=bytes.fromhex(server_seed),
                     client_seed=client_seed,
                     nonce=current_nonce,
                     drawn_numbers=drawn_numbers,
@@ -1077,6 +987,10 @@ class StartKenoGameView(APIView):
                     net_profit=net_profit,
                     completed_at=timezone.now()
                 )
+                
+                record_keno_game(game)
+                # Player statistics are updated after commit
+                queue_keno_result(game)
             
             return Response({
                 "game_id": game.id,
@@ -1087,11 +1001,11 @@ class StartKenoGameView(APIView):
                 "numbers_selected": sorted(numbers_selected),
                 "drawn_numbers": drawn_numbers,
                 "matches": matches,
-                "multiplier": str(multiplier),
-                "payout": f"{payout_amount:.2f}",
-                "net_profit": f"{net_profit:.2f}",
+                "multiplier": format_bps(multiplier),
+                "payout": format_cents(payout_amount),
+                "net_profit": format_cents(net_profit),
                 "status": game_status,
-                "balance": str(profile.balance)
+                "balance": format_cents(profile.balance)
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -1103,6 +1017,8 @@ class StartKenoGameView(APIView):
 class KenoHistoryView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @read_from_replica
+    @state_etag
     def get(self, request):
         try:
             # Get completed Keno games for user
@@ -1114,14 +1030,14 @@ class KenoHistoryView(APIView):
             for game in games:
                 games_data.append({
                     "game_id": game.id,
-                    "bet_amount": str(game.bet_amount),
+                    "bet_amount": format_cents(game.bet_amount),
                     "numbers_selected": game.numbers_selected,
                     "spots_selected": len(game.numbers_selected),
                     "drawn_numbers": game.drawn_numbers,
                     "matches": game.matches,
-                    "multiplier": str(game.current_multiplier),
-                    "payout": str(game.payout_amount) if game.payout_amount else "0.00",
-                    "net_profit": str(game.net_profit) if game.net_profit else str(-game.bet_amount),
+                    "multiplier": format_bps(game.current_multiplier),
+                    "payout": format_cents(game.payout_amount or 0),
+                    "net_profit": format_cents(game.net_profit if game.net_profit is not None else -game.bet_amount),
                     "status": game.status,
                     "created_at": game.created_at.isoformat(),
                     "completed_at": game.completed_at.isoformat() if game.completed_at else None,
@@ -1149,29 +1065,9 @@ class ActiveKenoGameView(APIView):
     def get(self, request):
         try:
             # Get active Keno game for user
-            active_game = KenoGame.objects.filter(
-                user=request.user,
-                status='active'
-            ).first()
+            active_game = KenoGame.objects.active_for(request.user)
             
-            if not active_game:
-                return Response({
-                    "has_active_game": False
-                }, status=status.HTTP_200_OK)
-            
-            return Response({
-                "has_active_game": True,
-                "game_id": active_game.id,
-                "bet_amount": str(active_game.bet_amount),
-                "numbers_selected": active_game.numbers_selected,
-                "drawn_numbers": active_game.drawn_numbers,
-                "matches": active_game.matches,
-                "multiplier": str(active_game.current_multiplier),
-                "server_seed_hash": active_game.server_seed_hash,
-                "client_seed": active_game.client_seed,
-                "nonce": active_game.nonce,
-                "created_at": active_game.created_at.isoformat()
-            }, status=status.HTTP_200_OK)
+            return Response(active_keno_payload(active_game), status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response({
@@ -1182,32 +1078,11 @@ class ActiveKenoGameView(APIView):
 class KenoStatsView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @state_etag
     def get(self, request):
         try:
             profile = request.user.profile
-            
-            # Calculate win rate
-            win_rate = 0
-            if profile.keno_games_played > 0:
-                win_rate = (profile.keno_games_won / profile.keno_games_played) * 100
-            
-            # Calculate average bet
-            avg_bet = 0
-            if profile.keno_games_played > 0:
-                avg_bet = float(profile.keno_total_wagered) / profile.keno_games_played
-            
-            return Response({
-                "games_played": profile.keno_games_played,
-                "games_won": profile.keno_games_won,
-                "games_lost": profile.keno_games_lost,
-                "win_rate": f"{win_rate:.1f}",
-                "total_wagered": str(profile.keno_total_wagered),
-                "total_profit": str(profile.keno_total_profit),
-                "biggest_win": str(profile.keno_biggest_win),
-                "current_streak": profile.keno_current_streak,
-                "best_streak": profile.keno_best_streak,
-                "average_bet": f"{avg_bet:.2f}"
-            }, status=status.HTTP_200_OK)
+            return Response(keno_stats_payload(profile), status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response({
@@ -1217,23 +1092,25 @@ class KenoStatsView(APIView):
 
 class RecentWinsView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = 'feed'
     
+    @read_from_replica
     def get(self, request):
         try:
             # Get recent wins from all users (last 50 winning games)
-            recent_wins = KenoGame.objects.filter(
-                status='won'
-            ).select_related('user').order_by('-created_at')[:50]
+            recent_wins = BetRecord.objects.filter(
+                game_type='keno', status='won'
+            ).select_related('user').order_by('-completed_at')[:50]
             
             wins_data = []
-            for game in recent_wins:
+            for bet in recent_wins:
                 wins_data.append({
-                    'username': game.user.username,
-                    'bet_amount': str(game.bet_amount),
-                    'multiplier': str(game.current_multiplier),
-                    'payout': str(game.payout_amount),
-                    'net_profit': str(game.net_profit),
-                    'created_at': game.created_at.isoformat()
+                    'username': bet.user.username,
+                    'bet_amount': format_cents(bet.bet_amount),
+                    'multiplier': format_bps(bet.multiplier),
+                    'payout': format_cents(bet.payout_amount),
+                    'net_profit': format_cents(bet.net_profit),
+                    'created_at': bet.created_at.isoformat()
                 })
             
             return Response({
@@ -1248,23 +1125,25 @@ class RecentWinsView(APIView):
 
 class MinesRecentWinsView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = 'feed'
     
+    @read_from_replica
     def get(self, request):
         try:
             # Get recent wins from all users (last 50 winning Mines games)
-            recent_wins = MinesGame.objects.filter(
-                status='won'
+            recent_wins = BetRecord.objects.filter(
+                game_type='mines', status='won'
             ).select_related('user').order_by('-completed_at')[:50]
             
             wins_data = []
-            for game in recent_wins:
+            for bet in recent_wins:
                 wins_data.append({
-                    'username': game.user.username,
-                    'bet_amount': str(game.bet_amount),
-                    'multiplier': str(game.current_multiplier),
-                    'payout': str(game.payout_amount),
-                    'net_profit': str(game.net_profit),
-                    'created_at': game.completed_at.isoformat()
+                    'username': bet.user.username,
+                    'bet_amount': format_cents(bet.bet_amount),
+                    'multiplier': format_bps(bet.multiplier),
+                    'payout': format_cents(bet.payout_amount),
+                    'net_profit': format_cents(bet.net_profit),
+                    'created_at': bet.completed_at.isoformat()
                 })
             
             return Response({
@@ -1277,112 +1156,37 @@ class MinesRecentWinsView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _query_int(request, name, default, minimum, maximum):
+    """Integer query parameter clamped to [minimum, maximum]; ValueError if it is not a number."""
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a whole number") from None
+    return max(minimum, min(value, maximum))
+
+
 class LeaderboardView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = 'feed'
     
+    @read_from_replica
     def get(self, request):
         try:
-            from django.db.models import F, Max
-            from datetime import datetime, timedelta
-            
             category = request.query_params.get('category', 'balance')
-            limit = int(request.query_params.get('limit', 50))
+            try:
+                limit = _query_int(request, 'limit', 50, 1, settings.LEADERBOARD_MAX_LIMIT)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
             # Get current month start
             now = timezone.now()
             month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
             
-            # Base query - only users with some activity
-            profiles = Profile.objects.select_related('user').filter(
-                user__is_active=True
-            )
-            
+            # Balance is current; total_wagered and biggest_win are for the current
+            # month, both games combined. Ties go to whoever signed up first.
             leaderboard_data = []
-            
-            if category == 'balance':
-                # Current Balance leaderboard
-                profiles = profiles.order_by('-balance')[:limit]
-                
-                for rank, profile in enumerate(profiles, start=1):
-                    leaderboard_data.append({
-                        'rank': rank,
-                        'username': profile.user.username,
-                        'value': f"{float(profile.balance):.2f}",
-                        'display_value': f"{float(profile.balance):.2f} 👑"
-                    })
-                    
-            elif category == 'total_wagered':
-                # Total Wagered (current month for both games)
-                # Get games from current month for each user
-                profiles_data = []
-                
-                for profile in profiles:
-                    mines_wagered = MinesGame.objects.filter(
-                        user=profile.user,
-                        created_at__gte=month_start
-                    ).aggregate(total=models.Sum('bet_amount'))['total'] or Decimal('0')
-                    
-                    keno_wagered = KenoGame.objects.filter(
-                        user=profile.user,
-                        created_at__gte=month_start
-                    ).aggregate(total=models.Sum('bet_amount'))['total'] or Decimal('0')
-                    
-                    total_wagered = mines_wagered + keno_wagered
-                    
-                    if total_wagered > 0:
-                        profiles_data.append({
-                            'username': profile.user.username,
-                            'value': total_wagered
-                        })
-                
-                # Sort by value descending
-                profiles_data.sort(key=lambda x: x['value'], reverse=True)
-                profiles_data = profiles_data[:limit]
-                
-                for rank, data in enumerate(profiles_data, start=1):
-                    leaderboard_data.append({
-                        'rank': rank,
-                        'username': data['username'],
-                        'value': f"{float(data['value']):.2f}",
-                        'display_value': f"{float(data['value']):.2f} 👑"
-                    })
-                    
-            elif category == 'biggest_win':
-                # Biggest Single Win (current month from both games)
-                profiles_data = []
-                
-                for profile in profiles:
-                    mines_biggest = MinesGame.objects.filter(
-                        user=profile.user,
-                        status='won',
-                        created_at__gte=month_start
-                    ).aggregate(max_payout=Max('payout_amount'))['max_payout'] or Decimal('0')
-                    
-                    keno_biggest = KenoGame.objects.filter(
-                        user=profile.user,
-                        status='won',
-                        created_at__gte=month_start
-                    ).aggregate(max_payout=Max('payout_amount'))['max_payout'] or Decimal('0')
-                    
-                    biggest_win = max(mines_biggest, keno_biggest)
-                    
-                    if biggest_win > 0:
-                        profiles_data.append({
-                            'username': profile.user.username,
-                            'value': biggest_win
-                        })
-                
-                # Sort by value descending
-                profiles_data.sort(key=lambda x: x['value'], reverse=True)
-                profiles_data = profiles_data[:limit]
-                
-                for rank, data in enumerate(profiles_data, start=1):
-                    leaderboard_data.append({
-                        'rank': rank,
-                        'username': data['username'],
-                        'value': f"{float(data['value']):.2f}",
-                        'display_value': f"{float(data['value']):.2f} 👑"
-                    })
+            if category in LEADERBOARD_CATEGORIES:
+                leaderboard_data = top_entries(category, month_start.date(), limit)
             
             return Response({
                 'leaderboard': leaderboard_data,
@@ -1397,9 +1201,89 @@ class LeaderboardView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class LeaderboardRankView(APIView):
+    """
+    The requesting player's rank in one leaderboard category, with up to
+    ``neighbours`` players either side, without fetching the board itself.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'feed'
+
+    @read_from_replica
+    def get(self, request):
+        try:
+            category = request.query_params.get('category', 'balance')
+            if category not in LEADERBOARD_CATEGORIES:
+                return Response({
+                    "error": f"category must be one of: {', '.join(LEADERBOARD_CATEGORIES)}"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                neighbours = _query_int(request, 'neighbours', 2, 0, settings.LEADERBOARD_MAX_NEIGHBOURS)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            now = timezone.now()
+            month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            rank, entries = rank_window(category, month_start.date(), request.user.id, neighbours)
+
+            return Response({
+                'rank': rank,  # None until the player is on this board
+                'leaderboard': entries,
+                'category': category,
+                'period': 'monthly',
+                'period_start': month_start.isoformat()
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({
+                "error": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class VerifyGamesView(APIView):
+    """
+    Public provably fair verification: derive the outcomes of up to
+    VERIFY_MAX_ITEMS games from their revealed seeds in one request.
+
+    No authentication, and only the dedicated ``verify`` throttle applies, so
+    verification traffic never uses up a player's ``user``/``game`` budget.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedTokenBucketThrottle]
+    throttle_scope = 'verify'
+
+    def post(self, request):
+        games = request.data.get('games') if isinstance(request.data, dict) else None
+        max_items = settings.VERIFY_MAX_ITEMS
+
+        if not isinstance(games, list) or not games:
+            return Response({
+                "error": "games must be a non-empty list"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(games) > max_items:
+            return Response({
+                "error": f"At most {max_items} games can be verified per request"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        for item in games:
+            try:
+                results.append(verify_outcome(item))
+            except ValueError as e:
+                results.append({"error": str(e)})
+
+        return Response({
+            "results": results,
+            "count": len(results)
+        }, status=status.HTTP_200_OK)
+
+
 class AdminAnalyticsView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @read_from_replica
     def get(self, request):
         try:
             # Check if user is admin (staff)
@@ -1408,8 +1292,8 @@ class AdminAnalyticsView(APIView):
                     "error": "Admin access required"
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            from django.db.models import Sum, Count, Avg, Max, Q
-            from datetime import datetime, timedelta
+            from django.db.models import Sum, Count, Exists, Max, Min, OuterRef, Q
+            from datetime import datetime, time, timedelta
             
             # Get date range from query params (default: all-time)
             start_date_str = request.query_params.get('start_date', None)
@@ -1427,112 +1311,118 @@ class AdminAnalyticsView(APIView):
             else:
                 end_date = timezone.now()
             
-            # Build filters
-            mines_filter = Q()
-            keno_filter = Q()
-            
+            # Settled games from the bet ledger, plus the monthly archives of
+            # older ones (see api/archive_utils.py). Archived games only come in
+            # whole months, so every archive whose month overlaps the period
+            # counts in full; 'archived' in the response says when that reaches
+            # outside the period. Reaped ('disconnected') games count like the
+            # archives count them: wagered, paid out, and not won.
+            bet_filter = Q(status__in=['won', 'lost', 'disconnected'])
+            archive_filter = Q()
             if start_date:
-                mines_filter &= Q(created_at__gte=start_date)
-                keno_filter &= Q(created_at__gte=start_date)
-            
+                bet_filter &= Q(created_at__gte=start_date)
+                archive_filter &= Q(month__gte=start_date.date().replace(day=1))
             if end_date:
-                mines_filter &= Q(created_at__lte=end_date)
-                keno_filter &= Q(created_at__lte=end_date)
-            
-            # Fetch games based on game_type
-            if game_type in ['all', 'mines']:
-                mines_games = MinesGame.objects.filter(mines_filter, status__in=['won', 'lost'])
-            else:
-                mines_games = MinesGame.objects.none()
-                
-            if game_type in ['all', 'keno']:
-                keno_games = KenoGame.objects.filter(keno_filter, status__in=['won', 'lost'])
-            else:
-                keno_games = KenoGame.objects.none()
-            
-            # Calculate metrics
-            mines_stats = mines_games.aggregate(
-                total_wagered=Sum('bet_amount'),
-                total_payouts=Sum('payout_amount'),
-                games_count=Count('id'),
-                games_won=Count('id', filter=Q(status='won')),
-                avg_bet=Avg('bet_amount'),
-                max_payout=Max('payout_amount')
-            )
-            
-            keno_stats = keno_games.aggregate(
+                bet_filter &= Q(created_at__lte=end_date)
+                archive_filter &= Q(month__lte=end_date.date())
+            if game_type != 'all':
+                bet_filter &= Q(game_type=game_type)
+                archive_filter &= Q(game_type=game_type)
+            
+            bets = BetRecord.objects.filter(bet_filter)
+            archives = GameArchive.objects.filter(archive_filter)
+            
+            # One grouped query each for live and archived games, whatever the number of games
+            game_types = [choice for choice, _ in GameArchive.GAME_CHOICES]
+            per_game = {
+                name: {'total_wagered': 0, 'total_payouts': 0, 'games_count': 0, 'games_won': 0, 'max_payout': 0}
+                for name in game_types
+            }
+            live = bets.values('game_type').annotate(
                 total_wagered=Sum('bet_amount'),
                 total_payouts=Sum('payout_amount'),
                 games_count=Count('id'),
                 games_won=Count('id', filter=Q(status='won')),
-                avg_bet=Avg('bet_amount'),
                 max_payout=Max('payout_amount')
-            )
+            ).order_by()
+            archived = archives.values('game_type').annotate(
+                total_wagered=Sum('total_wagered'),
+                total_payouts=Sum('total_payouts'),
+                games_count=Sum('games_count'),
+                games_won=Sum('games_won'),
+                max_payout=Max('max_payout'),
+                first_month=Min('month'),
+                last_month=Max('month')
+            ).order_by()
+            archived = list(archived)
+            for row in [*live, *archived]:
+                stats = per_game[row['game_type']]
+                for key in ('total_wagered', 'total_payouts', 'games_count', 'games_won'):
+                    stats[key] += row[key]
+                stats['max_payout'] = max(stats['max_payout'], row['max_payout'])
+            
+            # Average bet in whole cents
+            for stats in per_game.values():
+                stats['avg_bet'] = round(stats['total_wagered'] / stats['games_count']) if stats['games_count'] else 0
+            mines_stats, keno_stats = per_game['mines'], per_game['keno']
+            
+            # Whether the archived months counted start before or end after the period
+            first_month = min((row['first_month'] for row in archived), default=None)
+            last_month = max((row['last_month'] for row in archived), default=None)
+            partial_months = False
+            if archived:
+                after_last = (last_month + timedelta(days=32)).replace(day=1)
+                partial_months = (
+                    (start_date is not None and (first_month, time(0)) < (start_date.date(), start_date.time()))
+                    or end_date.date() + timedelta(days=1) < after_last
+                )
             
             # Calculate combined totals
-            total_wagered = Decimal('0')
-            total_payouts = Decimal('0')
-            total_games = 0
-            total_wins = 0
-            
-            if mines_stats['total_wagered']:
-                total_wagered += mines_stats['total_wagered']
-            if mines_stats['total_payouts']:
-                total_payouts += mines_stats['total_payouts']
-            if mines_stats['games_count']:
-                total_games += mines_stats['games_count']
-            if mines_stats['games_won']:
-                total_wins += mines_stats['games_won']
-                
-            if keno_stats['total_wagered']:
-                total_wagered += keno_stats['total_wagered']
-            if keno_stats['total_payouts']:
-                total_payouts += keno_stats['total_payouts']
-            if keno_stats['games_count']:
-                total_games += keno_stats['games_count']
-            if keno_stats['games_won']:
-                total_wins += keno_stats['games_won']
+            total_wagered = sum(stats['total_wagered'] for stats in per_game.values())
+            total_payouts = sum(stats['total_payouts'] for stats in per_game.values())
+            total_games = sum(stats['games_count'] for stats in per_game.values())
+            total_wins = sum(stats['games_won'] for stats in per_game.values())
             
             # Calculate RTP (Return to Player)
             rtp = 0.0
             if total_wagered > 0:
-                rtp = float((total_payouts / total_wagered) * 100)
+                rtp = total_payouts / total_wagered * 100
             
             # Calculate house edge profit
             house_profit = total_wagered - total_payouts
             
-            # Calculate win rate
-            win_rate = 0.0
+            # Distinct players overall and per game in the period, live or archived, in one query
+            def played(**game):
+                return (
+                    Exists(bets.filter(user=OuterRef('pk'), **game))
+                    | Exists(archives.filter(user=OuterRef('pk'), **game))
+                )
+            
+            players = {'unique_players': 0, **{name: 0 for name in game_types}}
             if total_games > 0:
-                win_rate = float((total_wins / total_games) * 100)
+                players = User.objects.aggregate(
+                    unique_players=Count('pk', filter=played()),
+                    **{name: Count('pk', filter=played(game_type=name)) for name in game_types}
+                )
+            unique_players = players['unique_players']
             
-            # Average session duration (approximation based on game count per user)
-            unique_players = User.objects.filter(
-                Q(mines_games__in=mines_games) | Q(keno_games__in=keno_games)
-            ).distinct().count() if total_games > 0 else 0
+            # Get active players (the most played game's player count)
+            active_players = max(players[name] for name in game_types)
             
-            # Get active players (by distinct users in time period)
-            if game_type in ['all', 'mines']:
-                active_players_mines = mines_games.values('user').distinct().count()
-            else:
-                active_players_mines = 0
-                
-            if game_type in ['all', 'keno']:
-                active_players_keno = keno_games.values('user').distinct().count()
-            else:
-                active_players_keno = 0
-            
-            active_players = max(active_players_mines, active_players_keno)
+            # Calculate win rate
+            win_rate = 0.0
+            if total_games > 0:
+                win_rate = total_wins / total_games * 100
             
             # Game popularity
-            mines_popularity = mines_stats['games_count'] or 0
-            keno_popularity = keno_stats['games_count'] or 0
+            mines_popularity = mines_stats['games_count']
+            keno_popularity = keno_stats['games_count']
             
             return Response({
                 'summary': {
-                    'total_wagered': f"{float(total_wagered):.2f}",
-                    'total_payouts': f"{float(total_payouts):.2f}",
-                    'house_profit': f"{float(house_profit):.2f}",
+                    'total_wagered': format_cents(total_wagered),
+                    'total_payouts': format_cents(total_payouts),
+                    'house_profit': format_cents(house_profit),
                     'total_games': total_games,
                     'total_wins': total_wins,
                     'active_players': active_players,
@@ -1542,25 +1432,25 @@ class AdminAnalyticsView(APIView):
                     'rtp': f"{rtp:.2f}",
                     'house_edge': f"{100 - rtp:.2f}",
                     'win_rate': f"{win_rate:.2f}",
-                    'avg_bet': f"{float(total_wagered / total_games if total_games > 0 else 0):.2f}",
+                    'avg_bet': format_cents(round(total_wagered / total_games) if total_games > 0 else 0),
                 },
                 'games': {
                     'mines': {
                         'games_played': mines_stats['games_count'] or 0,
                         'games_won': mines_stats['games_won'] or 0,
-                        'total_wagered': f"{float(mines_stats['total_wagered'] or 0):.2f}",
-                        'total_payouts': f"{float(mines_stats['total_payouts'] or 0):.2f}",
-                        'avg_bet': f"{float(mines_stats['avg_bet'] or 0):.2f}",
-                        'max_payout': f"{float(mines_stats['max_payout'] or 0):.2f}",
+                        'total_wagered': format_cents(mines_stats['total_wagered'] or 0),
+                        'total_payouts': format_cents(mines_stats['total_payouts'] or 0),
+                        'avg_bet': format_cents(mines_stats['avg_bet']),
+                        'max_payout': format_cents(mines_stats['max_payout'] or 0),
                         'win_rate': f"{(mines_stats['games_won'] / mines_stats['games_count'] * 100 if mines_stats['games_count'] else 0):.2f}",
                     },
                     'keno': {
                         'games_played': keno_stats['games_count'] or 0,
                         'games_won': keno_stats['games_won'] or 0,
-                        'total_wagered': f"{float(keno_stats['total_wagered'] or 0):.2f}",
-                        'total_payouts': f"{float(keno_stats['total_payouts'] or 0):.2f}",
-                        'avg_bet': f"{float(keno_stats['avg_bet'] or 0):.2f}",
-                        'max_payout': f"{float(keno_stats['max_payout'] or 0):.2f}",
+                        'total_wagered': format_cents(keno_stats['total_wagered'] or 0),
+                        'total_payouts': format_cents(keno_stats['total_payouts'] or 0),
+                        'avg_bet': format_cents(keno_stats['avg_bet']),
+                        'max_payout': format_cents(keno_stats['max_payout'] or 0),
                         'win_rate': f"{(keno_stats['games_won'] / keno_stats['games_count'] * 100 if keno_stats['games_count'] else 0):.2f}",
                     }
                 },
@@ -1572,6 +1462,12 @@ class AdminAnalyticsView(APIView):
                 'period': {
                     'start_date': start_date.isoformat() if start_date else None,
                     'end_date': end_date.isoformat()
+                },
+                'archived': {
+                    'granularity': 'month',
+                    'first_month': first_month.isoformat() if first_month else None,
+                    'last_month': last_month.isoformat() if last_month else None,
+                    'partial_months': partial_months,
                 }
             }, status=status.HTTP_200_OK)
             
@@ -0,0 +1,76 @@
+"""
+Benchmark access-token validation with and without the validated-token cache.
+
+Simulates our request mix: each page load fires ~9 authenticated API calls with
+the same access token, and a token is reused for its whole 5 minute lifetime.
+
+Usage (from backend/):
+    python benchmarks/bench_auth.py [--users 200] [--requests 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crownwynn.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from api.authentication import CookieJWTAuthentication, validated_token_cache  # noqa: E402
+
+CALLS_PER_PAGE_LOAD = 9
+
+
+def build_request_mix(users, requests, seed=42):
+    """Return a list of raw access tokens in request order (skewed towards active users)."""
+    rng = random.Random(seed)
+    tokens = []
+    for user_id in range(1, users + 1):
+        token = AccessToken()
+        token['user_id'] = str(user_id)
+        tokens.append(str(token))
+
+    weights = [1 / rank for rank in range(1, users + 1)]  # Zipf-like activity
+    mix = []
+    while len(mix) < requests:
+        token = rng.choices(tokens, weights)[0]
+        mix.extend([token] * CALLS_PER_PAGE_LOAD)
+    return mix[:requests]
+
+
+def run(auth, mix):
+    start = time.perf_counter()
+    for raw_token in mix:
+        auth.get_validated_token(raw_token)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    auth = CookieJWTAuthentication()
+    mix = build_request_mix(args.users, args.requests)
+
+    uncached = run(super(CookieJWTAuthentication, auth), mix)
+
+    validated_token_cache.clear()
+    cached = run(auth, mix)
+
+    per_request = lambda total: total / len(mix) * 1e6
+    print(f"requests:          {len(mix)} ({args.users} users, cache size {validated_token_cache.max_size})")
+    print(f"without cache:     {uncached:.3f}s  ({per_request(uncached):.1f} us/request)")
+    print(f"with cache:        {cached:.3f}s  ({per_request(cached):.1f} us/request)")
+    print(f"speedup:           {uncached / cached:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark DRF's stdlib JSONRenderer against the orjson-backed ORJSONRenderer.
+
+Payloads mirror GameHistoryView (50 Mines games), KenoHistoryView (50 Keno
+games) and LeaderboardView (limit=50). Every payload is also checked for
+byte-identical output before timing.
+
+Usage (from backend/):
+    python benchmarks/bench_json.py [--iterations 2000]
+"""
+import argparse
+import os
+import random
+import secrets
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crownwynn.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.renderers import ORJSONRenderer  # noqa: E402
+from api.mines_utils import calculate_multiplier, generate_mine_positions, hash_seed  # noqa: E402
+from api.keno_utils import calculate_keno_multiplier, calculate_matches, draw_keno_numbers  # noqa: E402
+
+
+def mines_history(rng, count=50):
+    games = []
+    now = timezone.now()
+    for i in range(count):
+        server_seed, client_seed = secrets.token_hex(32), secrets.token_hex(32)
+        mines_count = rng.randint(1, 24)
+        mine_positions = generate_mine_positions(server_seed, client_seed, i, mines_count)
+        safe = [t for t in range(25) if t not in mine_positions]
+        revealed = rng.sample(safe, rng.randint(1, len(safe)))
+        bet = Decimal(rng.randint(100, 100000)) / 100
+        multiplier = calculate_multiplier(len(revealed), mines_count)
+        payout = (bet * Decimal(str(multiplier))).quantize(Decimal('0.01'))
+        created = now - timedelta(minutes=i * 3)
+        games.append({
+            "game_id": 1000 + i,
+            "bet_amount": str(bet),
+            "mines_count": mines_count,
+            "tiles_revealed": len(revealed),
+            "multiplier": str(multiplier),
+            "payout": str(payout),
+            "net_profit": str(payout - bet),
+            "status": "won",
+            "created_at": created.isoformat(),
+            "completed_at": (created + timedelta(seconds=40)).isoformat(),
+            "server_seed": server_seed,
+            "server_seed_hash": hash_seed(server_seed),
+            "client_seed": client_seed,
+            "nonce": i,
+            "mine_positions": mine_positions,
+            "revealed_tiles": revealed,
+        })
+    return {"games": games, "count": len(games)}
+
+
+def keno_history(rng, count=50):
+    games = []
+    now = timezone.now()
+    for i in range(count):
+        server_seed, client_seed = secrets.token_hex(32), secrets.token_hex(32)
+        selected = rng.sample(range(1, 41), rng.randint(1, 10))
+        drawn = draw_keno_numbers(server_seed, client_seed, i)
+        matches = calculate_matches(selected, drawn)
+        multiplier = calculate_keno_multiplier(len(selected), matches)
+        bet = Decimal(rng.randint(100, 100000)) / 100
+        payout = (bet * Decimal(str(multiplier))).quantize(Decimal('0.01'))
+        created = now - timedelta(minutes=i * 2)
+        games.append({
+            "game_id": 5000 + i,
+            "bet_amount": str(bet),
+            "numbers_selected": selected,
+            "spots_selected": len(selected),
+            "drawn_numbers": drawn,
+            "matches": matches,
+            "multiplier": str(multiplier),
+            "payout": str(payout),
+            "net_profit": str(payout - bet),
+            "status": "won" if payout > 0 else "lost",
+            "created_at": created.isoformat(),
+            "completed_at": created.isoformat(),
+            "server_seed": server_seed,
+            "server_seed_hash": hash_seed(server_seed),
+            "client_seed": client_seed,
+            "nonce": i,
+        })
+    return {"games": games, "count": len(games)}
+
+
+def leaderboard(rng, count=50):
+    entries = []
+    value = 250000.0
+    for rank in range(1, count + 1):
+        value *= rng.uniform(0.8, 0.99)
+        entries.append({
+            'rank': rank,
+            'username': f"player_{rng.randint(1, 99999)}",
+            'value': f"{value:.2f}",
+            'display_value': f"{value:.2f} 👑",
+        })
+    return {"category": "balance", "leaderboard": entries, "month": timezone.now().strftime('%B %Y')}
+
+
+def bench(renderer, payload, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        renderer.render(payload)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    payloads = {
+        'GameHistoryView (50 games)': mines_history(rng),
+        'KenoHistoryView (50 games)': keno_history(rng),
+        'LeaderboardView (50 rows)': leaderboard(rng),
+        # Native Decimal / datetime values, as returned by the reward and user views
+        'Decimal + datetime values': {
+            "reward_amount": Decimal('250.00'),
+            "new_balance": Decimal('12345.67'),
+            "next_claim_at": timezone.now(),
+        },
+    }
+
+    stdlib, fast = JSONRenderer(), ORJSONRenderer()
+    print(f"{'payload':<28} {'bytes':>7} {'stdlib µs':>10} {'orjson µs':>10} {'speedup':>8}")
+    for name, payload in payloads.items():
+        expected = stdlib.render(payload)
+        if fast.render(payload) != expected:
+            sys.exit(f"{name}: ORJSONRenderer output differs from JSONRenderer")
+        slow_us = bench(stdlib, payload, args.iterations)
+        fast_us = bench(fast, payload, args.iterations)
+        print(f"{name:<28} {len(expected):>7} {slow_us:>10.1f} {fast_us:>10.1f} {slow_us / fast_us:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
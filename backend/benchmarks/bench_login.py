@@ -0,0 +1,100 @@
+"""
+Benchmark logins/sec per worker for the configurable password hashers.
+
+Runs the real login view (CookieTokenObtainPairView) against a throwaway test
+database, once sequentially (a sync worker) and once from several threads (a
+gthread worker, where hashing runs on the bounded hashing pool).
+
+Usage (from backend/):
+    python benchmarks/bench_login.py [--logins 20] [--threads 4]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crownwynn.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import hashers  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+from api import hashing  # noqa: E402
+from api.views import CookieTokenObtainPairView  # noqa: E402
+
+CONFIGS = [
+    # (label, hasher path, class attribute overrides)
+    ("pbkdf2 1,000,000 (Django default)", 'api.hashing.PBKDF2PasswordHasher', {'iterations': 1_000_000}),
+    ("pbkdf2 600,000 (OWASP minimum)", 'api.hashing.PBKDF2PasswordHasher', {'iterations': 600_000}),
+    ("scrypt n=16384", 'api.hashing.ScryptPasswordHasher', {'work_factor': 2 ** 14}),
+]
+
+
+def login(username):
+    response = Client().post(
+        '/api/login/',
+        {'username': username, 'password': 'bench-password'},
+        content_type='application/json'
+    )
+    assert response.status_code == 200, response.content
+    connection.close()
+
+
+def bench(label, hasher_path, overrides, logins, threads):
+    hasher_class = hashers.import_string(hasher_path)
+    originals = {name: getattr(hasher_class, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(hasher_class, name, value)
+
+    try:
+        with override_settings(PASSWORD_HASHERS=[hasher_path]):
+            hashers.get_hashers.cache_clear()
+            hashers.get_hashers_by_algorithm.cache_clear()
+            User.objects.filter(username='bench').delete()
+            User.objects.create_user('bench', password='bench-password')
+
+            start = time.perf_counter()
+            for _ in range(logins):
+                login('bench')
+            sequential = logins / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(login, ['bench'] * logins))
+            threaded = logins / (time.perf_counter() - start)
+    finally:
+        for name, value in originals.items():
+            setattr(hasher_class, name, value)
+        hashers.get_hashers.cache_clear()
+        hashers.get_hashers_by_algorithm.cache_clear()
+
+    print(f"{label:<36} {sequential:>8.1f} logins/s sequential   {threaded:>8.1f} logins/s with {threads} threads")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    CookieTokenObtainPairView.throttle_classes = []  # don't let the auth bucket skew results
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"hashing pool: {hashing.settings.PASSWORD_HASH_WORKERS} workers, queue {hashing.settings.PASSWORD_HASH_QUEUE}")
+        for label, path, overrides in CONFIGS:
+            bench(label, path, overrides, args.logins, args.threads)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark settling games with Decimal amounts against integer cents.
+
+Each settlement takes a bet and the multiplier the game reached, works out the
+payout and net profit, and applies them to the statistics a profile and a
+monthly rollup keep (wagered, profit, payouts, biggest win). The Decimal path
+is how amounts were handled before api/money.py: the float multiplier goes
+through ``Decimal(str(...))`` and every result is quantized to the cent. The
+integer path is what the views and the deferred task handlers do now.
+
+Usage (from backend/):
+    python benchmarks/bench_settlement.py [--games 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crownwynn.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.keno_utils import calculate_keno_multiplier  # noqa: E402
+from api.mines_utils import calculate_multiplier  # noqa: E402
+from api.money import payout_cents, to_bps  # noqa: E402
+
+CENT = Decimal('0.01')
+
+
+def sample_games(rng, count):
+    """(bet in cents, multiplier as a float) pairs, half Mines cashouts and half Keno draws."""
+    games = []
+    for i in range(count):
+        bet = rng.randint(10, 500_000)
+        if i % 2:
+            mines_count = rng.randint(1, 24)
+            multiplier = calculate_multiplier(rng.randint(1, min(25 - mines_count, 6)), mines_count)
+        else:
+            spots = rng.randint(1, 10)
+            multiplier = calculate_keno_multiplier(spots, rng.randint(0, spots))
+        games.append((bet, multiplier))
+    return games
+
+
+def settle_decimal(games):
+    wagered = profit = payouts = biggest = Decimal('0')
+    for bet_cents, multiplier in games:
+        bet = Decimal(bet_cents) / 100
+        stored_multiplier = Decimal(str(multiplier)).quantize(CENT, rounding=ROUND_HALF_UP)
+        payout = (bet * stored_multiplier).quantize(CENT, rounding=ROUND_HALF_UP)
+        net = payout - bet
+        wagered += bet
+        profit += net
+        payouts += payout
+        if payout > biggest:
+            biggest = payout
+    return wagered, profit, payouts, biggest
+
+
+def settle_integer(games):
+    wagered = profit = payouts = biggest = 0
+    for bet, multiplier in games:
+        payout = payout_cents(bet, to_bps(multiplier))
+        net = payout - bet
+        wagered += bet
+        profit += net
+        payouts += payout
+        if payout > biggest:
+            biggest = payout
+    return wagered, profit, payouts, biggest
+
+
+def settle_integer_stored(games):
+    """Integer settlement of a game whose multiplier is already stored in basis points (cashouts, reaper)."""
+    wagered = profit = payouts = biggest = 0
+    for bet, multiplier in games:
+        payout = payout_cents(bet, multiplier)
+        net = payout - bet
+        wagered += bet
+        profit += net
+        payouts += payout
+        if payout > biggest:
+            biggest = payout
+    return wagered, profit, payouts, biggest
+
+
+def bench(settle, games):
+    started = time.perf_counter()
+    settle(games)
+    return len(games) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=200_000)
+    args = parser.parse_args()
+
+    games = sample_games(random.Random(7), args.games)
+    stored = [(bet, to_bps(multiplier)) for bet, multiplier in games]
+
+    rows = [
+        ('Decimal, float multiplier', bench(settle_decimal, games)),
+        ('integer, float multiplier', bench(settle_integer, games)),
+        ('integer, stored basis points', bench(settle_integer_stored, stored)),
+    ]
+    baseline = rows[0][1]
+    print(f"{'settlement':<30} {'games/s':>12} {'speedup':>8}")
+    for name, rate in rows:
+        print(f"{name:<30} {rate:>12,.0f} {rate / baseline:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,11 +10,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
 import os
 from pathlib import Path
 from datetime import timedelta
 from urllib.parse import urlparse, parse_qs
 
+from corsheaders.defaults import default_headers
+
 
 def _split_and_clean(env_val: str):
     """Split a comma-separated env var, strip whitespace and trailing slashes."""
@@ -89,12 +92,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Answers /healthz and /readyz before host validation and everything else
+    'api.health.HealthCheckMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Removes itself unless PROFILER_DIR is set
+    'api.profiling.RequestProfilerMiddleware',
+    # Removes itself unless DATABASE_REPLICA_URL is set
+    'api.routers.PrimaryPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -120,27 +129,40 @@ WSGI_APPLICATION = 'crownwynn.wsgi.application'
 
 
 # Database
-DATABASE_URL = os.environ.get('DATABASE_URL', '')
-if DATABASE_URL:
-    parsed = urlparse(DATABASE_URL)
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': parsed.path.lstrip('/'),
-            'USER': parsed.username,
-            'PASSWORD': parsed.password,
-            'HOST': parsed.hostname,
-            'PORT': parsed.port or '',
+def _database_from_url(url):
+    """Build a DATABASES entry from a postgres:// URL, or sqlite:///path for local setups."""
+    parsed = urlparse(url)
+    if parsed.scheme == 'sqlite':
+        name = parsed.path[1:] if parsed.path.startswith('//') else parsed.path.lstrip('/')
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': name if os.path.isabs(name) else BASE_DIR / name,
         }
+
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': parsed.path.lstrip('/'),
+        'USER': parsed.username,
+        'PASSWORD': parsed.password,
+        'HOST': parsed.hostname,
+        'PORT': parsed.port or '',
     }
-    # If the DATABASE_URL contained query params (e.g. ?sslmode=require),
+    # If the URL contained query params (e.g. ?sslmode=require),
     # parse them and pass through to the DB OPTIONS so psycopg2/Django honor SSL.
     qs = parse_qs(parsed.query)
     options = {}
     if 'sslmode' in qs and qs['sslmode']:
         options['sslmode'] = qs['sslmode'][0]
     if options:
-        DATABASES['default']['OPTIONS'] = options
+        database['OPTIONS'] = options
+    return database
+
+
+DATABASE_URL = os.environ.get('DATABASE_URL', '')
+if DATABASE_URL:
+    DATABASES = {
+        'default': _database_from_url(DATABASE_URL)
+    }
 else:
     # Fallback to sqlite for local dev
     DATABASES = {
@@ -150,6 +172,109 @@ else:
         }
     }
 
+# Optional read replica. Leaderboard, analytics, history and recent-wins reads go
+# there (see api/routers.py). Locally, DATABASE_REPLICA_URL=sqlite:///db.sqlite3
+# points the "replica" at the dev database to exercise the routing.
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL', '')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = {
+        **_database_from_url(DATABASE_REPLICA_URL),
+        # Tests read the replica through the default test database
+        'TEST': {'MIRROR': 'default'},
+    }
+REPLICA_DATABASE_ALIAS = 'replica' if DATABASE_REPLICA_URL else ''
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+# Seconds a user's replica reads stay on the primary after they change something,
+# so they always see their own writes despite replication lag.
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', '5'))
+
+# Cache
+# Set REDIS_URL (e.g. redis://redis:6379/0) to share the cache - and with it the
+# throttle buckets and auth caches - between all workers. Without it every
+# worker keeps its own in-memory cache.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            # Fail fast if Redis is unreachable; callers degrade gracefully
+            'OPTIONS': {
+                'socket_connect_timeout': 0.25,
+                'socket_timeout': 0.25,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Cache alias holding the token-bucket throttle state. An alias other than
+# 'default' gets the default cache's backend under its own key prefix, or its
+# own Redis with THROTTLE_REDIS_URL.
+THROTTLE_CACHE_ALIAS = os.environ.get('THROTTLE_CACHE_ALIAS', 'default')
+THROTTLE_REDIS_URL = os.environ.get('THROTTLE_REDIS_URL', '')
+if THROTTLE_CACHE_ALIAS not in CACHES:
+    if THROTTLE_REDIS_URL:
+        CACHES[THROTTLE_CACHE_ALIAS] = {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': THROTTLE_REDIS_URL,
+            'OPTIONS': {
+                'socket_connect_timeout': 0.25,
+                'socket_timeout': 0.25,
+            },
+        }
+    else:
+        CACHES[THROTTLE_CACHE_ALIAS] = {**CACHES['default'], 'KEY_PREFIX': THROTTLE_CACHE_ALIAS}
+
+# Cache alias holding Idempotency-Key responses. A retry can land on any worker,
+# so this must be shared: it uses REDIS_URL when set and otherwise a table in the
+# database (created by `manage.py createcachetable`, which prepare_container runs),
+# never a per-worker in-memory cache.
+IDEMPOTENCY_CACHE_ALIAS = 'idempotency'
+if REDIS_URL:
+    CACHES[IDEMPOTENCY_CACHE_ALIAS] = {**CACHES['default'], 'KEY_PREFIX': IDEMPOTENCY_CACHE_ALIAS}
+else:
+    CACHES[IDEMPOTENCY_CACHE_ALIAS] = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'idempotency_cache',
+        # Culling would drop stored responses before their TTL; expired ones are removed anyway
+        'OPTIONS': {'MAX_ENTRIES': 1_000_000},
+    }
+
+# Password hashing
+# PASSWORD_HASHER picks the hasher for new/updated passwords (pbkdf2, scrypt,
+# argon2, bcrypt). The others stay listed so existing hashes keep working;
+# Django rehashes a password with the preferred hasher on the next login.
+# argon2 and bcrypt need optional packages and are only listed when installed
+# (or chosen, so a missing package fails loudly instead of falling back).
+_PASSWORD_HASHER_PATHS = {
+    'pbkdf2': ('api.hashing.PBKDF2PasswordHasher', None),
+    'scrypt': ('api.hashing.ScryptPasswordHasher', None),
+    'argon2': ('api.hashing.Argon2PasswordHasher', 'argon2'),  # argon2-cffi
+    'bcrypt': ('api.hashing.BCryptSHA256PasswordHasher', 'bcrypt'),
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2').lower()
+PASSWORD_HASHERS = [_PASSWORD_HASHER_PATHS[PASSWORD_HASHER][0]] + [
+    path for name, (path, module) in _PASSWORD_HASHER_PATHS.items()
+    if name != PASSWORD_HASHER and (module is None or importlib.util.find_spec(module) is not None)
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Cost parameters (empty = Django's defaults). Changing them triggers rehash-on-login.
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS') or 0) or None
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR') or 0) or None
+
+# Hashing runs on a bounded per-process thread pool (0 workers = inline). When
+# workers + queue slots are all busy for QUEUE_TIMEOUT seconds, login/register
+# answer 503 with Retry-After instead of piling up.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', '4'))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', '2'))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -195,6 +320,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # CORS/CSRF: allow comma-separated env overrides for production
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'x-profile-request')
 
 _cors_env = os.environ.get('CORS_ALLOWED_ORIGINS')
 if _cors_env:
@@ -227,14 +353,30 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "api.authentication.CookieJWTAuthentication",
     ),
-    # Basic rate limiting (tunable via env if needed)
+    # orjson-backed JSON with byte-identical output to DRF's stdlib renderer
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "api.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # Token-bucket rate limiting (tunable via env if needed). Views opt into the
+    # per-endpoint buckets with `throttle_scope = "game" | "feed" | "auth"`.
     "DEFAULT_THROTTLE_CLASSES": (
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "api.throttling.AnonTokenBucketThrottle",
+        "api.throttling.UserTokenBucketThrottle",
+        "api.throttling.ScopedTokenBucketThrottle",
     ),
     "DEFAULT_THROTTLE_RATES": {
         "anon": os.environ.get("THROTTLE_ANON", "200/hour"),
         "user": os.environ.get("THROTTLE_USER", "1000/hour"),
+        "game": os.environ.get("THROTTLE_GAME", "300/min"),
+        "feed": os.environ.get("THROTTLE_FEED", "120/min"),
+        "auth": os.environ.get("THROTTLE_AUTH", "20/min"),
+        "verify": os.environ.get("THROTTLE_VERIFY", "30/min"),
     },
 }
 
@@ -249,6 +391,75 @@ SIMPLE_JWT = {
     "AUTH_COOKIE_SAMESITE": "Lax",
 }
 
+# Seconds to cache a user's (non-secret) fields per user id during authentication.
+# 0 disables the cache; the user is then loaded together with its profile in one query.
+AUTH_USER_CACHE_SECONDS = int(os.environ.get('AUTH_USER_CACHE_SECONDS', '0'))
+
+# Max number of validated access tokens remembered per process (0 disables the cache).
+# Logout revokes the access token through the shared cache, so set REDIS_URL when
+# running more than one worker.
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', '1024'))
+
+# Seconds a remembered access token is accepted between checks of the shared
+# revocation list, so another worker's logout takes at most this long to apply
+# here. 0 checks on every request.
+AUTH_REVOCATION_CHECK_SECONDS = int(os.environ.get('AUTH_REVOCATION_CHECK_SECONDS', '5'))
+
+# Seconds between incremental syncs of the in-process refresh-token blacklist filter.
+TOKEN_BLACKLIST_SYNC_SECONDS = int(os.environ.get('TOKEN_BLACKLIST_SYNC_SECONDS', '5'))
+
+# Prune expired outstanding/blacklisted tokens at most this often (0 = only via `manage.py prune_tokens`).
+TOKEN_PRUNE_INTERVAL_SECONDS = int(os.environ.get('TOKEN_PRUNE_INTERVAL_SECONDS', '3600'))
+
+# Cooldown rewards: each type credits `amount` at most once per `cooldown_seconds`,
+# tracked in the Profile timestamp column named by `field`.
+COOLDOWN_REWARDS = {
+    'daily': {
+        'label': 'Daily reward',
+        'amount': '250.00',
+        'cooldown_seconds': 12 * 3600,
+        'field': 'last_daily_claim',
+    },
+    'ad': {
+        'label': 'Ad reward',
+        'amount': '100.00',
+        'cooldown_seconds': 5 * 60,
+        'field': 'last_ad_claim',
+    },
+}
+
+# Seconds a game action's response is kept for replay to retries with the same Idempotency-Key.
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '300'))
+
+# Public verify/ endpoint: max games per request and memoized outcomes per process.
+VERIFY_MAX_ITEMS = int(os.environ.get('VERIFY_MAX_ITEMS', '200'))
+VERIFY_CACHE_SIZE = int(os.environ.get('VERIFY_CACHE_SIZE', '4096'))
+
+# Leaderboards: most entries leaderboard/ returns, most neighbours either side from leaderboard/me/.
+LEADERBOARD_MAX_LIMIT = int(os.environ.get('LEADERBOARD_MAX_LIMIT', '100'))
+LEADERBOARD_MAX_NEIGHBOURS = int(os.environ.get('LEADERBOARD_MAX_NEIGHBOURS', '10'))
+
+# Abandoned Mines games: active games with no reveal for MINES_ABANDON_TIMEOUT_SECONDS are
+# settled as 'disconnected' by `manage.py reap_games` and, every MINES_REAP_INTERVAL_SECONDS
+# (0 = off), by a background sweep started from the Mines start view. Policy "cashout"
+# pays the current multiplier, "forfeit" loses the bet.
+MINES_ABANDON_TIMEOUT_SECONDS = int(os.environ.get('MINES_ABANDON_TIMEOUT_SECONDS', '1800'))
+MINES_ABANDON_POLICY = os.environ.get('MINES_ABANDON_POLICY', 'cashout').lower()
+MINES_REAP_INTERVAL_SECONDS = int(os.environ.get('MINES_REAP_INTERVAL_SECONDS', '300'))
+MINES_REAP_BATCH_SIZE = int(os.environ.get('MINES_REAP_BATCH_SIZE', '100'))
+
+# Player statistics and monthly rollups are applied after the bet commits, from DeferredTask
+# rows, on DEFERRED_TASK_WORKERS threads per process (0 = inline, right after commit).
+# A task failing DEFERRED_TASK_MAX_ATTEMPTS times is marked 'failed' and stops holding
+# back the user's later tasks; `manage.py process_deferred_tasks` picks up leftovers.
+DEFERRED_TASK_WORKERS = int(os.environ.get('DEFERRED_TASK_WORKERS', '2'))
+DEFERRED_TASK_MAX_ATTEMPTS = int(os.environ.get('DEFERRED_TASK_MAX_ATTEMPTS', '5'))
+
+# Staff requests sent with `X-Profile-Request: 1` are sampled every PROFILER_INTERVAL_MS
+# and written to PROFILER_DIR. Empty disables the profiler middleware entirely.
+PROFILER_DIR = os.environ.get('PROFILER_DIR', '')
+PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', '1'))
+
 # Secure cookie flags controlled by env (set True in production when using HTTPS)
 CSRF_COOKIE_SECURE = os.environ.get('CSRF_COOKIE_SECURE', 'False').lower() in ('1', 'true', 'yes')
 SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower() in ('1', 'true', 'yes')